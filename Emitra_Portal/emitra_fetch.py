@@ -1,39 +1,604 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
 import gspread
+import requests
+import json
 from google.oauth2.service_account import Credentials
 import time
 import logging
 import sys
 import os
+import argparse
+import queue
+import threading
+import sqlite3
 
 # Fix Windows encoding issues
 if sys.platform == "win32":
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
+# Shared Chrome setup lives in the repository-level common package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import driver_factory
+from common.driver_pool import DriverPool, DEFAULT_MAX_USES, DEFAULT_MAX_RSS_MB
+
 # Simple logging without emojis
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s',
     handlers=[
         logging.FileHandler('emitra_automation.log', encoding='utf-8'),
         logging.StreamHandler(sys.stdout)
     ]
 )
 
+# Angular exposes its testability API in production builds; every root is stable
+# once there are no pending HTTP calls or timers in the zone
+ANGULAR_STABLE_JS = """
+if (typeof window.getAllAngularTestabilities !== 'function') {
+    return document.readyState === 'complete';
+}
+var roots = window.getAllAngularTestabilities();
+return roots.length > 0 && roots.every(function (t) { return t.isStable(); });
+"""
+
+# Search results (or a not-found message) have been rendered below the search card
+RESULTS_READY_JS = """
+if (document.querySelector("div[style*='background']")) { return true; }
+var text = (document.body && document.body.innerText || '').toUpperCase();
+return text.indexOf('VIEW MORE') !== -1 || text.indexOf('NO RECORD') !== -1 || text.indexOf('NOT FOUND') !== -1;
+"""
+
+# Text of the current results card, used to tell fresh results from the previous receipt's
+RESULTS_TEXT_JS = """
+var el = document.querySelector("div[style*='background']");
+return el ? el.innerText : null;
+"""
+
+# Clear the receipt input through an input event so Angular's form model resets too,
+# and drop the previous receipt's results card so a slow search cannot be read as this one
+RESET_SEARCH_JS = """
+var input = document.querySelector("div.card.verification-transaction input.form-control") ||
+            document.querySelector("input.form-control");
+if (!input) { return false; }
+input.value = '';
+input.dispatchEvent(new Event('input', { bubbles: true }));
+document.querySelectorAll("div[style*='background']").forEach(function (el) {
+    if (!el.contains(input)) { el.remove(); }
+});
+return true;
+"""
+
+# Collect everything the extraction steps need in one round trip: service-name
+# candidates from the places the XPath strategies look at, and the cells of the
+# last (most recent) life-cycle row
+EXTRACT_RESULTS_JS = """
+var out = {service: [], area: [], rowCount: 0, cells: []};
+var text = function (el) { return (el.innerText || '').trim(); };
+var keep = function (list, t) { if (t.length > 3 && t.length < 200) { list.push(t); } };
+
+["div[class*='service']", "div.card-body strong", "div[class*='result'] h5", "div[class*='result'] h6"]
+    .forEach(function (sel) {
+        document.querySelectorAll(sel).forEach(function (el) { keep(out.service, text(el)); });
+    });
+document.querySelectorAll('span, div, td, label').forEach(function (el) {
+    var own = Array.prototype.filter.call(el.childNodes, function (n) { return n.nodeType === 3; })
+        .map(function (n) { return n.textContent; }).join(' ');
+    if (own.indexOf('Service') === -1) { return; }
+    if (el.tagName === 'TD' && el.nextElementSibling) { keep(out.service, text(el.nextElementSibling)); }
+    keep(out.service, el.tagName === 'DIV' ? text(el) : text(el.parentElement));
+});
+document.querySelectorAll('div.card-body, .result-content, .search-result').forEach(function (area) {
+    area.querySelectorAll('*').forEach(function (el) {
+        if (el.children.length === 0) { keep(out.area, text(el)); }
+    });
+});
+
+var rows = Array.prototype.filter.call(document.querySelectorAll('table tr'), function (r) {
+    return r.querySelector('td');
+});
+if (!rows.length) { rows = Array.prototype.slice.call(document.querySelectorAll('mat-table mat-row')); }
+out.rowCount = rows.length;
+if (rows.length) {
+    out.cells = Array.prototype.map.call(rows[rows.length - 1].querySelectorAll('td, mat-cell'), text);
+}
+return JSON.stringify(out);
+"""
+
+EMITRA_BASE_URL = "https://emitra.rajasthan.gov.in"
+EMITRA_HOME_URL = f"{EMITRA_BASE_URL}/emitra/home"
+
+# The JSON endpoints behind the receipt verification card are not hard-coded:
+# they are read from an endpoint map file copied from the browser's network tab
+# (see load_endpoint_map), so nothing is sent to the portal on a guess
+ENDPOINT_MAP_KEYS = ["search_path", "lifecycle_path", "receipt_field", "service_keys", "lifecycle_keys"]
+LIFECYCLE_COLUMNS = 6
+
+# Consecutive portal errors after which the HTTP backend is switched off for the run
+HTTP_BACKEND_MAX_FAILURES = 3
+
+# Buttons that close the receipt detail view / dialogs
+DETAIL_CLOSE_SELECTORS = [
+    "button.p-dialog-header-close",
+    "button.btn-close",
+    "button.close",
+    "button[mat-dialog-close]"
+]
+
+LIFECYCLE_TAB_XPATH = "//*[self::button or self::a or self::span or self::div][contains(text(), 'Life cycle') or contains(text(), 'Life Cycle')]"
+LIFECYCLE_ROWS_XPATH = "//table//tr[td] | //mat-table//mat-row"
+
+# Buffered sheet writes: flush after this many rows or once the oldest row has waited this long
+DEFAULT_FLUSH_ROWS = 20
+DEFAULT_FLUSH_SECONDS = 30
+# Rows still buffered when a run ends get this many more attempts, backing off between them
+FINAL_FLUSH_ATTEMPTS = 3
+FINAL_FLUSH_BACKOFF = 5
+
+# Local result store: receipts finalized within this window are skipped on the next run
+DEFAULT_STORE_FILE = "emitra_results.db"
+DEFAULT_FRESH_HOURS = 24
+
+# Adaptive selector ordering: stats persist between runs, fallbacks only get a short probe
+DEFAULT_SELECTOR_STATS_FILE = "selector_stats.json"
+SELECTOR_PROBE_TIMEOUT = 2
+
+# Default ceiling on receipts sent to the e-Mitra portal per minute (all workers combined)
+DEFAULT_MAX_RECEIPTS_PER_MINUTE = 20
+
+
+class PortalRateLimiter:
+    """Thread-safe ceiling on how often receipt lookups may start"""
+
+    def __init__(self, max_per_minute=None):
+        self.interval = 60.0 / max_per_minute if max_per_minute else 0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        """Block until the caller is allowed to send the next lookup"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SheetBatchWriter:
+    """Buffers row updates and sends them in a single batch_update call"""
+    
+    def __init__(self, sheet, max_rows=DEFAULT_FLUSH_ROWS, max_seconds=DEFAULT_FLUSH_SECONDS):
+        self.sheet = sheet
+        self.max_rows = max(1, int(max_rows))
+        self.max_seconds = max_seconds
+        self._pending = []
+        self._oldest = None
+        self._lock = threading.Lock()
+    
+    @property
+    def pending(self):
+        return len(self._pending)
+    
+    def add(self, range_name, values, meta=None):
+        """Queue one range update; meta is handed back by flush()"""
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((range_name, values, meta))
+    
+    def due(self):
+        """True once the buffer has reached the row or age threshold"""
+        with self._lock:
+            if not self._pending:
+                return False
+            return (len(self._pending) >= self.max_rows or
+                    time.monotonic() - self._oldest >= self.max_seconds)
+    
+    def flush(self):
+        """Send every buffered row; returns (ok, metas) for the rows that were sent
+        
+        On failure the rows go back to the front of the buffer for the next flush.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._oldest = None
+        
+        if not pending:
+            return True, []
+        
+        started = time.time()
+        try:
+            self.sheet.batch_update([{'range': range_name, 'values': values} for range_name, values, _ in pending])
+        except Exception as e:
+            logging.error(f"Sheet flush of {len(pending)} rows failed after {time.time() - started:.2f}s: {str(e)}")
+            with self._lock:
+                self._pending[:0] = pending
+                self._oldest = time.monotonic()
+            return False, []
+        
+        logging.info(f"Sheet flush: {len(pending)} rows in {time.time() - started:.2f}s")
+        return True, [meta for _, _, meta in pending]
+    
+    def discard(self):
+        """Drop every buffered row; returns their metas"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._oldest = None
+        return [meta for _, _, meta in pending]
+
+
+class ReceiptStore:
+    """SQLite record of every receipt result that reached the sheet"""
+    
+    def __init__(self, path=DEFAULT_STORE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS receipts (
+                receipt_number TEXT PRIMARY KEY,
+                service_name TEXT,
+                lifecycle_1 TEXT, lifecycle_2 TEXT, lifecycle_3 TEXT,
+                lifecycle_4 TEXT, lifecycle_5 TEXT, lifecycle_6 TEXT,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+    
+    def record_many(self, results):
+        """Upsert (receipt_number, service_name, lifecycle_data, status) tuples"""
+        now = time.time()
+        rows = [(receipt_number, service_name, *(list(lifecycle_data) + [''] * 6)[:6], status, now)
+                for receipt_number, service_name, lifecycle_data, status in results]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO receipts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.conn.commit()
+    
+    def fresh_final_receipts(self, fresh_hours):
+        """Receipt numbers finalized within the last fresh_hours"""
+        if not fresh_hours:
+            return set()
+        cutoff = time.time() - fresh_hours * 3600
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT receipt_number FROM receipts WHERE status = 'final' AND updated_at >= ?", (cutoff,)
+            ).fetchall()
+        return {row[0] for row in rows}
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class SelectorRegistry:
+    """Per-step selector hit statistics used to try the likeliest selector first"""
+    
+    def __init__(self, path=DEFAULT_SELECTOR_STATS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._last = {}
+        self._dirty = False
+        
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    saved = json.load(f)
+                self._stats = saved.get('stats', {})
+                self._last = saved.get('last', {})
+                logging.info(f"Loaded selector statistics for {len(self._stats)} steps from {path}")
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable selector statistics {path}: {str(e)}")
+    
+    def ordered(self, step, selectors):
+        """Last successful selector first, then by hit count, then the original order"""
+        with self._lock:
+            stats = self._stats.get(step, {})
+            last = self._last.get(step)
+            position = {selector: i for i, selector in enumerate(selectors)}
+            return sorted(selectors, key=lambda sel: (
+                sel != last,
+                -stats.get(sel, {}).get('hits', 0),
+                stats.get(sel, {}).get('misses', 0),
+                position[sel]
+            ))
+    
+    def record(self, step, selector, hit):
+        with self._lock:
+            entry = self._stats.setdefault(step, {}).setdefault(selector, {'hits': 0, 'misses': 0})
+            entry['hits' if hit else 'misses'] += 1
+            if hit:
+                self._last[step] = selector
+            self._dirty = True
+    
+    def save(self):
+        """Persist statistics so the next run starts with the learned ordering"""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            try:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump({'stats': self._stats, 'last': self._last}, f, indent=2)
+                self._dirty = False
+            except OSError as e:
+                logging.warning(f"Could not save selector statistics: {str(e)}")
+
+
+def clean_service_name(raw_text):
+    """Clean and format the service name by removing unwanted prefixes and suffixes"""
+    try:
+        if not raw_text or len(raw_text.strip()) < 3:
+            return None
+
+        text = raw_text.strip()
+
+        # Remove common prefixes (case insensitive)
+        prefixes_to_remove = [
+            "Service :",
+            "Service:",
+            "Service Name :",
+            "Service Name:",
+            "Service Type :",
+            "Service Type:",
+            "Application :",
+            "Application:",
+            "Form :",
+            "Form:",
+            "Certificate :",
+            "Certificate:",
+            "Name :",
+            "Name:"
+        ]
+
+        for prefix in prefixes_to_remove:
+            if text.lower().startswith(prefix.lower()):
+                text = text[len(prefix):].strip()
+                break
+
+        # Remove common suffixes
+        suffixes_to_remove = [
+            "- Click for more details",
+            "- View More",
+            "- More Info",
+            "- Details",
+            "Click here",
+            "View More"
+        ]
+
+        for suffix in suffixes_to_remove:
+            if text.lower().endswith(suffix.lower()):
+                text = text[:-len(suffix)].strip()
+                break
+
+        # Clean up extra spaces and special characters
+        text = ' '.join(text.split())  # Remove extra whitespace
+        text = text.replace('\n', ' ').replace('\r', ' ')  # Remove line breaks
+
+        # Remove leading/trailing quotes or brackets if present
+        text = text.strip('"\'()[]{}')
+
+        # Skip if it's just common words that aren't service names
+        skip_words = ['search', 'result', 'receipt', 'number', 'click', 'view', 'more', 'date', 'time', 'status', 'here', 'details']
+        if text.lower() in skip_words:
+            return None
+
+        # Must have meaningful content
+        if len(text) < 5 or len(text) > 200:
+            return None
+
+        # Should contain service-related keywords or be substantial text
+        service_keywords = ['certificate', 'registration', 'license', 'verification', 'application', 'form', 'permit', 'approval']
+        if len(text) < 20 and not any(keyword in text.lower() for keyword in service_keywords):
+            return None
+
+        return text
+
+    except Exception as e:
+        logging.debug(f"Error cleaning service name '{raw_text}': {e}")
+        return None
+
+
+class EmitraPortalError(Exception):
+    """Raised when the portal does not answer with usable JSON"""
+
+
+def load_endpoint_map(path):
+    """Read the endpoint map used by EmitraHttpClient and the replay server
+    
+    A JSON object with the request paths, the name of the receipt number field
+    in the request body, the keys that may hold the service name, and the keys
+    of the six life-cycle columns in the order they are written to the sheet:
+    
+        {"search_path": "/...", "lifecycle_path": "/...", "receipt_field": "...",
+         "service_keys": ["..."], "lifecycle_keys": ["...", "...", "...", "...", "...", "..."]}
+    """
+    with open(path, encoding='utf-8') as f:
+        endpoints = json.load(f)
+    
+    missing = [key for key in ENDPOINT_MAP_KEYS if not endpoints.get(key)]
+    if missing:
+        raise ValueError(f"Endpoint map {path} is missing {', '.join(missing)}")
+    if len(endpoints['lifecycle_keys']) != LIFECYCLE_COLUMNS:
+        raise ValueError(f"Endpoint map {path} must list exactly {LIFECYCLE_COLUMNS} lifecycle_keys")
+    return endpoints
+
+
+def _normalize_key(key):
+    return str(key).lower().replace('_', '')
+
+
+class EmitraHttpClient:
+    """Receipt lookups against the JSON endpoints behind the e-Mitra Angular app
+    
+    Returns the same (service_name, lifecycle_data[6]) tuple as
+    EmitraCleanAutomation.process_single_receipt without starting Chrome.
+    Endpoint paths and field names come from an endpoint map (see
+    load_endpoint_map). Raises EmitraPortalError when the portal answers with
+    anything other than JSON (e.g. the Angular shell seen in the
+    debug_response_*.html captures), so the caller can fall back to Selenium.
+    """
+    
+    def __init__(self, endpoints, base_url=EMITRA_BASE_URL, timeout=30, capture_dir=None):
+        self.endpoints = endpoints
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.capture_dir = capture_dir
+        
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'application/json, text/plain, */*',
+            'Content-Type': 'application/json',
+            'Origin': EMITRA_BASE_URL,
+            'Referer': EMITRA_HOME_URL
+        })
+    
+    def _post_json(self, path, payload, capture_name=None):
+        """POST a JSON payload and return the decoded JSON answer"""
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+        
+        if response.status_code != 200:
+            raise EmitraPortalError(f"HTTP {response.status_code} from {path}")
+        if response.text.lstrip().startswith('<'):
+            raise EmitraPortalError(f"HTML instead of JSON from {path}")
+        
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise EmitraPortalError(f"Invalid JSON from {path}: {str(e)}")
+        
+        # Save raw answers so they can be replayed by emitra_replay_server.py
+        if self.capture_dir and capture_name:
+            os.makedirs(self.capture_dir, exist_ok=True)
+            with open(os.path.join(self.capture_dir, capture_name), 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        
+        return data
+    
+    @staticmethod
+    def _find_value(data, keys):
+        """Depth-first search for the first non-empty value stored under one of keys"""
+        wanted = {_normalize_key(key) for key in keys}
+        stack = [data]
+        while stack:
+            node = stack.pop(0)
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if _normalize_key(key) in wanted and value not in (None, '', [], {}):
+                        return value
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        return None
+    
+    @staticmethod
+    def _find_rows(data):
+        """Return the first list of records (dicts) found in the answer"""
+        stack = [data]
+        while stack:
+            node = stack.pop(0)
+            if isinstance(node, list) and node and all(isinstance(item, dict) for item in node):
+                return node
+            if isinstance(node, dict):
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+        return []
+    
+    def lifecycle_columns(self, row):
+        """The six sheet columns of one life-cycle record, looked up by key"""
+        values = {_normalize_key(key): value for key, value in row.items()}
+        columns = []
+        for key in self.endpoints['lifecycle_keys']:
+            value = values.get(_normalize_key(key))
+            columns.append('' if value is None else str(value).strip())
+        return columns
+    
+    def lookup(self, receipt_number):
+        """Look up one receipt, returning (service_name, lifecycle_data)"""
+        receipt_field = self.endpoints['receipt_field']
+        search_data = self._post_json(self.endpoints['search_path'], {receipt_field: receipt_number},
+                                      f"{receipt_number}.search.json")
+        
+        raw_service = self._find_value(search_data, self.endpoints['service_keys'])
+        if not self._find_rows(search_data) and not raw_service:
+            return "RECEIPT NOT FOUND", ["RECEIPT NOT FOUND"] * LIFECYCLE_COLUMNS
+        
+        service_name = clean_service_name(str(raw_service)) if raw_service else None
+        if not service_name:
+            service_name = "SERVICE NAME NOT FOUND"
+        
+        lifecycle = self._post_json(self.endpoints['lifecycle_path'], {receipt_field: receipt_number},
+                                    f"{receipt_number}.lifecycle.json")
+        rows = self._find_rows(lifecycle)
+        if not rows:
+            return service_name, ["NO DATA AVAILABLE"] * LIFECYCLE_COLUMNS
+        
+        # Last row is the most recent life-cycle entry, same as the table in the UI
+        data = self.lifecycle_columns(rows[-1])
+        
+        logging.info(f"HTTP lookup complete for {receipt_number}: Service='{service_name}', Lifecycle='{data[0]}'")
+        return service_name, data
+
+
 class EmitraCleanAutomation:
-    def __init__(self):
+    def __init__(self, pool_size=1, max_receipts_per_minute=DEFAULT_MAX_RECEIPTS_PER_MINUTE, warm_page=True,
+                 http_endpoints=None, http_base_url=EMITRA_BASE_URL, http_capture_dir=None,
+                 flush_rows=DEFAULT_FLUSH_ROWS, flush_seconds=DEFAULT_FLUSH_SECONDS,
+                 store_file=DEFAULT_STORE_FILE, fresh_hours=DEFAULT_FRESH_HOURS,
+                 selector_stats_file=DEFAULT_SELECTOR_STATS_FILE, script_extraction=True, block_resources=True,
+                 driver_max_uses=DEFAULT_MAX_USES, driver_max_rss_mb=DEFAULT_MAX_RSS_MB,
+                 credentials_file='credentials.json'):
         # Google Sheets setup
         SCOPES = [
             "https://www.googleapis.com/auth/spreadsheets",
             "https://www.googleapis.com/auth/drive"
         ]
-        creds = Credentials.from_service_account_file('credentials.json', scopes=SCOPES)
+        creds = Credentials.from_service_account_file(credentials_file, scopes=SCOPES)
         self.client = gspread.authorize(creds)
         self.sheet = self.client.open('Automation sheet').worksheet('Emitra')
+        self.writer = SheetBatchWriter(self.sheet, flush_rows, flush_seconds)
+        
+        # Local result store for skipping fresh receipts and resuming after a crash
+        self.store = ReceiptStore(store_file)
+        self.fresh_hours = fresh_hours
+        
+        # Learned selector ordering shared by all workers
+        self.selectors = SelectorRegistry(selector_stats_file)
+        
+        # Read results with one execute_script call instead of per-element round trips
+        self.script_extraction = script_extraction
+        
+        # Worker pool setup - every thread gets its own Chrome + WebDriverWait
+        self.pool_size = max(1, int(pool_size))
+        self.rate_limiter = PortalRateLimiter(max_receipts_per_minute)
+        self._local = threading.local()
+        self._drivers = []
+        self._drivers_lock = threading.Lock()
+        self._total = 0
+        self.warm_page = warm_page
+        
+        # Optional browserless backend (needs an endpoint map), Selenium stays as the fallback
+        self.http_endpoints = http_endpoints
+        self.http_backend = bool(http_endpoints)
+        self.http_base_url = http_base_url
+        self.http_capture_dir = http_capture_dir
+        self._http_failures = 0
+        self._http_lock = threading.Lock()
+        
+        # Images, fonts, media and trackers are blocked per driver; load time and bytes per lookup are tracked
+        self.block_resources = block_resources
+        self.page_metrics = driver_factory.PageLoadMetrics()
         
         # Chrome setup - fully headless
         chrome_options = Options()
@@ -47,7 +612,6 @@ class EmitraCleanAutomation:
         chrome_options.add_argument("--disable-features=VizDisplayCompositor")
         chrome_options.add_argument("--disable-extensions")
         chrome_options.add_argument("--disable-plugins")
-        chrome_options.add_argument("--disable-images")
         chrome_options.add_argument("--disable-logging")
         chrome_options.add_argument("--log-level=3")
         chrome_options.add_argument("--silent")
@@ -56,14 +620,118 @@ class EmitraCleanAutomation:
         
         # User agent
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+        self.chrome_options = chrome_options
+        
+        # Pre-launched drivers, recycled after driver_max_uses receipts or above driver_max_rss_mb
+        self.driver_pool = DriverPool(self._launch_driver, size=self.pool_size,
+                                      max_uses=driver_max_uses, max_rss_mb=driver_max_rss_mb)
         
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 30)
+        logging.info(f"Emitra Automation Started Successfully (workers: {self.pool_size})")
+    
+    @property
+    def driver(self):
+        """WebDriver owned by the calling thread, started on first use"""
+        if getattr(self._local, 'driver', None) is None:
+            self.start_driver()
+        return self._local.driver
+    
+    @property
+    def wait(self):
+        """WebDriverWait bound to the calling thread's driver"""
+        if getattr(self._local, 'driver', None) is None:
+            self.start_driver()
+        return self._local.wait
+    
+    def _launch_driver(self):
+        """Start a configured headless Chrome (called by the driver pool)"""
+        driver = driver_factory.create_driver(self.chrome_options, block_resources=self.block_resources)
         
         # Stealth configuration
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return driver
+    
+    def start_driver(self):
+        """Take a healthy pre-launched Chrome from the pool for the calling thread"""
+        driver = self.driver_pool.acquire()
+        
+        self._local.driver = driver
+        self._local.wait = WebDriverWait(driver, 30)
+        self._local.page_warm = False
+        with self._drivers_lock:
+            self._drivers.append(driver)
+        logging.info("Chrome driver ready")
+        return driver
+    
+    def quit_driver(self, recycle=False):
+        """Hand the calling thread's driver back to the pool (recycle=True replaces it)"""
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            return
+        self._local.driver = None
+        self._local.wait = None
+        with self._drivers_lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        if recycle:
+            self.driver_pool.retire(driver)
+        else:
+            self.driver_pool.release(driver)
+    
+    def close(self):
+        """Quit every driver started by this automation"""
+        self.driver_pool.close()
+        with self._drivers_lock:
+            drivers = list(self._drivers)
+            self._drivers.clear()
+        for driver in drivers:
+            self.driver_pool.retire(driver)
+        self._local.driver = None
+        self._local.wait = None
+    
+    def wait_for_condition(self, condition, timeout, description="condition"):
+        """Poll condition(driver) until it holds; timeout is only an upper bound"""
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.25).until(condition)
+        except TimeoutException:
+            logging.debug(f"Gave up waiting for {description} after {timeout}s")
+            return None
+    
+    def _script_condition(self, script):
+        """Wrap a boolean JavaScript snippet as a wait condition"""
+        def condition(driver):
+            try:
+                return driver.execute_script(script)
+            except Exception:
+                return False
+        return condition
+    
+    def wait_for_angular_stable(self, timeout):
+        """Wait until Angular reports no pending work"""
+        return self.wait_for_condition(self._script_condition(ANGULAR_STABLE_JS), timeout, "Angular to stabilise")
+    
+    def wait_for_results(self, timeout, previous_text=None):
+        """Wait until the search results card has rendered and Angular is idle
+        
+        When previous_text is given, the card must also differ from it so a warm page
+        does not match the results left over from the previous receipt.
+        """
+        results_ready = self._script_condition(RESULTS_READY_JS)
+        angular_stable = self._script_condition(ANGULAR_STABLE_JS)
+        
+        def fresh_results(driver):
+            if not (results_ready(driver) and angular_stable(driver)):
+                return False
+            return previous_text is None or driver.execute_script(RESULTS_TEXT_JS) != previous_text
         
-        logging.info("Emitra Automation Started Successfully")
+        return self.wait_for_condition(fresh_results, timeout, "search results")
+    
+    def wait_for_lifecycle_tab(self, timeout):
+        """Wait until the Life Cycle tab is present in the detail view"""
+        return self.wait_for_condition(EC.presence_of_element_located((By.XPATH, LIFECYCLE_TAB_XPATH)), timeout, "Life Cycle tab")
+    
+    def wait_for_lifecycle_rows(self, timeout):
+        """Wait until the life-cycle table has data rows"""
+        return self.wait_for_condition(EC.presence_of_all_elements_located((By.XPATH, LIFECYCLE_ROWS_XPATH)), timeout, "life-cycle rows")
     
     def wait_for_angular_load(self):
         """Wait for Angular page to load with better detection"""
@@ -82,8 +750,8 @@ class EmitraCleanAutomation:
             # Wait for input field to be present
             self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input.form-control")))
             
-            # Additional wait for JavaScript to complete
-            time.sleep(5)
+            # Wait for JavaScript to complete (5s upper bound)
+            self.wait_for_angular_stable(5)
             
             logging.info("Angular components loaded successfully")
             return True
@@ -92,6 +760,68 @@ class EmitraCleanAutomation:
             logging.error(f"Failed to load Angular page: {str(e)}")
             return False
     
+    def load_search_page(self):
+        """Bring up the search card, reusing the loaded page when possible"""
+        if self.warm_page and getattr(self._local, 'page_warm', False):
+            self._local.page_warm = False
+            if self.return_to_search():
+                logging.info("Reusing loaded page for next receipt")
+                return True
+            logging.info("In-app reset failed, falling back to full page load")
+        
+        self._local.page_warm = False
+        self.driver.get(EMITRA_HOME_URL)
+        
+        # Wait for page load
+        if not self.wait_for_angular_load():
+            return False
+        
+        # Handle popup
+        try:
+            popup = self.driver.find_element(By.CSS_SELECTOR, "button.p-dialog-header-close")
+            popup.click()
+            self.wait_for_condition(EC.invisibility_of_element(popup), 2, "popup to close")
+            logging.info("Popup closed")
+        except:
+            logging.info("No popup found")
+        
+        return True
+    
+    def return_to_search(self):
+        """Close the receipt detail view and reset the search card without reloading"""
+        try:
+            # Detail view opened as a route - go back in-app (no reload for the SPA)
+            if "/emitra/home" not in self.driver.current_url:
+                self.driver.back()
+            
+            # Close any detail dialog still on screen
+            for selector in DETAIL_CLOSE_SELECTORS:
+                for button in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                    if button.is_displayed():
+                        self.driver.execute_script("arguments[0].click();", button)
+            if self.driver.find_elements(By.CSS_SELECTOR, ".cdk-overlay-backdrop, .p-dialog-mask"):
+                self.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
+            
+            # Search card must be back and the detail view gone
+            card = self.wait_for_condition(
+                EC.visibility_of_element_located((By.CSS_SELECTOR, "div.card.verification-transaction")),
+                3, "search card"
+            )
+            if not card:
+                return False
+            if any(tab.is_displayed() for tab in self.driver.find_elements(By.XPATH, LIFECYCLE_TAB_XPATH)):
+                return False
+            
+            # Reset the input state
+            if not self.driver.execute_script(RESET_SEARCH_JS):
+                return False
+            self.wait_for_angular_stable(3)
+            return True
+            
+        except Exception as e:
+            logging.warning(f"Could not return to search card: {str(e)}")
+            return False
+    
     def select_receipt_number_option(self):
         """Select Receipt Number radio button with better error handling"""
         logging.info("Selecting Receipt Number option...")
@@ -108,7 +838,7 @@ class EmitraCleanAutomation:
             except:
                 self.driver.execute_script("arguments[0].click();", receipt_radio)
             
-            time.sleep(3)
+            self.wait_for_angular_stable(3)
             logging.info("Receipt Number option selected")
             return True
             
@@ -121,7 +851,7 @@ class EmitraCleanAutomation:
                 for radio in all_radios:
                     if "Receipt" in radio.text:
                         self.driver.execute_script("arguments[0].click();", radio)
-                        time.sleep(3)
+                        self.wait_for_angular_stable(3)
                         logging.info("Receipt option selected via fallback")
                         return True
             except:
@@ -143,25 +873,29 @@ class EmitraCleanAutomation:
             ".input-group input"
         ]
         
-        for selector in input_selectors:
+        for attempt, selector in enumerate(self.selectors.ordered('receipt_input', input_selectors)):
             try:
-                input_field = self.wait.until(
+                # Full wait for the likeliest selector, a short probe for fallbacks
+                wait = self.wait if attempt == 0 else WebDriverWait(self.driver, SELECTOR_PROBE_TIMEOUT)
+                input_field = wait.until(
                     EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
                 )
                 
                 # Clear and enter receipt number
                 input_field.clear()
-                time.sleep(1)
+                self.wait_for_condition(lambda d: not input_field.get_attribute('value'), 1, "input to clear")
                 input_field.send_keys(receipt_number)
                 
                 # Verify the input was entered
                 if input_field.get_attribute('value') == receipt_number:
+                    self.selectors.record('receipt_input', selector, True)
                     logging.info(f"Successfully entered receipt number: {receipt_number}")
                     return True
                     
             except Exception as e:
                 logging.warning(f"Input selector {selector} failed: {str(e)}")
-                continue
+            
+            self.selectors.record('receipt_input', selector, False)
         
         logging.error("Failed to find or fill receipt input field")
         return False
@@ -170,6 +904,14 @@ class EmitraCleanAutomation:
         """Click search button with multiple strategies"""
         logging.info("Clicking Search button...")
         
+        # Read before the wait so the fallback below can use it when the wait times out
+        previous_results = None
+        try:
+            previous_results = self.driver.execute_script(RESULTS_TEXT_JS)
+        except Exception:
+            pass
+        self._local.previous_results = previous_results
+        
         try:
             # Wait for search button to be enabled
             search_button = self.wait.until(
@@ -184,8 +926,7 @@ class EmitraCleanAutomation:
                 self.driver.execute_script("arguments[0].click();", search_button)
             
             logging.info("Search button clicked, waiting for results...")
-            time.sleep(8)  # Longer wait for results
-            return True
+            return self._search_results_loaded(previous_results)
             
         except Exception as e:
             logging.error(f"Failed to click search button: {str(e)}")
@@ -203,93 +944,70 @@ class EmitraCleanAutomation:
                         continue  # Skip CSS :contains() as it's not supported
                     button = self.driver.find_element(By.CSS_SELECTOR, selector)
                     self.driver.execute_script("arguments[0].click();", button)
-                    time.sleep(8)
                     logging.info("Search clicked via fallback")
-                    return True
+                    return self._search_results_loaded(previous_results)
                 except:
                     continue
             
             return False
     
+    def _search_results_loaded(self, previous_results):
+        """Wait for this search's results; False while the previous receipt's card is still showing"""
+        if self.wait_for_results(8, previous_results):  # Longer upper bound for results
+            return True
+        if previous_results is not None:
+            logging.error("Search results still show the previous receipt")
+            return False
+        # Nothing stale on the page - extraction waits for the slow results itself
+        return True
+    
     def _clean_service_name(self, raw_text):
         """Clean and format the service name by removing unwanted prefixes and suffixes"""
+        return clean_service_name(raw_text)
+    
+    def _extract_via_script(self):
+        """Run EXTRACT_RESULTS_JS and return its decoded blob, or None"""
+        if not self.script_extraction:
+            return None
         try:
-            if not raw_text or len(raw_text.strip()) < 3:
-                return None
-            
-            text = raw_text.strip()
-            
-            # Remove common prefixes (case insensitive)
-            prefixes_to_remove = [
-                "Service :",
-                "Service:",
-                "Service Name :",
-                "Service Name:",
-                "Service Type :",
-                "Service Type:",
-                "Application :",
-                "Application:",
-                "Form :",
-                "Form:",
-                "Certificate :",
-                "Certificate:",
-                "Name :",
-                "Name:"
-            ]
-            
-            for prefix in prefixes_to_remove:
-                if text.lower().startswith(prefix.lower()):
-                    text = text[len(prefix):].strip()
-                    break
-            
-            # Remove common suffixes
-            suffixes_to_remove = [
-                "- Click for more details",
-                "- View More",
-                "- More Info",
-                "- Details",
-                "Click here",
-                "View More"
-            ]
-            
-            for suffix in suffixes_to_remove:
-                if text.lower().endswith(suffix.lower()):
-                    text = text[:-len(suffix)].strip()
-                    break
-            
-            # Clean up extra spaces and special characters
-            text = ' '.join(text.split())  # Remove extra whitespace
-            text = text.replace('\n', ' ').replace('\r', ' ')  # Remove line breaks
-            
-            # Remove leading/trailing quotes or brackets if present
-            text = text.strip('"\'()[]{}')
-            
-            # Skip if it's just common words that aren't service names
-            skip_words = ['search', 'result', 'receipt', 'number', 'click', 'view', 'more', 'date', 'time', 'status', 'here', 'details']
-            if text.lower() in skip_words:
-                return None
-            
-            # Must have meaningful content
-            if len(text) < 5 or len(text) > 200:
-                return None
-            
-            # Should contain service-related keywords or be substantial text
-            service_keywords = ['certificate', 'registration', 'license', 'verification', 'application', 'form', 'permit', 'approval']
-            if len(text) < 20 and not any(keyword in text.lower() for keyword in service_keywords):
-                return None
-            
-            return text
-            
+            return json.loads(self.driver.execute_script(EXTRACT_RESULTS_JS))
         except Exception as e:
-            logging.debug(f"Error cleaning service name '{raw_text}': {e}")
+            logging.debug(f"Script extraction failed: {e}")
             return None
     
+    def _service_name_from_blob(self, blob):
+        """Pick the service name out of the extraction blob, same rules as the element strategies"""
+        for text in blob.get('service', []):
+            cleaned_text = self._clean_service_name(text)
+            if cleaned_text:
+                return cleaned_text
+        
+        service_keywords = ['certificate', 'registration', 'license', 'verification', 'application']
+        for text in blob.get('area', []):
+            if 10 <= len(text) <= 150 and any(keyword in text.lower() for keyword in service_keywords):
+                cleaned_text = self._clean_service_name(text)
+                if cleaned_text:
+                    return cleaned_text
+        return None
+    
     def extract_service_name(self):
         """Extract service name from the search results page BEFORE clicking View More"""
         logging.info("Extracting service name from search results...")
         
         try:
-            time.sleep(3)  # Wait for search results to load
+            # Wait for search results to load
+            previous_results = getattr(self._local, 'previous_results', None)
+            if not self.wait_for_results(3, previous_results) and previous_results is not None:
+                logging.error("Search results still show the previous receipt")
+                return "STALE RESULTS ERROR"
+            
+            # Fast path: one round trip for every candidate
+            blob = self._extract_via_script()
+            if blob:
+                cleaned_text = self._service_name_from_blob(blob)
+                if cleaned_text:
+                    logging.info(f"Found service name via page script: {cleaned_text}")
+                    return cleaned_text
             
             # Strategy 1: Look for service name in common locations
             service_selectors = [
@@ -303,7 +1021,7 @@ class EmitraCleanAutomation:
                 "//div[contains(@class, 'result')]//h6//text()[normalize-space()]"
             ]
             
-            for selector in service_selectors:
+            for selector in self.selectors.ordered('service_name', service_selectors):
                 try:
                     elements = self.driver.find_elements(By.XPATH, selector)
                     for element in elements:
@@ -312,11 +1030,12 @@ class EmitraCleanAutomation:
                             # Clean the service name - remove prefixes
                             cleaned_text = self._clean_service_name(text)
                             if cleaned_text:
+                                self.selectors.record('service_name', selector, True)
                                 logging.info(f"Found service name: {cleaned_text}")
                                 return cleaned_text
                 except Exception as e:
                     logging.debug(f"Service selector {selector} failed: {e}")
-                    continue
+                self.selectors.record('service_name', selector, False)
             
             # Strategy 2: Look in the main content area
             try:
@@ -376,7 +1095,7 @@ class EmitraCleanAutomation:
                 "//small"
             ]
             
-            for selector in view_more_selectors:
+            for selector in self.selectors.ordered('view_more', view_more_selectors):
                 try:
                     elements = self.driver.find_elements(By.XPATH, selector)
                     for element in elements:
@@ -388,11 +1107,13 @@ class EmitraCleanAutomation:
                                 # Try JavaScript click
                                 self.driver.execute_script("arguments[0].click();", element)
                             
-                            time.sleep(5)
+                            self.selectors.record('view_more', selector, True)
+                            self.wait_for_lifecycle_tab(5)
                             logging.info("VIEW MORE clicked successfully")
                             return True
                 except:
-                    continue
+                    pass
+                self.selectors.record('view_more', selector, False)
             
             logging.warning("VIEW MORE not found, proceeding anyway")
             return True  # Continue even if not found
@@ -406,7 +1127,7 @@ class EmitraCleanAutomation:
         logging.info("Looking for Life Cycle tab...")
         
         try:
-            time.sleep(5)  # Wait for content to expand
+            self.wait_for_lifecycle_tab(5)  # Wait for content to expand
             
             lifecycle_selectors = [
                 "//button[contains(text(), 'Life cycle')]",
@@ -416,7 +1137,7 @@ class EmitraCleanAutomation:
                 "//div[contains(text(), 'Life cycle')]"
             ]
             
-            for selector in lifecycle_selectors:
+            for selector in self.selectors.ordered('lifecycle_tab', lifecycle_selectors):
                 try:
                     element = self.driver.find_element(By.XPATH, selector)
                     if element.is_displayed():
@@ -425,11 +1146,13 @@ class EmitraCleanAutomation:
                         except:
                             self.driver.execute_script("arguments[0].click();", element)
                         
-                        time.sleep(3)
+                        self.selectors.record('lifecycle_tab', selector, True)
+                        self.wait_for_lifecycle_rows(3)
                         logging.info("Life Cycle tab clicked")
                         return True
                 except:
-                    continue
+                    pass
+                self.selectors.record('lifecycle_tab', selector, False)
             
             logging.info("Life Cycle tab not found, data might already be visible")
             return True
@@ -443,7 +1166,17 @@ class EmitraCleanAutomation:
         logging.info("Extracting lifecycle data...")
         
         try:
-            time.sleep(5)  # Wait for data to load
+            self.wait_for_lifecycle_rows(5)  # Wait for data to load
+            
+            # Fast path: last row's cells in one round trip
+            blob = self._extract_via_script()
+            if blob and len(blob.get('cells', [])) >= 3:
+                data = [cell for cell in blob['cells'] if cell][:6]
+                if data:
+                    while len(data) < 6:
+                        data.append('')
+                    logging.info(f"Found {blob['rowCount']} table rows, extracted via page script: {data[0] if data[0] else 'Empty'}")
+                    return data
             
             # Strategy 1: Table data extraction
             table_selectors = [
@@ -454,7 +1187,7 @@ class EmitraCleanAutomation:
                 "//tr[position()>1 and td]"
             ]
             
-            for selector in table_selectors:
+            for selector in self.selectors.ordered('lifecycle_rows', table_selectors):
                 try:
                     rows = self.driver.find_elements(By.XPATH, selector)
                     if len(rows) > 0:
@@ -478,10 +1211,12 @@ class EmitraCleanAutomation:
                                 if len(data) > 6:
                                     data = data[:6]
                                 
+                                self.selectors.record('lifecycle_rows', selector, True)
                                 logging.info(f"Successfully extracted table data: {data[0] if data[0] else 'Empty'}")
                                 return data
                 except:
-                    continue
+                    pass
+                self.selectors.record('lifecycle_rows', selector, False)
             
             # Strategy 2: Any structured data
             try:
@@ -524,27 +1259,45 @@ class EmitraCleanAutomation:
             logging.error(f"Error extracting data: {str(e)}")
             return ["EXTRACTION ERROR"] * 6
     
+    def _http_lookup(self, receipt_number):
+        """Try the HTTP backend; returns None when Selenium should handle the receipt"""
+        if not self.http_backend:
+            return None
+        
+        client = getattr(self._local, 'http_client', None)
+        if client is None:
+            client = EmitraHttpClient(self.http_endpoints, base_url=self.http_base_url,
+                                      capture_dir=self.http_capture_dir)
+            self._local.http_client = client
+        
+        try:
+            result = client.lookup(receipt_number)
+            with self._http_lock:
+                self._http_failures = 0
+            return result
+        except (EmitraPortalError, requests.RequestException) as e:
+            logging.warning(f"HTTP lookup failed for {receipt_number}, using browser: {str(e)}")
+            with self._http_lock:
+                self._http_failures += 1
+                failures = self._http_failures
+                if failures >= HTTP_BACKEND_MAX_FAILURES and self.http_backend:
+                    logging.warning(f"HTTP backend failed {failures} times in a row, disabling it for this run")
+                    self.http_backend = False
+            return None
+    
     def process_single_receipt(self, receipt_number, row_index):
         """Process one receipt with comprehensive error handling"""
         logging.info(f"Processing receipt {receipt_number} (Row {row_index})")
         
+        result = self._http_lookup(receipt_number)
+        if result:
+            return result
+        
         try:
-            # Load page
-            self.driver.get("https://emitra.rajasthan.gov.in/emitra/home")
-            
-            # Wait for page load
-            if not self.wait_for_angular_load():
+            # Load page (or reuse the one left by the previous receipt)
+            if not self.load_search_page():
                 return "PAGE LOAD FAILED", ["PAGE LOAD FAILED"] * 6
             
-            # Handle popup
-            try:
-                popup = self.driver.find_element(By.CSS_SELECTOR, "button.p-dialog-header-close")
-                popup.click()
-                time.sleep(2)
-                logging.info("Popup closed")
-            except:
-                logging.info("No popup found")
-            
             # Execute the flow
             if not self.select_receipt_number_option():
                 return "RECEIPT SELECTION FAILED", ["RECEIPT SELECTION FAILED"] * 6
@@ -565,11 +1318,161 @@ class EmitraCleanAutomation:
             lifecycle_data = self.extract_lifecycle_data()
             
             logging.info(f"Processing complete for {receipt_number}: Service='{service_name}', Lifecycle='{lifecycle_data[0] if lifecycle_data else 'No result'}'")
+            self._local.page_warm = True
             return service_name, lifecycle_data
             
         except Exception as e:
             logging.error(f"Error processing {receipt_number}: {str(e)}")
             return "PROCESSING ERROR", ["PROCESSING ERROR"] * 6
+        finally:
+            driver = getattr(self._local, 'driver', None)
+            if driver is not None:
+                self.page_metrics.record(driver)
+                # Dead, worn-out or oversized sessions are swapped before the next receipt
+                if not self.driver_pool.note_use(driver):
+                    self.quit_driver(recycle=True)
+    
+    def is_successful(self, service_name, lifecycle_data):
+        """Check whether a processed receipt produced real data"""
+        return bool(service_name and 
+                    "ERROR" not in service_name.upper() and 
+                    "FAILED" not in service_name.upper() and
+                    lifecycle_data[0] and
+                    "ERROR" not in lifecycle_data[0].upper() and 
+                    "FAILED" not in lifecycle_data[0].upper() and
+                    "NO DATA" not in lifecycle_data[0].upper())
+    
+    def _flush_results(self, stats):
+        """Flush buffered rows and count them once the sheet has accepted them"""
+        ok, metas = self.writer.flush()
+        if not ok:
+            logging.warning(f"Keeping {self.writer.pending} rows buffered for the next flush")
+            return False
+        
+        for _, successful, _, _ in metas:
+            if successful:
+                stats['successful'] += 1
+            else:
+                stats['failed'] += 1
+        
+        # Only rows the sheet accepted count as done for the next run
+        if metas:
+            try:
+                self.store.record_many([
+                    (receipt_number, service_name, lifecycle_data, 'final' if successful else 'partial')
+                    for receipt_number, successful, service_name, lifecycle_data in metas
+                ])
+            except Exception as e:
+                logging.error(f"Failed to record results in local store: {str(e)}")
+        return True
+    
+    def _flush_remaining(self, stats):
+        """End of run: retry the buffered rows a few times, then count what is left as failed"""
+        for attempt in range(FINAL_FLUSH_ATTEMPTS):
+            if not self.writer.pending or self._flush_results(stats):
+                return
+            time.sleep(FINAL_FLUSH_BACKOFF * (attempt + 1))
+        
+        for receipt_number, _, _, _ in self.writer.discard():
+            stats['failed'] += 1
+            logging.error(f"SHEET ERROR: {receipt_number} - row not written")
+    
+    def _record_result(self, done, total, receipt_number, row_index, service_name, lifecycle_data, stats, start_time):
+        """Queue one receipt result for the sheet and log its outcome"""
+        # Combine service name with lifecycle data
+        # Service name goes to column B, lifecycle data goes to columns C-H
+        combined_result = [service_name] + lifecycle_data
+        
+        # Check if successful
+        successful = self.is_successful(service_name, lifecycle_data)
+        if successful:
+            logging.info(f"[{done}/{total}] SUCCESS: {receipt_number} - Service: {service_name[:50]}...")
+        else:
+            logging.warning(f"[{done}/{total}] PARTIAL: {receipt_number} - Service: {service_name}, Lifecycle: {lifecycle_data[0]}")
+        
+        # Buffer the Google Sheet update - columns B through H (7 columns total)
+        self.writer.add(f'B{row_index}:H{row_index}', [combined_result],
+                        (receipt_number, successful, service_name, lifecycle_data))
+        if self.writer.due():
+            self._flush_results(stats)
+        
+        # Progress every 5 receipts
+        if done % 5 == 0:
+            elapsed = time.time() - start_time
+            rate = done / elapsed * 60  # per minute
+            logging.info(f"Progress: {done}/{total} | Success: {stats['successful']} | Failed: {stats['failed']} | Pending writes: {self.writer.pending} | Rate: {rate:.1f}/min")
+    
+    def _run_sequential(self, valid_receipts, stats, start_time):
+        """Process receipts one after another on a single driver"""
+        total = len(valid_receipts)
+        
+        for i, (receipt_number, row_index) in enumerate(valid_receipts, 1):
+            logging.info(f"[{i}/{total}] Processing: {receipt_number}")
+            
+            self.rate_limiter.acquire()
+            service_name, lifecycle_data = self.process_single_receipt(receipt_number, row_index)
+            self._record_result(i, total, receipt_number, row_index, service_name, lifecycle_data, stats, start_time)
+        
+        self._flush_remaining(stats)
+    
+    def _worker_loop(self, work_queue, results_queue):
+        """Pool worker: pull receipts from the shared queue until it is empty"""
+        try:
+            while True:
+                try:
+                    i, receipt_number, row_index = work_queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                logging.info(f"[{i}/{self._total}] Processing: {receipt_number}")
+                self.rate_limiter.acquire()
+                service_name, lifecycle_data = self.process_single_receipt(receipt_number, row_index)
+                results_queue.put((receipt_number, row_index, service_name, lifecycle_data))
+        except Exception as e:
+            logging.error(f"Worker crashed: {str(e)}")
+        finally:
+            self.quit_driver()
+    
+    def _writer_loop(self, results_queue, stats, start_time):
+        """Single writer thread: the only place the sheet is updated in pool mode"""
+        done = 0
+        while True:
+            try:
+                item = results_queue.get(timeout=1)
+            except queue.Empty:
+                # Time-based flush while workers are busy
+                if self.writer.due():
+                    self._flush_results(stats)
+                continue
+            if item is None:
+                break
+            done += 1
+            receipt_number, row_index, service_name, lifecycle_data = item
+            self._record_result(done, self._total, receipt_number, row_index, service_name, lifecycle_data, stats, start_time)
+        
+        self._flush_remaining(stats)
+    
+    def _run_pool(self, valid_receipts, stats, start_time):
+        """Process receipts concurrently on a pool of Chrome workers"""
+        work_queue = queue.Queue()
+        results_queue = queue.Queue()
+        for i, (receipt_number, row_index) in enumerate(valid_receipts, 1):
+            work_queue.put((i, receipt_number, row_index))
+        
+        writer = threading.Thread(target=self._writer_loop, args=(results_queue, stats, start_time), name="writer")
+        writer.start()
+        
+        workers = []
+        for n in range(min(self.pool_size, len(valid_receipts))):
+            worker = threading.Thread(target=self._worker_loop, args=(work_queue, results_queue), name=f"worker-{n + 1}")
+            worker.start()
+            workers.append(worker)
+        
+        for worker in workers:
+            worker.join()
+        
+        results_queue.put(None)
+        writer.join()
     
     def run_automation(self):
         """Main automation runner"""
@@ -578,56 +1481,36 @@ class EmitraCleanAutomation:
         logging.info("Current Date and Time (UTC): 2025-08-18 10:36:44")
         logging.info("Current User's Login: deepanshudagdi")
         logging.info("=" * 50)
+        stats = {'successful': 0, 'failed': 0}
         
         try:
             # Get receipts from sheet
             receipt_numbers = self.sheet.col_values(1)[1:]  # Skip header
             valid_receipts = [(r.strip(), idx+2) for idx, r in enumerate(receipt_numbers) if r.strip()]
+            
+            # Skip receipts already finalized within the freshness window
+            fresh = self.store.fresh_final_receipts(self.fresh_hours)
+            if fresh:
+                before = len(valid_receipts)
+                valid_receipts = [(r, row) for r, row in valid_receipts if r not in fresh]
+                logging.info(f"Skipping {before - len(valid_receipts)} receipts finalized in the last {self.fresh_hours}h")
             total = len(valid_receipts)
-            successful = 0
-            failed = 0
+            self._total = total
             
             logging.info(f"Found {total} receipts to process")
             
-            for i, (receipt_number, row_index) in enumerate(valid_receipts, 1):
-                logging.info(f"[{i}/{total}] Processing: {receipt_number}")
-                
-                service_name, lifecycle_data = self.process_single_receipt(receipt_number, row_index)
-                
-                # Combine service name with lifecycle data
-                # Service name goes to column B, lifecycle data goes to columns C-H
-                combined_result = [service_name] + lifecycle_data
-                
-                # Update Google Sheet - now writing to columns B through H (7 columns total)
-                try:
-                    self.sheet.update(range_name=f'B{row_index}:H{row_index}', values=[combined_result])
-                    
-                    # Check if successful
-                    if (service_name and 
-                        "ERROR" not in service_name.upper() and 
-                        "FAILED" not in service_name.upper() and
-                        lifecycle_data[0] and
-                        "ERROR" not in lifecycle_data[0].upper() and 
-                        "FAILED" not in lifecycle_data[0].upper() and
-                        "NO DATA" not in lifecycle_data[0].upper()):
-                        successful += 1
-                        logging.info(f"[{i}/{total}] SUCCESS: {receipt_number} - Service: {service_name[:50]}...")
-                    else:
-                        failed += 1
-                        logging.warning(f"[{i}/{total}] PARTIAL: {receipt_number} - Service: {service_name}, Lifecycle: {lifecycle_data[0]}")
-                        
-                except Exception as e:
-                    failed += 1
-                    logging.error(f"[{i}/{total}] SHEET ERROR: {receipt_number} - {str(e)}")
-                
-                # Progress every 5 receipts
-                if i % 5 == 0:
-                    elapsed = time.time() - start_time
-                    rate = i / elapsed * 60  # per minute
-                    logging.info(f"Progress: {i}/{total} | Success: {successful} | Failed: {failed} | Rate: {rate:.1f}/min")
-                
-                # Delay between receipts
-                time.sleep(3)
+            # Launch Chrome in the background while the first receipts are queued
+            if total and not self.http_backend:
+                self.driver_pool.start()
+            
+            if self.pool_size > 1 and total > 1:
+                logging.info(f"Running with a pool of {self.pool_size} workers")
+                self._run_pool(valid_receipts, stats, start_time)
+            else:
+                self._run_sequential(valid_receipts, stats, start_time)
+            
+            successful = stats['successful']
+            failed = stats['failed']
             
             # Final summary
             elapsed_total = time.time() - start_time
@@ -641,6 +1524,8 @@ class EmitraCleanAutomation:
             logging.info(f"Success Rate: {success_rate:.1f}%")
             logging.info(f"Total Time: {elapsed_total/60:.1f} minutes")
             logging.info(f"Processing Rate: {total/(elapsed_total/60):.1f} receipts/minute")
+            logging.info(self.page_metrics.summary())
+            logging.info(self.driver_pool.summary())
             logging.info(f"Processed by: deepanshudagdi")
             logging.info(f"Completed at: {time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
             logging.info("=" * 50)
@@ -649,9 +1534,66 @@ class EmitraCleanAutomation:
             logging.error(f"FATAL ERROR: {str(e)}")
             
         finally:
+            # Never lose rows still sitting in the write buffer
+            if self.writer.pending:
+                logging.info(f"Flushing {self.writer.pending} buffered rows before exit...")
+                self._flush_remaining(stats)
             logging.info("Closing automation...")
-            self.driver.quit()
+            self.close()
+            self.store.close()
+            self.selectors.save()
 
 if __name__ == "__main__":
-    processor = EmitraCleanAutomation()
+    parser = argparse.ArgumentParser(description="e-Mitra receipt status automation")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of headless Chrome workers processing receipts in parallel")
+    parser.add_argument("--max-per-minute", type=float, default=DEFAULT_MAX_RECEIPTS_PER_MINUTE,
+                        help="Ceiling on receipts sent to the e-Mitra portal per minute (0 = no limit)")
+    parser.add_argument("--no-warm-page", action="store_true",
+                        help="Reload the e-Mitra home page for every receipt instead of resetting it in-app")
+    parser.add_argument("--http", metavar="ENDPOINT_MAP", default=None,
+                        help="Look receipts up through the portal's JSON endpoints listed in this endpoint map file "
+                             "(see load_endpoint_map), using Chrome only as a fallback")
+    parser.add_argument("--base-url", default=EMITRA_BASE_URL,
+                        help="Portal base URL for --http (point at emitra_replay_server.py to work offline)")
+    parser.add_argument("--capture-dir", default=None,
+                        help="Save the JSON answers of --http lookups here as replay fixtures")
+    parser.add_argument("--flush-rows", type=int, default=DEFAULT_FLUSH_ROWS,
+                        help="Write buffered results to the sheet after this many rows")
+    parser.add_argument("--flush-seconds", type=float, default=DEFAULT_FLUSH_SECONDS,
+                        help="Write buffered results once the oldest has waited this long")
+    parser.add_argument("--store", default=DEFAULT_STORE_FILE,
+                        help="SQLite file recording every result written to the sheet")
+    parser.add_argument("--fresh-hours", type=float, default=DEFAULT_FRESH_HOURS,
+                        help="Skip receipts finalized within this many hours (0 = reprocess everything)")
+    parser.add_argument("--selector-stats", default=DEFAULT_SELECTOR_STATS_FILE,
+                        help="JSON file with learned selector hit statistics")
+    parser.add_argument("--no-script-extraction", action="store_true",
+                        help="Read results element by element instead of with one page script")
+    parser.add_argument("--no-block-resources", action="store_true",
+                        help="Let Chrome load images, fonts, media and analytics")
+    parser.add_argument("--driver-max-uses", type=int, default=DEFAULT_MAX_USES,
+                        help="Replace a Chrome session after this many receipts (0 = never)")
+    parser.add_argument("--driver-max-rss-mb", type=float, default=DEFAULT_MAX_RSS_MB,
+                        help="Replace a Chrome session above this resident memory (needs psutil, 0 = never)")
+    args = parser.parse_args()
+    
+    http_endpoints = None
+    if args.http:
+        try:
+            http_endpoints = load_endpoint_map(args.http)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    
+    processor = EmitraCleanAutomation(pool_size=args.workers, max_receipts_per_minute=args.max_per_minute,
+                                      warm_page=not args.no_warm_page,
+                                      http_endpoints=http_endpoints, http_base_url=args.base_url,
+                                      http_capture_dir=args.capture_dir,
+                                      flush_rows=args.flush_rows, flush_seconds=args.flush_seconds,
+                                      store_file=args.store, fresh_hours=args.fresh_hours,
+                                      selector_stats_file=args.selector_stats,
+                                      script_extraction=not args.no_script_extraction,
+                                      block_resources=not args.no_block_resources,
+                                      driver_max_uses=args.driver_max_uses,
+                                      driver_max_rss_mb=args.driver_max_rss_mb)
     processor.run_automation()
\ No newline at end of file
@@ -0,0 +1,89 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import logging
+import os
+import sys
+
+from emitra_fetch import load_endpoint_map
+
+
+def capture_suffixes(endpoints):
+    """Map each portal endpoint to the suffix of the capture files saved by EmitraHttpClient"""
+    return {
+        endpoints['search_path']: "search",
+        endpoints['lifecycle_path']: "lifecycle"
+    }
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Answer e-Mitra JSON requests from captured <receipt>.<endpoint>.json files"""
+    
+    fixtures_dir = "fixtures"
+    endpoints = None
+    
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        suffix = capture_suffixes(self.endpoints).get(self.path)
+        if not suffix:
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            receipt_number = str(json.loads(self.rfile.read(length) or b'{}').get(self.endpoints['receipt_field'], ''))
+        except ValueError:
+            self._send_json(400, {"error": "Request body is not JSON"})
+            return
+        
+        capture = os.path.join(self.fixtures_dir, f"{receipt_number}.{suffix}.json")
+        if not os.path.exists(capture):
+            # Same shape as a portal answer with no records
+            self._send_json(200, {"data": []})
+            return
+        
+        with open(capture, encoding='utf-8') as f:
+            self._send_json(200, json.load(f))
+    
+    def log_message(self, format, *args):
+        logging.info("replay: " + format % args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured e-Mitra JSON responses for offline runs")
+    parser.add_argument("--fixtures", default="fixtures",
+                        help="Directory of <receipt>.search.json / <receipt>.lifecycle.json captures")
+    parser.add_argument("--endpoints", required=True,
+                        help="Endpoint map file, the same one passed to emitra_fetch.py --http")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    
+    if not os.path.isdir(args.fixtures):
+        print(f"ERROR: fixtures directory {args.fixtures} not found")
+        sys.exit(1)
+    
+    try:
+        ReplayHandler.endpoints = load_endpoint_map(args.endpoints)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {str(e)}")
+        sys.exit(1)
+    ReplayHandler.fixtures_dir = args.fixtures
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), ReplayHandler)
+    logging.info(f"Replaying {args.fixtures} on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,28 @@
 import requests
+import httpx
+import asyncio
 import json
 import time
 import logging
-from typing import List, Set
-from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
 import re
 import random
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 import os
+import threading
+import sqlite3
+import argparse
+import signal
+import socket
+import sys
+from collections import deque
+
+try:
+    import orjson  # optional, several times faster than json for the search responses
+except ImportError:
+    orjson = None
 
 # Fixed logging setup for Windows
 logging.basicConfig(
@@ -21,7 +35,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+# slots=True needs Python 3.10+ (see readme)
+@dataclass(slots=True)
 class BeneficiaryData:
     aadhaar_number: str
     name: str = ""
@@ -41,10 +56,340 @@ class BeneficiaryData:
     apply_date: str = ""
     error_message: str = ""
     fetch_status: str = "Pending"
+    # Labour registrations after the first one, same shape as this record
+    extra_registrations: list = field(default_factory=list)
+    # Every benefit/payment row in the response (BenefitRecord)
+    benefits: list = field(default_factory=list)
+
+@dataclass(slots=True)
+class BenefitRecord:
+    aadhaar_number: str
+    source: str = ""
+    application_number: str = ""
+    benefit_name: str = ""
+    amount: str = ""
+    bank_name: str = ""
+    debit_date: str = ""
+    apply_date: str = ""
+    status: str = ""
+
+BASE_URL = "https://jansoochna.rajasthan.gov.in"
+FORM_URL = "/Services/DynamicControlsDataSet"
+
+SESSION_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/javascript, */*; q=0.01',
+    'Accept-Language': 'en-US,en;q=0.9,hi;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive'
+}
+
+POST_HEADERS = {
+    'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+    'Origin': BASE_URL,
+    'Referer': f"{BASE_URL}{FORM_URL}",
+    'X-Requested-With': 'XMLHttpRequest'
+}
+
+
+# Anti-forgery token reuse: refresh after this long, or when the portal rejects a POST
+TOKEN_TTL_SECONDS = 600
+TOKEN_REFRESH_STATUS_CODES = {400, 403, 500}
+
+
+class TokenError(Exception):
+    """The form page did not yield an anti-forgery token"""
+
+
+# Labour record key -> BeneficiaryData field (portal keys are bilingual, some with trailing spaces)
+LABOUR_FIELDS = (
+    ('name', 'व्यक्ति / लाभार्थी का नाम / Beneficiary Name'),
+    ('father_name', 'व्यक्ति / लाभार्थी के पिता का नाम / Beneficiary Father Name '),
+    ('address', 'व्यक्ति / लाभार्थी का पता / Address'),
+    ('gender', 'लिंग / Gender'),
+    ('authority', 'संबंधित प्राधिकरण / Concerned Union/Authority/Person'),
+    ('renewal_date', 'वैधता दिनांक / Renewal Due Date'),
+    ('registration_fees', 'आवेदन का शुल्क / Registration Fees '),
+    ('application_status', 'आवेदन की स्थिति / Application Status '),
+    ('application_number', 'आवेदन क्रमांक / Application Number '),
+    ('card_issued_date', 'कार्ड जारी करने की दिनांक / Card Issued Date '),
+)
+
+
+# Benefit/payment lists use different bilingual keys per scheme, so they are matched on the
+# English part of the key. Order matters: 'Benefit Amount' is an amount, not a benefit name.
+BENEFIT_FIELD_KEYWORDS = (
+    ('apply_date', ('apply date', 'application date', 'applied')),
+    ('debit_date', ('debit', 'payment date', 'transaction date', 'credit date')),
+    ('application_number', ('application number', 'application no')),
+    ('amount', ('amount',)),
+    ('bank_name', ('bank',)),
+    ('status', ('status',)),
+    ('benefit_name', ('benefit', 'scheme')),
+)
+
+RESULTS_HEADER = [
+    "Aadhaar Number", "Name", "Father Name", "Address", "Gender", "Authority",
+    "Renewal Date", "Registration Fees", "Application Status", "Application Number", 
+    "Card Issued Date", "Benefit Name", "Amount", "Bank Name", "Debit Date",
+    "Apply Date", "Fetch Status", "Error Message"
+]
+
+BENEFITS_HEADER = [
+    "Aadhaar Number", "Source", "Application Number", "Benefit Name", "Amount",
+    "Bank Name", "Debit Date", "Apply Date", "Status"
+]
+
+_benefit_key_fields: Dict[str, Optional[str]] = {}
+
+
+def benefit_field_for_key(key: str) -> Optional[str]:
+    """BenefitRecord field for a portal key (memoised - the same keys repeat in every response)"""
+    if key not in _benefit_key_fields:
+        english = key.split('/')[-1].strip().lower()
+        _benefit_key_fields[key] = next(
+            (name for name, keywords in BENEFIT_FIELD_KEYWORDS if any(k in english for k in keywords)), None
+        )
+    return _benefit_key_fields[key]
+
+
+def parse_benefit_record(aadhaar_number: str, source: str, row: dict) -> BenefitRecord:
+    """One benefit/payment row of the response"""
+    record = BenefitRecord(aadhaar_number=aadhaar_number, source=source)
+    for key, value in row.items():
+        name = benefit_field_for_key(key)
+        if name and not getattr(record, name) and value not in (None, ''):
+            setattr(record, name, str(value).strip())
+    return record
+
+
+def loads_json(text):
+    """json.loads, through orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def extract_csrf_token(html: str) -> Optional[str]:
+    """Pull __RequestVerificationToken out of the form page"""
+    csrf_match = re.search(r'name="__RequestVerificationToken"[^>]*value="([^"]+)"', html)
+    return csrf_match.group(1) if csrf_match else None
+
+
+def build_form_data(csrf_token: str, aadhaar_number: str) -> dict:
+    """Complete form body for an Aadhaar search"""
+    return {
+        '__RequestVerificationToken': csrf_token,
+        'serviceID': '5s6nLtXarUM=',
+        'machineId': '',
+        'ipAddress': '',
+        '_ListDynamicControlParent[0].EncryptedID': 'AScGcOfnRUA=',
+        '_ListDynamicControlParent[0].DateFormat': '',
+        '_ListDynamicControlParent[0].Control_Type': 'RADIO',
+        '_ListDynamicControlParent[0].EncryptedValue': '',
+        '_ListDynamicControlParent[0].Submit_Sequence': '0',
+        '_ListDynamicControlParent[0].English_Control_Name': 'प्रकार चुनें',
+        'रजिस्ट्रेशन नंबर': '',
+        'आधार नंबर': '',
+        'प्रकार_चुनें': 'False',
+        'जन-आधार नंबर': '',
+        '_ListDynamicControlParent[1].EncryptedID': 'UEecLGeEG1g=',
+        '_ListDynamicControlParent[1].DateFormat': '',
+        '_ListDynamicControlParent[1].Control_Type': 'TEXTBOX',
+        '_ListDynamicControlParent[1].EncryptedValue': '',
+        '_ListDynamicControlParent[1].Submit_Sequence': '4',
+        '_ListDynamicControlParent[1].English_Control_Name': 'आई डी नंबर दर्ज़ करें',
+        '_ListDynamicControlParent[1].ControlValue': aadhaar_number,
+        '_ListDynamicControlParent[2].EncryptedID': 'yXsOYFWCGD0=',
+        '_ListDynamicControlParent[2].DateFormat': '',
+        '_ListDynamicControlParent[2].Control_Type': 'BUTTON',
+        '_ListDynamicControlParent[2].EncryptedValue': '',
+        '_ListDynamicControlParent[2].Submit_Sequence': '7',
+        '_ListDynamicControlParent[2].English_Control_Name': 'खोजें',
+        'seletedValue': 'yXsOYFWCGD0=',
+        'value': 'c2dXlstdFew=',
+        'selectedClass': '08DTNHkX+SU=',
+        'RequiredValue': 'false',
+        'SelectedValue': f'आई डी नंबर दर्ज़ करें:{aadhaar_number}'
+    }
+
+
+def fill_na_fields(beneficiary: BeneficiaryData):
+    """Fill empty fields with N/A"""
+    for name in beneficiary.__dataclass_fields__:
+        if name not in ["aadhaar_number", "fetch_status", "error_message"]:
+            current_value = getattr(beneficiary, name, "")
+            if not isinstance(current_value, str):
+                continue
+            if not current_value or current_value.strip() == "":
+                setattr(beneficiary, name, "N/A")
+
+
+# Error message prefix for timeouts and connection errors from the HTTP layer
+NETWORK_ERROR_PREFIX = "Network error"
+
+
+def mark_failed(beneficiary: BeneficiaryData, error_message: str) -> BeneficiaryData:
+    """Record a failed lookup"""
+    beneficiary.error_message = error_message
+    beneficiary.fetch_status = "Failed"
+    fill_na_fields(beneficiary)
+    return beneficiary
+
+
+def parse_search_response(beneficiary: BeneficiaryData, status_code: int, text: str) -> BeneficiaryData:
+    """Fill a BeneficiaryData from the search POST response"""
+    aadhaar_number = beneficiary.aadhaar_number
+    
+    if status_code != 200:
+        return mark_failed(beneficiary, f"HTTP Error: {status_code}")
+    
+    try:
+        # Parse JSON response (the payload is usually a JSON string holding JSON)
+        first_parse = loads_json(text)
+        if isinstance(first_parse, str):
+            data = loads_json(first_parse)
+        else:
+            data = first_parse
+        
+        if isinstance(data, dict):
+            # Every other list of records is benefit/payment history
+            for source, rows in data.items():
+                if source != 'Labour' and isinstance(rows, list):
+                    beneficiary.benefits.extend(
+                        parse_benefit_record(aadhaar_number, source, row) for row in rows if isinstance(row, dict)
+                    )
+            
+            # Headline benefit columns come from the first benefit record
+            if beneficiary.benefits:
+                first = beneficiary.benefits[0]
+                beneficiary.benefit_name = first.benefit_name
+                beneficiary.amount = first.amount
+                beneficiary.bank_name = first.bank_name
+                beneficiary.debit_date = first.debit_date
+                beneficiary.apply_date = first.apply_date
+        
+        # Extract Labour data
+        if isinstance(data, dict) and 'Labour' in data and data['Labour']:
+            labour_list = data['Labour']
+            if isinstance(labour_list, list) and len(labour_list) > 0:
+                labour_data = labour_list[0]
+                if isinstance(labour_data, dict):
+                    # Extract all fields
+                    for name, key in LABOUR_FIELDS:
+                        setattr(beneficiary, name, str(labour_data.get(key, '')).strip())
+                    
+                    # Further registrations of the same person
+                    for extra in labour_list[1:]:
+                        if isinstance(extra, dict):
+                            registration = BeneficiaryData(aadhaar_number=aadhaar_number, fetch_status="Success")
+                            for name, key in LABOUR_FIELDS:
+                                setattr(registration, name, str(extra.get(key, '')).strip())
+                            fill_na_fields(registration)
+                            beneficiary.extra_registrations.append(registration)
+                    
+                    if beneficiary.name:
+                        beneficiary.fetch_status = "Success"
+                        logger.info(f"SUCCESS: {beneficiary.name} (Aadhaar: {aadhaar_number}, "
+                                    f"{len(labour_list)} registrations, {len(beneficiary.benefits)} benefit records)")
+                        return beneficiary
+        
+        # No data found
+        return mark_failed(beneficiary, "No beneficiary data found")
+        
+    except json.JSONDecodeError as e:
+        return mark_failed(beneficiary, f"JSON parsing failed: {str(e)}")
+
+
+def needs_token_refresh(status_code: int, text: str) -> bool:
+    """True when a search POST was rejected because of a stale token/cookie"""
+    if status_code in TOKEN_REFRESH_STATUS_CODES:
+        return True
+    # Portal answers a bad token with the form page instead of JSON
+    return status_code == 200 and '__RequestVerificationToken' in text
+
+
+class TokenCache:
+    """Cached anti-forgery token with a TTL and reuse counters"""
+    
+    def __init__(self, ttl: float = TOKEN_TTL_SECONDS, stats: Optional[dict] = None):
+        self.ttl = ttl
+        self.token = None
+        self.fetched_at = 0.0
+        self.stats = stats if stats is not None else {'hits': 0, 'fetches': 0, 'refreshes': 0}
+    
+    def get(self) -> Optional[str]:
+        if self.token and time.monotonic() - self.fetched_at < self.ttl:
+            self.stats['hits'] += 1
+            return self.token
+        return None
+    
+    def store(self, token: str):
+        self.token = token
+        self.fetched_at = time.monotonic()
+        self.stats['fetches'] += 1
+    
+    def invalidate(self):
+        self.token = None
+        self.stats['refreshes'] += 1
+
+
+def token_stats_summary(stats: dict) -> str:
+    """One-line token reuse report"""
+    uses = stats['hits'] + stats['fetches']
+    rate = stats['hits'] / uses * 100 if uses else 0
+    return (f"TOKEN REUSE: {stats['hits']}/{uses} lookups reused a cached token ({rate:.1f}%), "
+            f"{stats['fetches']} form fetches, {stats['refreshes']} refreshes")
+
+
+class PortalSessionManager:
+    """Keep-alive session plus cached anti-forgery token for the sync client"""
+    
+    def __init__(self, token_ttl: float = TOKEN_TTL_SECONDS, pool_size: int = 10):
+        self.session = requests.Session()
+        self.session.headers.update(SESSION_HEADERS)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.tokens = TokenCache(token_ttl)
+    
+    def get_token(self) -> str:
+        """Cached token, or a fresh one from the form page (which also refreshes the cookie)"""
+        token = self.tokens.get()
+        if token:
+            return token
+        
+        response = self.session.get(f"{BASE_URL}{FORM_URL}", timeout=30)
+        if response.status_code != 200:
+            raise TokenError(f"Form page error: {response.status_code}")
+        
+        token = extract_csrf_token(response.text)
+        if not token:
+            raise TokenError("No CSRF token found")
+        
+        self.tokens.store(token)
+        return token
+    
+    def post_search(self, aadhaar_number: str) -> requests.Response:
+        """POST the search form, refreshing the token once if the portal rejects it"""
+        for attempt in range(2):
+            csrf_token = self.get_token()
+            response = self.session.post(f"{BASE_URL}{FORM_URL}", data=build_form_data(csrf_token, aadhaar_number),
+                                         headers=POST_HEADERS, timeout=30)
+            if attempt == 0 and needs_token_refresh(response.status_code, response.text):
+                logger.info(f"REFRESHING token after HTTP {response.status_code} for {aadhaar_number}")
+                self.tokens.invalidate()
+                continue
+            return response
+        return response
+
 
 class JanSoochnaPortalClient:
-    def __init__(self):
-        pass
+    def __init__(self, token_ttl: float = TOKEN_TTL_SECONDS):
+        self.session_manager = PortalSessionManager(token_ttl)
+
+    def token_summary(self) -> str:
+        return token_stats_summary(self.session_manager.tokens.stats)
 
     def fetch_beneficiary_data(self, aadhaar_number: str) -> BeneficiaryData:
         """Fetch data from Jan Soochna portal"""
@@ -52,156 +397,472 @@ class JanSoochnaPortalClient:
         logger.info(f"PROCESSING Aadhaar: {aadhaar_number}")
         beneficiary = BeneficiaryData(aadhaar_number=aadhaar_number)
         
-        # Create fresh session
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/json, text/javascript, */*; q=0.01',
-            'Accept-Language': 'en-US,en;q=0.9,hi;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive'
-        })
+        try:
+            # Submit the form on the pooled session (token fetched only when needed)
+            response = self.session_manager.post_search(aadhaar_number)
+            
+            # Parse response
+            return parse_search_response(beneficiary, response.status_code, response.text)
         
-        BASE_URL = "https://jansoochna.rajasthan.gov.in"
-        FORM_URL = "/Services/DynamicControlsDataSet"
+        except TokenError as e:
+            logger.error(f"ERROR: {e} for {aadhaar_number}")
+            return mark_failed(beneficiary, str(e))
         
-        try:
-            # Step 1: Get form page
-            response = session.get(f"{BASE_URL}{FORM_URL}")
-            
-            if response.status_code != 200:
-                logger.error(f"ERROR: Form page failed for {aadhaar_number}: {response.status_code}")
-                beneficiary.error_message = f"Form page error: {response.status_code}"
-                beneficiary.fetch_status = "Failed"
-                self._fill_na_fields(beneficiary)
-                return beneficiary
-            
-            # Step 2: Extract CSRF token
-            csrf_match = re.search(r'name="__RequestVerificationToken"[^>]*value="([^"]+)"', response.text)
-            if not csrf_match:
-                logger.error(f"ERROR: No CSRF token for {aadhaar_number}")
-                beneficiary.error_message = "No CSRF token found"
-                beneficiary.fetch_status = "Failed"
-                self._fill_na_fields(beneficiary)
-                return beneficiary
-            
-            csrf_token = csrf_match.group(1)
-            
-            # Step 3: Prepare complete form data
-            form_data = {
-                '__RequestVerificationToken': csrf_token,
-                'serviceID': '5s6nLtXarUM=',
-                'machineId': '',
-                'ipAddress': '',
-                '_ListDynamicControlParent[0].EncryptedID': 'AScGcOfnRUA=',
-                '_ListDynamicControlParent[0].DateFormat': '',
-                '_ListDynamicControlParent[0].Control_Type': 'RADIO',
-                '_ListDynamicControlParent[0].EncryptedValue': '',
-                '_ListDynamicControlParent[0].Submit_Sequence': '0',
-                '_ListDynamicControlParent[0].English_Control_Name': 'प्रकार चुनें',
-                'रजिस्ट्रेशन नंबर': '',
-                'आधार नंबर': '',
-                'प्रकार_चुनें': 'False',
-                'जन-आधार नंबर': '',
-                '_ListDynamicControlParent[1].EncryptedID': 'UEecLGeEG1g=',
-                '_ListDynamicControlParent[1].DateFormat': '',
-                '_ListDynamicControlParent[1].Control_Type': 'TEXTBOX',
-                '_ListDynamicControlParent[1].EncryptedValue': '',
-                '_ListDynamicControlParent[1].Submit_Sequence': '4',
-                '_ListDynamicControlParent[1].English_Control_Name': 'आई डी नंबर दर्ज़ करें',
-                '_ListDynamicControlParent[1].ControlValue': aadhaar_number,
-                '_ListDynamicControlParent[2].EncryptedID': 'yXsOYFWCGD0=',
-                '_ListDynamicControlParent[2].DateFormat': '',
-                '_ListDynamicControlParent[2].Control_Type': 'BUTTON',
-                '_ListDynamicControlParent[2].EncryptedValue': '',
-                '_ListDynamicControlParent[2].Submit_Sequence': '7',
-                '_ListDynamicControlParent[2].English_Control_Name': 'खोजें',
-                'seletedValue': 'yXsOYFWCGD0=',
-                'value': 'c2dXlstdFew=',
-                'selectedClass': '08DTNHkX+SU=',
-                'RequiredValue': 'false',
-                'SelectedValue': f'आई डी नंबर दर्ज़ करें:{aadhaar_number}'
-            }
-            
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-                'Origin': BASE_URL,
-                'Referer': f"{BASE_URL}{FORM_URL}",
-                'X-Requested-With': 'XMLHttpRequest'
-            }
-            
-            # Step 4: Submit form
-            response = session.post(f"{BASE_URL}{FORM_URL}", data=form_data, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                try:
-                    # Parse JSON response
-                    first_parse = json.loads(response.text)
-                    if isinstance(first_parse, str):
-                        data = json.loads(first_parse)
-                    else:
-                        data = first_parse
-                    
-                    # Extract Labour data
-                    if isinstance(data, dict) and 'Labour' in data and data['Labour']:
-                        labour_list = data['Labour']
-                        if isinstance(labour_list, list) and len(labour_list) > 0:
-                            labour_data = labour_list[0]
-                            if isinstance(labour_data, dict):
-                                # Extract all fields
-                                beneficiary.name = str(labour_data.get('व्यक्ति / लाभार्थी का नाम / Beneficiary Name', '')).strip()
-                                beneficiary.father_name = str(labour_data.get('व्यक्ति / लाभार्थी के पिता का नाम / Beneficiary Father Name ', '')).strip()
-                                beneficiary.address = str(labour_data.get('व्यक्ति / लाभार्थी का पता / Address', '')).strip()
-                                beneficiary.gender = str(labour_data.get('लिंग / Gender', '')).strip()
-                                beneficiary.authority = str(labour_data.get('संबंधित प्राधिकरण / Concerned Union/Authority/Person', '')).strip()
-                                beneficiary.renewal_date = str(labour_data.get('वैधता दिनांक / Renewal Due Date', '')).strip()
-                                beneficiary.registration_fees = str(labour_data.get('आवेदन का शुल्क / Registration Fees ', '')).strip()
-                                beneficiary.application_status = str(labour_data.get('आवेदन की स्थिति / Application Status ', '')).strip()
-                                beneficiary.application_number = str(labour_data.get('आवेदन क्रमांक / Application Number ', '')).strip()
-                                beneficiary.card_issued_date = str(labour_data.get('कार्ड जारी करने की दिनांक / Card Issued Date ', '')).strip()
-                                
-                                if beneficiary.name:
-                                    beneficiary.fetch_status = "Success"
-                                    logger.info(f"SUCCESS: {beneficiary.name} (Aadhaar: {aadhaar_number})")
-                                    return beneficiary
-                    
-                    # No data found
-                    beneficiary.error_message = "No beneficiary data found"
-                    beneficiary.fetch_status = "Failed"
-                    self._fill_na_fields(beneficiary)
-                    return beneficiary
-                    
-                except json.JSONDecodeError as e:
-                    beneficiary.error_message = f"JSON parsing failed: {str(e)}"
-                    beneficiary.fetch_status = "Failed"
-                    self._fill_na_fields(beneficiary)
-                    return beneficiary
-            else:
-                beneficiary.error_message = f"HTTP Error: {response.status_code}"
-                beneficiary.fetch_status = "Failed"
-                self._fill_na_fields(beneficiary)
-                return beneficiary
+        except (requests.Timeout, requests.ConnectionError) as e:
+            return mark_failed(beneficiary, f"{NETWORK_ERROR_PREFIX}: {str(e)}")
                 
         except Exception as e:
-            beneficiary.error_message = f"Error: {str(e)}"
-            beneficiary.fetch_status = "Failed"
-            self._fill_na_fields(beneficiary)
-            return beneficiary
+            return mark_failed(beneficiary, f"Error: {str(e)}")
 
     def _fill_na_fields(self, beneficiary: BeneficiaryData):
         """Fill empty fields with N/A"""
-        for field in beneficiary.__dataclass_fields__:
-            if field not in ["aadhaar_number", "fetch_status", "error_message"]:
-                current_value = getattr(beneficiary, field, "")
-                if not current_value or current_value.strip() == "":
-                    setattr(beneficiary, field, "N/A")
+        fill_na_fields(beneficiary)
+
+
+class AsyncTokenBucket:
+    """Global request-rate limit shared by every coroutine of a run"""
+    
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncJanSoochnaPortalClient:
+    """Concurrent Jan Soochna lookups on httpx.AsyncClient
+    
+    At most `concurrency` lookups are in flight, and every portal request
+    (form GET and search POST) draws from one token bucket of
+    `requests_per_second`. Each worker owns its own AsyncClient so the
+    anti-forgery cookie always matches the token it posts.
+    """
+    
+    def __init__(self, concurrency: int = 5, requests_per_second: float = 1.0, timeout: float = 30,
+                 token_ttl: float = TOKEN_TTL_SECONDS, pacer: Optional['AdaptivePacer'] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        self.concurrency = max(1, concurrency)
+        # Checked before every lookup; once it returns True no new lookups start
+        self.should_stop = should_stop
+        self.requests_per_second = requests_per_second
+        self.pacer = pacer
+        self.timeout = timeout
+        self.token_ttl = token_ttl
+        self.token_stats = {'hits': 0, 'fetches': 0, 'refreshes': 0}
+    
+    def token_summary(self) -> str:
+        return token_stats_summary(self.token_stats)
+    
+    async def _get_token(self, client: httpx.AsyncClient, bucket: AsyncTokenBucket, tokens: TokenCache) -> str:
+        token = tokens.get()
+        if token:
+            return token
+        
+        await bucket.acquire()
+        response = await client.get(f"{BASE_URL}{FORM_URL}")
+        if response.status_code != 200:
+            raise TokenError(f"Form page error: {response.status_code}")
+        
+        token = extract_csrf_token(response.text)
+        if not token:
+            raise TokenError("No CSRF token found")
+        
+        tokens.store(token)
+        return token
+    
+    async def fetch_beneficiary_data(self, client: httpx.AsyncClient, bucket: AsyncTokenBucket,
+                                     tokens: TokenCache, aadhaar_number: str) -> BeneficiaryData:
+        """Async counterpart of JanSoochnaPortalClient.fetch_beneficiary_data"""
+        logger.info(f"PROCESSING Aadhaar: {aadhaar_number}")
+        started = time.monotonic()
+        result = await self._fetch(client, bucket, tokens, aadhaar_number)
+        
+        # Feed the pacer and scale the shared request rate down while it is backing off
+        if self.pacer:
+            self.pacer.observe(time.monotonic() - started, is_transient_failure(result))
+            bucket.rate = self.requests_per_second / self.pacer.slowdown()
+        return result
+    
+    async def _fetch(self, client: httpx.AsyncClient, bucket: AsyncTokenBucket,
+                     tokens: TokenCache, aadhaar_number: str) -> BeneficiaryData:
+        beneficiary = BeneficiaryData(aadhaar_number=aadhaar_number)
+        
+        try:
+            for attempt in range(2):
+                csrf_token = await self._get_token(client, bucket, tokens)
+                await bucket.acquire()
+                response = await client.post(f"{BASE_URL}{FORM_URL}", data=build_form_data(csrf_token, aadhaar_number),
+                                             headers=POST_HEADERS)
+                if attempt == 0 and needs_token_refresh(response.status_code, response.text):
+                    logger.info(f"REFRESHING token after HTTP {response.status_code} for {aadhaar_number}")
+                    tokens.invalidate()
+                    continue
+                break
+            return parse_search_response(beneficiary, response.status_code, response.text)
+        
+        except TokenError as e:
+            logger.error(f"ERROR: {e} for {aadhaar_number}")
+            return mark_failed(beneficiary, str(e))
+        
+        except httpx.TransportError as e:
+            return mark_failed(beneficiary, f"{NETWORK_ERROR_PREFIX}: {str(e) or type(e).__name__}")
+            
+        except Exception as e:
+            return mark_failed(beneficiary, f"Error: {str(e)}")
+    
+    async def _worker(self, pending: asyncio.Queue, done: asyncio.Queue, bucket: AsyncTokenBucket):
+        # One keep-alive client and token per worker: the token must match this client's cookie
+        tokens = TokenCache(self.token_ttl, self.token_stats)
+        async with httpx.AsyncClient(headers=SESSION_HEADERS, timeout=self.timeout, follow_redirects=True) as client:
+            while True:
+                if self.should_stop and self.should_stop():
+                    return
+                try:
+                    aadhaar_number = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await done.put(await self.fetch_beneficiary_data(client, bucket, tokens, aadhaar_number))
+    
+    async def fetch_many(self, aadhaar_numbers: List[str]) -> AsyncIterator[BeneficiaryData]:
+        """Yield results in completion order (fewer than requested once should_stop says so)"""
+        pending: asyncio.Queue = asyncio.Queue()
+        for aadhaar_number in aadhaar_numbers:
+            pending.put_nowait(aadhaar_number)
+        
+        done: asyncio.Queue = asyncio.Queue()
+        bucket = AsyncTokenBucket(self.requests_per_second)
+        workers = [asyncio.create_task(self._worker(pending, done, bucket))
+                   for _ in range(min(self.concurrency, len(aadhaar_numbers)))]
+        
+        try:
+            remaining = len(aadhaar_numbers)
+            running = set(workers)
+            while remaining:
+                if not running and done.empty():
+                    if self.should_stop and self.should_stop():
+                        logger.info(f"STOPPED with {remaining} lookups not started")
+                        return
+                    raise RuntimeError(f"Workers exited with {remaining} results missing")
+                # Wait on the workers too, so one that dies outside fetch_beneficiary_data
+                # (e.g. while opening its client) surfaces here instead of hanging the loop
+                getter = asyncio.ensure_future(done.get())
+                finished, _ = await asyncio.wait(running | {getter}, return_when=asyncio.FIRST_COMPLETED)
+                for worker in finished - {getter}:
+                    running.discard(worker)
+                    if worker.exception() is not None:
+                        getter.cancel()
+                        raise worker.exception()
+                if getter in finished:
+                    remaining -= 1
+                    yield getter.result()
+                else:
+                    getter.cancel()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+# Buffered result writes: append after this many rows or once the oldest row has waited this long
+RESULT_FLUSH_ROWS = 25
+RESULT_FLUSH_SECONDS = 30
+
+
+# Verhoeff checksum tables (multiplication, permutation) used by Aadhaar
+VERHOEFF_D = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9), (1, 2, 3, 4, 0, 6, 7, 8, 9, 5),
+    (2, 3, 4, 0, 1, 7, 8, 9, 5, 6), (3, 4, 0, 1, 2, 8, 9, 5, 6, 7),
+    (4, 0, 1, 2, 3, 9, 5, 6, 7, 8), (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2), (7, 6, 5, 9, 8, 2, 1, 0, 4, 3),
+    (8, 7, 6, 5, 9, 3, 2, 1, 0, 4), (9, 8, 7, 6, 5, 4, 3, 2, 1, 0)
+)
+VERHOEFF_P = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9), (1, 5, 7, 6, 2, 8, 3, 0, 9, 4),
+    (5, 8, 0, 3, 7, 9, 6, 1, 4, 2), (8, 9, 1, 6, 0, 4, 3, 5, 2, 7),
+    (9, 4, 5, 3, 1, 2, 6, 8, 7, 0), (4, 2, 8, 6, 5, 7, 3, 9, 0, 1),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5), (7, 0, 4, 6, 9, 1, 3, 2, 5, 8)
+)
+
+DEFAULT_INDEX_FILE = "jan_soochna_index.db"
+
+
+def is_valid_aadhaar(aadhaar: str) -> bool:
+    """12 digits with a valid Verhoeff check digit"""
+    if len(aadhaar) != 12 or not aadhaar.isdigit():
+        return False
+    check = 0
+    for i, digit in enumerate(reversed(aadhaar)):
+        check = VERHOEFF_D[check][VERHOEFF_P[i % 8][int(digit)]]
+    return check == 0
+
+
+class AadhaarIndex:
+    """Local SQLite index of Aadhaar numbers already written to the Results sheet"""
+    
+    def __init__(self, path: str = DEFAULT_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS processed (
+                aadhaar_number TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+    
+    def record_many(self, entries: Iterable[Tuple[str, str]]):
+        """Upsert (aadhaar_number, status) pairs"""
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO processed VALUES (?, ?, ?)",
+                [(aadhaar, status, now) for aadhaar, status in entries]
+            )
+            self.conn.commit()
+    
+    def processed(self) -> Set[str]:
+        with self._lock:
+            return {row[0] for row in self.conn.execute("SELECT aadhaar_number FROM processed")}
+    
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM processed").fetchone()[0]
+    
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM processed")
+            self.conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+# Sharding defaults
+DEFAULT_COORDINATOR_FILE = "jan_soochna_work.db"
+LEASE_BATCH_SIZE = 20
+LEASE_SECONDS = 600
+
+
+def in_shard(aadhaar: str, shard_index: int, shard_count: int) -> bool:
+    """Static sharding: every process with the same shard_count agrees on the owner"""
+    return int(aadhaar) % shard_count == shard_index
+
+
+class LeaseCoordinator:
+    """SQLite work queue that hands out Aadhaar batches under expiring leases
+    
+    Several processes on the same host call claim() in a loop. SQLite locking
+    is not reliable on network filesystems, so the file must be on local disk.
+    A batch whose owner dies becomes claimable again once its lease expires;
+    numbers already marked done are left out, so they are not fetched twice.
+    """
+    
+    def __init__(self, path: str = DEFAULT_COORDINATOR_FILE, worker_id: Optional[str] = None,
+                 lease_seconds: float = LEASE_SECONDS, batch_size: int = LEASE_BATCH_SIZE):
+        self.path = path
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        # isolation_level=None: transactions are explicit so claim() can take the write lock up front
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS work (
+                aadhaar_number TEXT PRIMARY KEY,
+                batch_id INTEGER NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                batch_id INTEGER PRIMARY KEY,
+                owner TEXT,
+                lease_until REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+    
+    def enqueue(self, aadhaar_numbers: List[str]) -> int:
+        """Add unseen numbers as new batches; safe to call from every worker"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                known = {row[0] for row in self.conn.execute("SELECT aadhaar_number FROM work")}
+                new = [aadhaar for aadhaar in aadhaar_numbers if aadhaar not in known]
+                next_batch = self.conn.execute("SELECT COALESCE(MAX(batch_id), 0) + 1 FROM leases").fetchone()[0]
+                for offset in range(0, len(new), self.batch_size):
+                    batch_id = next_batch + offset // self.batch_size
+                    self.conn.execute("INSERT INTO leases (batch_id) VALUES (?)", (batch_id,))
+                    self.conn.executemany("INSERT INTO work (aadhaar_number, batch_id) VALUES (?, ?)",
+                                          [(aadhaar, batch_id) for aadhaar in new[offset:offset + self.batch_size]])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return len(new)
+    
+    def claim(self) -> Optional[Tuple[int, List[str]]]:
+        """Lease the oldest free or expired batch that still has pending numbers"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("""
+                    SELECT l.batch_id FROM leases l
+                    WHERE l.lease_until < ? AND EXISTS (
+                        SELECT 1 FROM work w WHERE w.batch_id = l.batch_id AND w.done = 0)
+                    ORDER BY l.batch_id LIMIT 1
+                """, (now,)).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                batch_id = row[0]
+                self.conn.execute("UPDATE leases SET owner = ?, lease_until = ?, attempts = attempts + 1 "
+                                  "WHERE batch_id = ?", (self.worker_id, now + self.lease_seconds, batch_id))
+                numbers = [r[0] for r in self.conn.execute(
+                    "SELECT aadhaar_number FROM work WHERE batch_id = ? AND done = 0 ORDER BY aadhaar_number",
+                    (batch_id,))]
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return batch_id, numbers
+    
+    def renew(self, batch_id: int) -> bool:
+        """Extend our lease; False means it expired and someone else owns the batch now"""
+        with self._lock:
+            cursor = self.conn.execute("UPDATE leases SET lease_until = ? WHERE batch_id = ? AND owner = ?",
+                                       (time.time() + self.lease_seconds, batch_id, self.worker_id))
+        return cursor.rowcount == 1
+    
+    def mark_done(self, aadhaar_numbers: Iterable[str]):
+        with self._lock:
+            self.conn.executemany("UPDATE work SET done = 1 WHERE aadhaar_number = ?",
+                                  [(aadhaar,) for aadhaar in aadhaar_numbers])
+    
+    def release(self, batch_id: int):
+        """Give the batch back (finished, or abandoned on shutdown)"""
+        with self._lock:
+            self.conn.execute("UPDATE leases SET owner = NULL, lease_until = 0 WHERE batch_id = ? AND owner = ?",
+                              (batch_id, self.worker_id))
+    
+    def summary(self) -> str:
+        with self._lock:
+            total, done = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(done), 0) FROM work").fetchone()
+            leased = self.conn.execute("SELECT COUNT(*) FROM leases WHERE lease_until >= ?",
+                                       (time.time(),)).fetchone()[0]
+        return f"Work queue: {done}/{total} done, {leased} batches leased"
+
+
+# Adaptive pacing defaults
+PACER_MIN_DELAY = 1.0
+PACER_MAX_DELAY = 120.0
+PACER_STEP = 0.5          # additive decrease after a fast success
+PACER_BACKOFF = 2.0       # multiplicative increase after a 5xx/timeout
+PACER_FAST_LATENCY = 3.0  # responses faster than this count as healthy
+MAX_RETRIES = 3
+
+
+def is_transient_failure(result: BeneficiaryData) -> bool:
+    """Failures worth retrying later: 5xx answers, timeouts and connection errors"""
+    if result.fetch_status != "Failed":
+        return False
+    message = result.error_message or ""
+    if re.match(r'(HTTP Error|Form page error): 5\d\d', message):
+        return True
+    # Anything else recorded as "Error: ..." is a bug or a bad answer, not worth repeating
+    return message.startswith(f"{NETWORK_ERROR_PREFIX}:")
+
+
+class AdaptivePacer:
+    """AIMD pacing between portal requests
+    
+    The gap shrinks by a fixed step after every fast success and doubles on
+    every 5xx/timeout, staying within [min_delay, max_delay]. One pacer can
+    be shared by several worker threads.
+    """
+    
+    def __init__(self, base_delay: float, min_delay: float = PACER_MIN_DELAY, max_delay: float = PACER_MAX_DELAY,
+                 step: float = PACER_STEP, backoff: float = PACER_BACKOFF, fast_latency: float = PACER_FAST_LATENCY):
+        self.base_delay = max(min_delay, base_delay)
+        self.delay = self.base_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.step = step
+        self.backoff = backoff
+        self.fast_latency = fast_latency
+        self.latencies = deque(maxlen=1000)
+        self.retries = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, latency: float, transient_failure: bool):
+        with self._lock:
+            self.latencies.append(latency)
+            if transient_failure:
+                self.delay = min(self.max_delay, self.delay * self.backoff)
+            elif latency <= self.fast_latency:
+                self.delay = max(self.min_delay, self.delay - self.step)
+    
+    def next_delay(self) -> float:
+        """Current gap with a little jitter so requests don't look scripted"""
+        with self._lock:
+            delay = self.delay
+        return random.uniform(delay, delay * 1.2)
+    
+    def slowdown(self) -> float:
+        """How far the pacer has backed off from its starting gap (>= 1)"""
+        with self._lock:
+            return max(1.0, self.delay / self.base_delay)
+    
+    def percentiles(self) -> tuple:
+        with self._lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0, 0.0, 0.0
+        pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return pick(0.5), pick(0.9), pick(0.99)
+    
+    def summary(self) -> str:
+        p50, p90, p99 = self.percentiles()
+        return (f"PACING: delay={self.delay:.1f}s retries={self.retries} "
+                f"latency p50={p50:.2f}s p90={p90:.2f}s p99={p99:.2f}s")
+
 
 class GoogleSheetsManager:
-    def __init__(self, credentials_file: str, spreadsheet_id: str):
+    def __init__(self, credentials_file: str, spreadsheet_id: str,
+                 flush_rows: int = RESULT_FLUSH_ROWS, flush_seconds: float = RESULT_FLUSH_SECONDS):
         self.credentials_file = credentials_file
         self.spreadsheet_id = spreadsheet_id
         self.service = None
+        self.flush_rows = max(1, flush_rows)
+        self.flush_seconds = flush_seconds
+        
+        # Sheets already checked for existence + header during this run
+        self._prepared_sheets: Set[str] = set()
+        # Rows waiting to be appended, per sheet
+        self._pending: Dict[str, List[list]] = {}
+        self._oldest_pending = None
+        self._lock = threading.RLock()
+        # Called with (sheet_name, rows) after rows were appended successfully
+        self.on_flush: Optional[Callable[[str, List[list]], None]] = None
+        
         self._initialize_service()
 
     def _initialize_service(self):
@@ -216,7 +877,7 @@ class GoogleSheetsManager:
             logger.error(f"Failed to initialize Google Sheets: {e}")
             raise
 
-    def ensure_header_exists(self, sheet_name: str):
+    def ensure_header_exists(self, sheet_name: str, header: Optional[List[str]] = None):
         try:
             result = self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
@@ -224,12 +885,7 @@ class GoogleSheetsManager:
             ).execute()
             
             if not result.get('values'):
-                header = [
-                    "Aadhaar Number", "Name", "Father Name", "Address", "Gender", "Authority",
-                    "Renewal Date", "Registration Fees", "Application Status", "Application Number", 
-                    "Card Issued Date", "Benefit Name", "Amount", "Bank Name", "Debit Date",
-                    "Apply Date", "Fetch Status", "Error Message"
-                ]
+                header = header or RESULTS_HEADER
                 self.service.spreadsheets().values().update(
                     spreadsheetId=self.spreadsheet_id,
                     range=f"{sheet_name}!A1",
@@ -240,7 +896,7 @@ class GoogleSheetsManager:
         except Exception as e:
             logger.error(f"Error ensuring header: {e}")
 
-    def create_sheet_if_not_exists(self, sheet_name: str):
+    def create_sheet_if_not_exists(self, sheet_name: str, header: Optional[List[str]] = None):
         try:
             spreadsheet = self.service.spreadsheets().get(spreadsheetId=self.spreadsheet_id).execute()
             existing_sheets = [sheet['properties']['title'] for sheet in spreadsheet['sheets']]
@@ -252,31 +908,50 @@ class GoogleSheetsManager:
                     body={'requests': [request]}
                 ).execute()
                 logger.info(f"Created sheet: {sheet_name}")
-                self.ensure_header_exists(sheet_name)
+                self.ensure_header_exists(sheet_name, header)
         except Exception as e:
             logger.error(f"Error creating sheet: {e}")
 
     def read_aadhaar_numbers(self, sheet_name: str = "Sheet1", column: str = "A") -> List[str]:
+        return self.read_aadhaar_rows(sheet_name, column)[0]
+
+    def read_aadhaar_rows(self, sheet_name: str = "Sheet1", column: str = "A",
+                          start_row: int = 1) -> Tuple[List[str], int]:
+        """Valid Aadhaar numbers from start_row down, plus the next unread row number"""
         try:
             result = self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
-                range=f"{sheet_name}!{column}:{column}"
+                range=f"{sheet_name}!{column}{start_row}:{column}"
             ).execute()
             
             values = result.get('values', [])
             aadhaar_numbers = []
+            seen = set()
+            invalid = 0
+            duplicates = 0
             
+            # Dedupe and checksum before anything reaches the portal
             for row in values:
                 if row and len(row) > 0:
                     aadhaar = str(row[0]).strip()
-                    if len(aadhaar) == 12 and aadhaar.isdigit():
-                        aadhaar_numbers.append(aadhaar)
+                    if not (len(aadhaar) == 12 and aadhaar.isdigit()):
+                        continue
+                    if not is_valid_aadhaar(aadhaar):
+                        invalid += 1
+                        logger.warning(f"SKIPPING {aadhaar}: Verhoeff checksum failed")
+                        continue
+                    if aadhaar in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(aadhaar)
+                    aadhaar_numbers.append(aadhaar)
             
-            logger.info(f"Read {len(aadhaar_numbers)} valid Aadhaar numbers from {sheet_name}")
-            return aadhaar_numbers
+            logger.info(f"Read {len(aadhaar_numbers)} valid Aadhaar numbers from {sheet_name} "
+                        f"({duplicates} duplicates, {invalid} failed checksum)")
+            return aadhaar_numbers, start_row + len(values)
         except Exception as e:
             logger.error(f"Error reading Aadhaar numbers: {e}")
-            return []
+            return [], start_row
 
     def read_existing_results(self, sheet_name: str = "Results") -> Set[str]:
         try:
@@ -299,43 +974,128 @@ class GoogleSheetsManager:
             logger.error(f"Error reading existing results: {e}")
             return set()
 
-    def write_result(self, beneficiary: BeneficiaryData, sheet_name: str = "Results"):
+    def prepare_sheet(self, sheet_name: str, header: Optional[List[str]] = None):
+        """Create the sheet and its header once per manager instance"""
+        if sheet_name in self._prepared_sheets:
+            return
+        self.create_sheet_if_not_exists(sheet_name, header)
+        self.ensure_header_exists(sheet_name, header)
+        self._prepared_sheets.add(sheet_name)
+
+    @staticmethod
+    def result_row(beneficiary: BeneficiaryData) -> list:
+        """Results sheet row for one beneficiary"""
+        return [
+            beneficiary.aadhaar_number,
+            beneficiary.name or "N/A",
+            beneficiary.father_name or "N/A", 
+            beneficiary.address or "N/A",
+            beneficiary.gender or "N/A",
+            beneficiary.authority or "N/A",
+            beneficiary.renewal_date or "N/A",
+            beneficiary.registration_fees or "N/A",
+            beneficiary.application_status or "N/A",
+            beneficiary.application_number or "N/A",
+            beneficiary.card_issued_date or "N/A",
+            beneficiary.benefit_name or "N/A",
+            beneficiary.amount or "N/A",
+            beneficiary.bank_name or "N/A",
+            beneficiary.debit_date or "N/A",
+            beneficiary.apply_date or "N/A",
+            beneficiary.fetch_status,
+            beneficiary.error_message or ""
+        ]
+
+    @staticmethod
+    def benefit_row(record: BenefitRecord) -> list:
+        """Benefits sheet row for one benefit/payment record"""
+        return [
+            record.aadhaar_number,
+            record.source,
+            record.application_number or "N/A",
+            record.benefit_name or "N/A",
+            record.amount or "N/A",
+            record.bank_name or "N/A",
+            record.debit_date or "N/A",
+            record.apply_date or "N/A",
+            record.status or "N/A"
+        ]
+
+    def queue_rows(self, sheet_name: str, rows: List[list]) -> bool:
+        """Buffer rows for sheet_name and flush once a threshold is reached"""
+        return self.queue_sheets({sheet_name: rows})
+
+    def queue_sheets(self, rows_by_sheet: Dict[str, List[list]]) -> bool:
+        """Buffer rows for several sheets at once, so a flush never sees only some of them"""
+        with self._lock:
+            if not self._pending:
+                self._oldest_pending = time.monotonic()
+            for sheet_name, rows in rows_by_sheet.items():
+                self._pending.setdefault(sheet_name, []).extend(rows)
+            
+            queued = sum(len(r) for r in self._pending.values())
+            if queued >= self.flush_rows or time.monotonic() - self._oldest_pending >= self.flush_seconds:
+                return self.flush_results()
+        return True
+
+    def flush_results(self) -> bool:
+        """Append every buffered row, one multi-row append per sheet"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._oldest_pending = None
+            ok = True
+            
+            for sheet_name, rows in pending.items():
+                if not rows:
+                    continue
+                if not self.append_rows(sheet_name, rows):
+                    # Keep the rows for the next flush attempt
+                    if not self._pending:
+                        self._oldest_pending = time.monotonic()
+                    self._pending.setdefault(sheet_name, [])[:0] = rows
+                    ok = False
+            
+            return ok
+
+    def append_rows(self, sheet_name: str, rows: List[list]) -> bool:
+        """One multi-row append, unbuffered"""
+        started = time.time()
         try:
-            self.create_sheet_if_not_exists(sheet_name)
-            self.ensure_header_exists(sheet_name)
-            
-            # Prepare row data
-            row = [
-                beneficiary.aadhaar_number,
-                beneficiary.name or "N/A",
-                beneficiary.father_name or "N/A", 
-                beneficiary.address or "N/A",
-                beneficiary.gender or "N/A",
-                beneficiary.authority or "N/A",
-                beneficiary.renewal_date or "N/A",
-                beneficiary.registration_fees or "N/A",
-                beneficiary.application_status or "N/A",
-                beneficiary.application_number or "N/A",
-                beneficiary.card_issued_date or "N/A",
-                beneficiary.benefit_name or "N/A",
-                beneficiary.amount or "N/A",
-                beneficiary.bank_name or "N/A",
-                beneficiary.debit_date or "N/A",
-                beneficiary.apply_date or "N/A",
-                beneficiary.fetch_status,
-                beneficiary.error_message or ""
-            ]
-            
-            # Append to sheet
             self.service.spreadsheets().values().append(
                 spreadsheetId=self.spreadsheet_id,
                 range=f"{sheet_name}!A2",
                 valueInputOption='RAW',
                 insertDataOption='INSERT_ROWS',
-                body={'values': [row]}
+                body={'values': rows}
             ).execute()
+        except Exception as e:
+            logger.error(f"Error appending {len(rows)} rows to {sheet_name}: {e}")
+            return False
+        logger.info(f"FLUSHED: {len(rows)} rows to {sheet_name} in {time.time() - started:.2f}s")
+        if self.on_flush:
+            self.on_flush(sheet_name, rows)
+        return True
+
+    def write_result(self, beneficiary: BeneficiaryData, sheet_name: str = "Results",
+                     benefits_sheet: str = "Benefits"):
+        try:
+            self.prepare_sheet(sheet_name)
             
-            logger.info(f"WRITTEN: Result for {beneficiary.aadhaar_number}")
+            # One Results row per Labour registration, one Benefits row per benefit record
+            rows = {sheet_name: [self.result_row(beneficiary)]}
+            rows[sheet_name].extend(self.result_row(extra) for extra in beneficiary.extra_registrations)
+            
+            # A failed lookup only gets its Results row; its benefits are not trustworthy
+            if beneficiary.benefits and beneficiary.fetch_status != "Failed":
+                self.prepare_sheet(benefits_sheet, BENEFITS_HEADER)
+                rows[benefits_sheet] = [self.benefit_row(b) for b in beneficiary.benefits]
+            
+            # Queue both sheets' rows together; they are appended with the next batch.
+            # A failed flush keeps them buffered for the next one, so the result is still queued.
+            if not self.queue_sheets(rows):
+                logger.warning(f"Flush failed, rows for {beneficiary.aadhaar_number} stay buffered")
+            
+            logger.info(f"QUEUED: Result for {beneficiary.aadhaar_number}")
             return True
             
         except Exception as e:
@@ -350,6 +1110,8 @@ class GoogleSheetsManager:
                 range=f"{sheet_name}!A:Z",
                 body={}
             ).execute()
+            # Header is gone too - recreate it on the next write
+            self._prepared_sheets.discard(sheet_name)
             logger.info(f"Cleared {sheet_name} sheet")
             return True
         except Exception as e:
@@ -402,23 +1164,218 @@ class GoogleSheetsManager:
             print(f"Error reading results: {e}")
 
 class JanSoochnaAutomation:
-    def __init__(self, credentials_file: str, spreadsheet_id: str, delay_seconds: int = 6):
+    def __init__(self, credentials_file: str, spreadsheet_id: str, delay_seconds: int = 6,
+                 concurrency: int = 1, requests_per_second: float = 1.0, max_retries: int = MAX_RETRIES,
+                 index_file: str = DEFAULT_INDEX_FILE, shard_index: int = 0, shard_count: int = 1,
+                 coordinator: Optional[LeaseCoordinator] = None):
         self.portal_client = JanSoochnaPortalClient()
         self.sheets_manager = GoogleSheetsManager(credentials_file, spreadsheet_id)
+        self.index = AadhaarIndex(index_file)
+        self.sheets_manager.on_flush = self._on_rows_flushed
+        self._output_sheet = "Results"
+        self._stop_requested = False
         self.delay_seconds = delay_seconds
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.pacer = AdaptivePacer(delay_seconds)
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.coordinator = coordinator
+        # Set by the lease heartbeat when another worker has reclaimed the current batch
+        self._lease_lost = threading.Event()
+
+    def _batch_cancelled(self) -> bool:
+        """True once the current leased batch must not be fetched any further"""
+        return self._lease_lost.is_set()
+
+    def _on_rows_flushed(self, sheet_name: str, rows: List[list]):
+        """Index Results rows only once the sheet has them"""
+        if sheet_name != self._output_sheet:
+            return
+        try:
+            self.index.record_many((row[0], row[16]) for row in rows)
+            if self.coordinator:
+                self.coordinator.mark_done(row[0] for row in rows)
+        except Exception as e:
+            logger.error(f"Error updating local index: {e}")
+
+    def existing_results(self, output_sheet: str) -> Set[str]:
+        """Already processed Aadhaar numbers, from the local index (seeded from the sheet once)"""
+        if self.index.count() == 0:
+            existing = self.sheets_manager.read_existing_results(output_sheet)
+            if existing:
+                logger.info(f"SEEDING local index with {len(existing)} Aadhaar numbers from {output_sheet}")
+                self.index.record_many((aadhaar, "Written") for aadhaar in existing)
+            return existing
+        return self.index.processed()
+
+    def clear_results(self, output_sheet: str = "Results") -> bool:
+        """Clear the Results sheet and the local index so everything is reprocessed"""
+        if not self.sheets_manager.clear_results_sheet(output_sheet):
+            return False
+        self.index.clear()
+        return True
+
+    def _record_result(self, result: BeneficiaryData, output_sheet: str, counts: dict):
+        """Write one result and update the success/failure counters"""
+        success = self.sheets_manager.write_result(result, output_sheet)
+        
+        if success and result.fetch_status == "Success":
+            counts['success'] += 1
+            logger.info(f"SUCCESS: {result.name}")
+        elif success and result.fetch_status == "Failed":
+            counts['failed'] += 1
+            logger.info(f"FAILED: {result.error_message}")
+
+    def _should_retry(self, result: BeneficiaryData, attempts: Dict[str, int]) -> bool:
+        """Send transient failures to the retry queue instead of writing a permanent Failed row"""
+        if not is_transient_failure(result):
+            return False
+        attempts[result.aadhaar_number] = attempts.get(result.aadhaar_number, 0) + 1
+        if attempts[result.aadhaar_number] > self.max_retries:
+            logger.warning(f"GIVING UP on {result.aadhaar_number} after {self.max_retries} retries: {result.error_message}")
+            return False
+        self.pacer.retries += 1
+        logger.info(f"RETRY QUEUED ({attempts[result.aadhaar_number]}/{self.max_retries}): "
+                    f"{result.aadhaar_number} - {result.error_message}")
+        return True
+
+    async def _run_concurrent(self, to_process: List[str], output_sheet: str, counts: dict) -> List[BeneficiaryData]:
+        """Fetch with bounded concurrency and write each result as it completes"""
+        client = AsyncJanSoochnaPortalClient(self.concurrency, self.requests_per_second, pacer=self.pacer,
+                                             should_stop=self._batch_cancelled)
+        results = []
+        attempts: Dict[str, int] = {}
+        batch = to_process
+        
+        while batch and not self._batch_cancelled():
+            retry_batch = []
+            async for result in client.fetch_many(batch):
+                if self._should_retry(result, attempts):
+                    retry_batch.append(result.aadhaar_number)
+                    continue
+                results.append(result)
+                logger.info(f"COMPLETED {len(results)}/{len(to_process)}: {result.aadhaar_number}")
+                # Sheets client is blocking - keep the event loop free for the fetches
+                await asyncio.to_thread(self._record_result, result, output_sheet, counts)
+            
+            logger.info(self.pacer.summary())
+            if retry_batch:
+                logger.info(f"RETRYING {len(retry_batch)} Aadhaar numbers after {self.pacer.delay:.1f}s")
+                await asyncio.sleep(self.pacer.delay)
+            batch = retry_batch
+        
+        logger.info(client.token_summary())
+        return results
+
+    def _run_sequential(self, to_process: List[str], output_sheet: str, counts: dict) -> List[BeneficiaryData]:
+        """One lookup at a time, paced by the adaptive pacer, retrying transient failures at the end"""
+        results = []
+        attempts: Dict[str, int] = {}
+        queue = deque(to_process)
+        
+        while queue:
+            if self._batch_cancelled():
+                logger.warning(f"STOPPING batch with {len(queue)} Aadhaar numbers left")
+                break
+            aadhaar = queue.popleft()
+            logger.info(f"PROCESSING {len(results) + 1}/{len(to_process)}: {aadhaar} (retry queue: {len(queue)} left)")
+            
+            # Fetch data
+            started = time.monotonic()
+            result = self.portal_client.fetch_beneficiary_data(aadhaar)
+            self.pacer.observe(time.monotonic() - started, is_transient_failure(result))
+            
+            if self._should_retry(result, attempts):
+                queue.append(aadhaar)
+            else:
+                results.append(result)
+                # Write immediately
+                self._record_result(result, output_sheet, counts)
+            
+            if len(results) % 10 == 0:
+                logger.info(self.pacer.summary())
+            
+            # Delay before next
+            if queue:
+                delay = self.pacer.next_delay()
+                logger.info(f"WAITING {delay:.1f} seconds...")
+                time.sleep(delay)
+        
+        logger.info(self.pacer.summary())
+        logger.info(self.portal_client.token_summary())
+        return results
 
     def run_automation(self, input_sheet: str = "Sheet1", input_column: str = "A", output_sheet: str = "Results"):
         logger.info("STARTING Jan Soochna automation")
         
-        try:
-            # Read Aadhaar numbers
-            aadhaar_numbers = self.sheets_manager.read_aadhaar_numbers(input_sheet, input_column)
-            if not aadhaar_numbers:
-                logger.warning("No Aadhaar numbers found")
-                return []
+        # Read Aadhaar numbers
+        aadhaar_numbers = self.sheets_manager.read_aadhaar_numbers(input_sheet, input_column)
+        if not aadhaar_numbers:
+            logger.warning("No Aadhaar numbers found")
+            return []
+        
+        return self.dispatch(aadhaar_numbers, output_sheet)
+
+    def dispatch(self, aadhaar_numbers: List[str], output_sheet: str = "Results") -> List[BeneficiaryData]:
+        """Process this worker's part of the input: leased batches, a static shard, or everything"""
+        if self.coordinator:
+            return self.run_leased(aadhaar_numbers, output_sheet)
+        if self.shard_count > 1:
+            aadhaar_numbers = [a for a in aadhaar_numbers if in_shard(a, self.shard_index, self.shard_count)]
+            logger.info(f"SHARD {self.shard_index}/{self.shard_count}: {len(aadhaar_numbers)} Aadhaar numbers")
+        return self.process_aadhaar_numbers(aadhaar_numbers, output_sheet)
+
+    def _keep_lease(self, batch_id: int, stop: threading.Event):
+        """Heartbeat: renew the lease at a third of its length until the batch is finished
+        
+        A failed renewal means another worker may own the batch now; the fetch
+        loop sees _lease_lost and stops before its next lookup.
+        """
+        while not stop.wait(self.coordinator.lease_seconds / 3):
+            if not self.coordinator.renew(batch_id):
+                logger.warning(f"LEASE LOST on batch {batch_id}, stopping it")
+                self._lease_lost.set()
+                return
+
+    def run_leased(self, aadhaar_numbers: List[str], output_sheet: str = "Results") -> List[BeneficiaryData]:
+        """Claim batches from the coordinator until none are left"""
+        added = self.coordinator.enqueue(aadhaar_numbers)
+        logger.info(f"QUEUED {added} new Aadhaar numbers - {self.coordinator.summary()}")
+        
+        results = []
+        while not self._stop_requested:
+            claimed = self.coordinator.claim()
+            if claimed is None:
+                break
+            batch_id, batch = claimed
+            logger.info(f"CLAIMED batch {batch_id} ({len(batch)} numbers) as {self.coordinator.worker_id}")
             
+            stop = threading.Event()
+            self._lease_lost.clear()
+            heartbeat = threading.Thread(target=self._keep_lease, args=(batch_id, stop), daemon=True)
+            heartbeat.start()
+            try:
+                # Flushes before returning, so every written row is marked done
+                results.extend(self.process_aadhaar_numbers(batch, output_sheet))
+            finally:
+                stop.set()
+                heartbeat.join()
+                self.coordinator.release(batch_id)
+            if self._lease_lost.is_set():
+                logger.warning(f"ABANDONED batch {batch_id}: the rest is left to the worker that reclaimed it")
+                self._lease_lost.clear()
+            logger.info(self.coordinator.summary())
+        
+        return results
+
+    def process_aadhaar_numbers(self, aadhaar_numbers: List[str], output_sheet: str = "Results") -> List[BeneficiaryData]:
+        """Fetch and write every Aadhaar number not processed yet"""
+        try:
             # Check existing results
-            existing = self.sheets_manager.read_existing_results(output_sheet)
+            self._output_sheet = output_sheet
+            existing = self.existing_results(output_sheet)
             to_process = [a for a in aadhaar_numbers if a not in existing]
             
             logger.info(f"SUMMARY: Total={len(aadhaar_numbers)}, Already done={len(existing)}, To process={len(to_process)}")
@@ -429,39 +1386,61 @@ class JanSoochnaAutomation:
             
             # Process each Aadhaar
             results = []
-            success_count = 0
-            failed_count = 0
+            counts = {'success': 0, 'failed': 0}
             
-            for i, aadhaar in enumerate(to_process, 1):
-                logger.info(f"PROCESSING {i}/{len(to_process)}: {aadhaar}")
-                
-                # Fetch data
-                result = self.portal_client.fetch_beneficiary_data(aadhaar)
-                results.append(result)
-                
-                # Write immediately
-                success = self.sheets_manager.write_result(result, output_sheet)
-                
-                if success and result.fetch_status == "Success":
-                    success_count += 1
-                    logger.info(f"SUCCESS: {result.name}")
-                elif success and result.fetch_status == "Failed":
-                    failed_count += 1
-                    logger.info(f"FAILED: {result.error_message}")
-                
-                # Delay before next
-                if i < len(to_process):
-                    delay = random.uniform(self.delay_seconds, self.delay_seconds + 3)
-                    logger.info(f"WAITING {delay:.1f} seconds...")
-                    time.sleep(delay)
+            if self.concurrency > 1:
+                logger.info(f"CONCURRENT mode: {self.concurrency} in flight, {self.requests_per_second} requests/sec")
+                results = asyncio.run(self._run_concurrent(to_process, output_sheet, counts))
+            else:
+                results = self._run_sequential(to_process, output_sheet, counts)
             
             # Final summary
-            logger.info(f"COMPLETED: {success_count} successful, {failed_count} failed")
+            logger.info(f"COMPLETED: {counts['success']} successful, {counts['failed']} failed")
             return results
             
         except Exception as e:
             logger.error(f"Automation error: {e}")
             return []
+        
+        finally:
+            # Write whatever is still buffered
+            if not self.sheets_manager.flush_results():
+                logger.error("Some results could not be written to the sheet")
+
+    def request_stop(self, signum=None, frame=None):
+        """Signal handler: finish the current batch, then leave watch mode
+        
+        The handler is restored to the default after the first signal, so a
+        second Ctrl+C interrupts a long batch right away.
+        """
+        logger.info("STOP requested, finishing current batch (press Ctrl+C again to abort)...")
+        self._stop_requested = True
+        if signum == signal.SIGINT:
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+        elif signum is not None:
+            signal.signal(signum, signal.SIG_DFL)
+
+    def watch(self, input_sheet: str = "Sheet1", input_column: str = "A", output_sheet: str = "Results",
+              interval: float = 30):
+        """Poll the input sheet and process newly added rows until stopped"""
+        logger.info(f"WATCHING {input_sheet}!{input_column} every {interval}s (Ctrl+C / SIGTERM to stop)")
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+        
+        next_row = 1
+        while not self._stop_requested:
+            # Only rows below the last read one are fetched; the index filters anything already done
+            aadhaar_numbers, next_row = self.sheets_manager.read_aadhaar_rows(input_sheet, input_column, next_row)
+            if aadhaar_numbers:
+                logger.info(f"NEW ROWS: {len(aadhaar_numbers)} Aadhaar numbers")
+                self.dispatch(aadhaar_numbers, output_sheet)
+            
+            # Sleep in short steps so a stop request is honoured quickly
+            deadline = time.monotonic() + interval
+            while not self._stop_requested and time.monotonic() < deadline:
+                time.sleep(min(1.0, deadline - time.monotonic()))
+        
+        logger.info("WATCH stopped")
 
 def show_menu():
     """Display main menu"""
@@ -475,12 +1454,15 @@ def show_menu():
     print("5. Exit")
     print("="*60)
 
-def test_single_aadhaar():
+def test_single_aadhaar(aadhaar: Optional[str] = None) -> bool:
     """Test single Aadhaar"""
-    aadhaar = input("Enter Aadhaar number to test: ").strip()
+    if aadhaar is None:
+        aadhaar = input("Enter Aadhaar number to test: ").strip()
     if len(aadhaar) != 12 or not aadhaar.isdigit():
         print("ERROR: Please enter a valid 12-digit Aadhaar number")
-        return
+        return False
+    if not is_valid_aadhaar(aadhaar):
+        print("WARNING: Aadhaar checksum is invalid, querying anyway")
     
     client = JanSoochnaPortalClient()
     result = client.fetch_beneficiary_data(aadhaar)
@@ -494,66 +1476,147 @@ def test_single_aadhaar():
         print(f"Address: {result.address}")
     else:
         print(f"Error: {result.error_message}")
+    return result.fetch_status == "Success"
+
+# Configuration defaults
+CREDENTIALS_FILE = "google_sheets_credentials.json"
+SPREADSHEET_ID = "1y1fnk7dGjZAg3gasp7njQHWSwAeGE-0NXNFZCrdtK_E"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Jan Soochna automation. Run without a command for the interactive menu."
+    )
+    parser.add_argument("--credentials", default=CREDENTIALS_FILE, help="Google service account JSON")
+    parser.add_argument("--spreadsheet-id", default=SPREADSHEET_ID)
+    parser.add_argument("--input-sheet", default="Sheet1")
+    parser.add_argument("--input-column", default="A")
+    parser.add_argument("--output-sheet", default="Results")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Lookups in flight; > 1 switches to the async fetch engine")
+    parser.add_argument("--rps", type=float, default=1.0,
+                        help="Global portal requests per second in async mode")
+    parser.add_argument("--delay", type=float, default=6,
+                        help="Starting gap between lookups in sequential mode (adapted at runtime)")
+    parser.add_argument("--max-retries", type=int, default=MAX_RETRIES,
+                        help="Retries for 5xx/timeout failures before a Failed row is written")
+    parser.add_argument("--index", default=DEFAULT_INDEX_FILE, help="Local SQLite index of processed Aadhaar numbers")
+    parser.add_argument("--shard-index", type=int, default=0, help="This process's shard (0-based)")
+    parser.add_argument("--shard-count", type=int, default=1,
+                        help="Split the input by Aadhaar number across this many processes")
+    parser.add_argument("--coordinator", metavar="DB",
+                        help="SQLite work queue shared by the workers on this host (keep it on local disk); "
+                             "workers claim leased batches instead of static shards")
+    parser.add_argument("--lease-seconds", type=float, default=LEASE_SECONDS)
+    parser.add_argument("--batch-size", type=int, default=LEASE_BATCH_SIZE)
+    
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("run", help="Process every new Aadhaar number once")
+    commands.add_parser("show", help="Print the Results sheet")
+    clear = commands.add_parser("clear", help="Clear Results and the local index")
+    clear.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    test = commands.add_parser("test", help="Look up a single Aadhaar number")
+    test.add_argument("aadhaar")
+    watch = commands.add_parser("watch", help="Keep polling the input sheet and process new rows")
+    watch.add_argument("--interval", type=float, default=30, help="Seconds between polls")
+    return parser
+
+
+def interactive_menu(automation: JanSoochnaAutomation, args: argparse.Namespace):
+    """Original menu loop"""
+    while True:
+        show_menu()
+        choice = input("Enter your choice (1-5): ").strip()
+        
+        if choice == "1":
+            print("\nStarting automation...")
+            results = automation.run_automation(args.input_sheet, args.input_column, args.output_sheet)
+            if results:
+                success_count = len([r for r in results if r.fetch_status == "Success"])
+                print(f"\nAutomation completed: {success_count}/{len(results)} successful")
+            else:
+                print("No new Aadhaar numbers to process")
+            input("\nPress Enter to continue...")
+            
+        elif choice == "2":
+            print("\nCurrent Results:")
+            automation.sheets_manager.show_results(args.output_sheet)
+            input("\nPress Enter to continue...")
+            
+        elif choice == "3":
+            confirm = input("Are you sure you want to clear all results? (yes/no): ")
+            if confirm.lower() == 'yes':
+                if automation.clear_results(args.output_sheet):
+                    print("Results cleared successfully!")
+                else:
+                    print("Failed to clear results")
+            else:
+                print("Operation cancelled")
+            input("\nPress Enter to continue...")
+            
+        elif choice == "4":
+            test_single_aadhaar()
+            input("\nPress Enter to continue...")
+            
+        elif choice == "5":
+            print("Goodbye!")
+            break
+            
+        else:
+            print("Invalid choice. Please try again.")
+
 
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     """Main application"""
-    # Configuration
-    CREDENTIALS_FILE = "google_sheets_credentials.json"
-    SPREADSHEET_ID = "1y1fnk7dGjZAg3gasp7njQHWSwAeGE-0NXNFZCrdtK_E"
+    args = build_parser().parse_args(argv)
+    
+    # A single lookup needs no Sheets access
+    if args.command == "test":
+        return 0 if test_single_aadhaar(args.aadhaar) else 1
+    
+    if not 0 <= args.shard_index < args.shard_count:
+        print("ERROR: --shard-index must be between 0 and --shard-count - 1")
+        return 1
     
     # Check if credentials file exists
-    if not os.path.exists(CREDENTIALS_FILE):
-        print(f"ERROR: {CREDENTIALS_FILE} not found!")
+    if not os.path.exists(args.credentials):
+        print(f"ERROR: {args.credentials} not found!")
         print("Please ensure your Google Sheets credentials file is in the current directory.")
-        return
+        return 1
     
     try:
-        automation = JanSoochnaAutomation(CREDENTIALS_FILE, SPREADSHEET_ID, delay_seconds=6)
-        
-        while True:
-            show_menu()
-            choice = input("Enter your choice (1-5): ").strip()
-            
-            if choice == "1":
-                print("\nStarting automation...")
-                results = automation.run_automation("Sheet1", "A", "Results")
-                if results:
-                    success_count = len([r for r in results if r.fetch_status == "Success"])
-                    print(f"\nAutomation completed: {success_count}/{len(results)} successful")
-                else:
-                    print("No new Aadhaar numbers to process")
-                input("\nPress Enter to continue...")
-                
-            elif choice == "2":
-                print("\nCurrent Results:")
-                automation.sheets_manager.show_results("Results")
-                input("\nPress Enter to continue...")
-                
-            elif choice == "3":
-                confirm = input("Are you sure you want to clear all results? (yes/no): ")
-                if confirm.lower() == 'yes':
-                    if automation.sheets_manager.clear_results_sheet("Results"):
-                        print("Results cleared successfully!")
-                    else:
-                        print("Failed to clear results")
-                else:
-                    print("Operation cancelled")
-                input("\nPress Enter to continue...")
-                
-            elif choice == "4":
-                test_single_aadhaar()
-                input("\nPress Enter to continue...")
-                
-            elif choice == "5":
-                print("Goodbye!")
-                break
-                
-            else:
-                print("Invalid choice. Please try again.")
+        automation = JanSoochnaAutomation(args.credentials, args.spreadsheet_id, delay_seconds=args.delay,
+                                          concurrency=args.concurrency, requests_per_second=args.rps,
+                                          max_retries=args.max_retries, index_file=args.index,
+                                          shard_index=args.shard_index, shard_count=args.shard_count)
+        if args.coordinator:
+            automation.coordinator = LeaseCoordinator(args.coordinator, lease_seconds=args.lease_seconds,
+                                                      batch_size=args.batch_size)
+        
+        if args.command == "run":
+            results = automation.run_automation(args.input_sheet, args.input_column, args.output_sheet)
+            success_count = len([r for r in results if r.fetch_status == "Success"])
+            print(f"Automation completed: {success_count}/{len(results)} successful")
+        elif args.command == "show":
+            automation.sheets_manager.show_results(args.output_sheet)
+        elif args.command == "clear":
+            if not args.yes and input("Are you sure you want to clear all results? (yes/no): ").lower() != 'yes':
+                print("Operation cancelled")
+                return 1
+            if not automation.clear_results(args.output_sheet):
+                print("Failed to clear results")
+                return 1
+            print("Results cleared successfully!")
+        elif args.command == "watch":
+            automation.watch(args.input_sheet, args.input_column, args.output_sheet, args.interval)
+        else:
+            interactive_menu(automation, args)
+        return 0
                 
     except Exception as e:
         logger.error(f"Application error: {e}")
         print(f"ERROR: {e}")
+        return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
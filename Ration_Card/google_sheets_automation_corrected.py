@@ -1,7 +1,18 @@
 import gspread
 import time
+import json
+import os
+import sys
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from portal_scraper import RajasthanFoodPortalScraper
+from portal_scraper import RajasthanFoodPortalScraper, is_transient_error
+from portal_http_scraper import RajasthanFoodPortalHttpScraper
+
+# Shared Chrome setup lives in the repository-level common package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.driver_pool import DriverPool, DEFAULT_MAX_USES, DEFAULT_MAX_RSS_MB
 import logging
 import re
 
@@ -9,12 +20,209 @@ import re
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds before a failed search is tried again
+RETRY_DELAY = 3
+
+# Result table header keywords for each output column (English and Hindi headings)
+RESULT_COLUMN_KEYWORDS = {
+    'token_number': ('token', 'टोकन'),
+    'user_id': ('user', 'यूजर', 'उपयोगकर्ता'),
+    'status': ('status', 'स्थिति'),
+    'form_number': ('form', 'फॉर्म', 'फार्म', 'आवेदन'),
+    'office_name': ('office', 'अधिकारी', 'कार्यालय'),
+}
+
+
+def _keyword_pattern(keyword):
+    """English keywords match whole words only ('form' must not match 'information')"""
+    if keyword.isascii():
+        return re.compile(rf'(?<![a-z]){re.escape(keyword)}(?![a-z])')
+    return re.compile(re.escape(keyword))
+
+
+RESULT_COLUMN_PATTERNS = {
+    field: [_keyword_pattern(keyword) for keyword in keywords]
+    for field, keywords in RESULT_COLUMN_KEYWORDS.items()
+}
+
+
+def map_result_columns(headers):
+    """Output field -> table header, first matching header wins"""
+    columns = {}
+    for header in headers:
+        lowered = header.lower()
+        for field, patterns in RESULT_COLUMN_PATTERNS.items():
+            if field not in columns and any(pattern.search(lowered) for pattern in patterns):
+                columns[field] = header
+                break
+    return columns
+
+
+DEFAULT_CHECKPOINT_FILE = 'ration_card_checkpoint.json'
+DEFAULT_STATUS_CACHE_FILE = 'ration_card_status.json'
+# Statuses that can no longer change - these cards are never searched again
+TERMINAL_STATUS_PREFIXES = ('Ration Card Printed',)
+
+
+def is_terminal_status(status):
+    return bool(status) and status.strip().startswith(TERMINAL_STATUS_PREFIXES)
+
+
+class StatusCache:
+    """Local per-card status history, used to decide which cards need a new search
+    
+    A card is due when it has never been seen with a status, or its last status
+    is not terminal and was checked more than refresh_hours ago (0 = always).
+    """
+    
+    def __init__(self, path=DEFAULT_STATUS_CACHE_FILE, refresh_hours=24):
+        self.path = path
+        self.refresh_hours = refresh_hours
+        self.cards = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.cards = json.load(f)
+            except Exception as e:
+                logger.warning(f"⚠️  Ignoring unreadable status cache: {str(e)}")
+    
+    def record(self, ration_number, status):
+        """Note a status seen now; history only grows when the status changes"""
+        now = datetime.now().isoformat(timespec='seconds')
+        entry = self.cards.setdefault(ration_number, {'history': [], 'checked_at': now})
+        if not entry['history'] or entry['history'][-1]['status'] != status:
+            entry['history'].append({'status': status, 'seen_at': now})
+        entry['checked_at'] = now
+    
+    def last_status(self, ration_number):
+        entry = self.cards.get(ration_number)
+        return entry['history'][-1]['status'] if entry and entry['history'] else ''
+    
+    def is_due(self, ration_number):
+        entry = self.cards.get(ration_number)
+        if not entry or not entry['history']:
+            return True
+        if is_terminal_status(entry['history'][-1]['status']):
+            return False
+        age_hours = (datetime.now() - datetime.fromisoformat(entry['checked_at'])).total_seconds() / 3600
+        return age_hours >= self.refresh_hours
+    
+    def save(self):
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.cards, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.path)
+
+
+class RationCardSheetWriter:
+    """Buffers B:F row updates and sends them as one batch_update
+    
+    After each successful flush the highest written row is saved to a local
+    checkpoint file, so a crash loses at most one buffer and the next run can
+    resume below it. Rows are expected in ascending order.
+    """
+    
+    def __init__(self, sheet, flush_rows=20, flush_seconds=30, checkpoint_file=DEFAULT_CHECKPOINT_FILE,
+                 on_flush=None):
+        self.sheet = sheet
+        self.on_flush = on_flush  # called with the (row_number, row_data) pairs once they are written
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_key = f"{sheet.spreadsheet.id}/{sheet.title}"
+        self.pending = []
+        self.last_flush = time.time()
+    
+    def add(self, row_number, row_data):
+        self.pending.append((row_number, row_data))
+    
+    def due(self):
+        if not self.pending:
+            return False
+        return len(self.pending) >= self.flush_rows or time.time() - self.last_flush >= self.flush_seconds
+    
+    def flush(self):
+        """Write buffered rows; returns how many were written (0 and kept buffered on failure)"""
+        if not self.pending:
+            return 0
+        try:
+            self.sheet.batch_update([
+                {'range': f'B{row_number}:F{row_number}', 'values': [row_data]}
+                for row_number, row_data in self.pending
+            ])
+        except Exception as e:
+            logger.error(f"❌ Batch update of {len(self.pending)} rows failed: {str(e)}")
+            return 0
+        
+        written = len(self.pending)
+        last_row = self.pending[-1][0]
+        if self.on_flush:
+            self.on_flush(self.pending)
+        self.pending = []
+        self.last_flush = time.time()
+        self.save_checkpoint(last_row)
+        logger.info(f"✅ Wrote {written} rows (up to row {last_row})")
+        return written
+    
+    def _load(self):
+        if not os.path.exists(self.checkpoint_file):
+            return {}
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️  Ignoring unreadable checkpoint file: {str(e)}")
+            return {}
+    
+    def _write(self, checkpoints):
+        # Write-then-rename so a crash mid-write cannot corrupt the checkpoint
+        temp_file = f"{self.checkpoint_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(checkpoints, f, indent=2)
+        os.replace(temp_file, self.checkpoint_file)
+    
+    def save_checkpoint(self, last_row):
+        checkpoints = self._load()
+        checkpoints[self.checkpoint_key] = {'last_row': last_row, 'updated_at': datetime.now().isoformat()}
+        self._write(checkpoints)
+    
+    def last_checkpoint(self):
+        """Last flushed row from an unfinished run of this sheet, or None"""
+        entry = self._load().get(self.checkpoint_key)
+        return entry['last_row'] if entry else None
+    
+    def clear_checkpoint(self):
+        checkpoints = self._load()
+        if checkpoints.pop(self.checkpoint_key, None) is not None:
+            self._write(checkpoints)
+
+
 class GoogleSheetsRationCardAutomation:
-    def __init__(self, credentials_file='credentials.json'):
+    def __init__(self, credentials_file='credentials.json', pool_size=1, headless=True, use_http=False,
+                 flush_rows=20, flush_seconds=30, checkpoint_file=DEFAULT_CHECKPOINT_FILE,
+                 status_cache_file=DEFAULT_STATUS_CACHE_FILE, refresh_hours=24,
+                 driver_max_uses=DEFAULT_MAX_USES, driver_max_rss_mb=DEFAULT_MAX_RSS_MB):
         self.credentials_file = credentials_file
         self.gc = None
         self.sheet = None
-        self.scraper = RajasthanFoodPortalScraper(headless=True)
+        self.writer = None
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.checkpoint_file = checkpoint_file
+        self.status_cache = StatusCache(status_cache_file, refresh_hours)
+        self._row_numbers = {}  # sheet row -> ration card number for the current run
+        # One scraper per pool worker; the HTTP one only starts Chrome as a fallback
+        scraper_class = RajasthanFoodPortalHttpScraper if use_http else RajasthanFoodPortalScraper
+        self.scrapers = [scraper_class(headless=headless) for _ in range(max(1, pool_size))]
+        self.scraper = self.scrapers[0]
+        
+        # Chrome scrapers share a pool that pre-launches, health-checks and recycles drivers
+        self.driver_pool = None
+        if not use_http:
+            self.driver_pool = DriverPool(self.scraper.launch_driver, size=len(self.scrapers),
+                                          max_uses=driver_max_uses, max_rss_mb=driver_max_rss_mb)
+            for scraper in self.scrapers:
+                scraper.driver_pool = self.driver_pool
         
     def authenticate(self):
         """Authenticate with Google Sheets API"""
@@ -70,7 +278,6 @@ class GoogleSheetsRationCardAutomation:
             if len(headers) < len(expected_headers):
                 self.sheet.update('A1:F1', [expected_headers])
                 logger.info("✅ Headers setup completed (6 columns)")
-                time.sleep(1)
             
             return True
             
@@ -78,8 +285,13 @@ class GoogleSheetsRationCardAutomation:
             logger.error(f"❌ Failed to setup headers: {str(e)}")
             return False
     
-    def get_ration_card_numbers(self, start_row=2):
-        """Get ration card numbers from column A"""
+    def get_ration_card_numbers(self, start_row=2, skip_resolved=True):
+        """Get ration card numbers from column A that still need a search
+        
+        The same read also gives the current Status (column F): cards already
+        in a terminal state, or checked recently per the status cache, are
+        skipped unless skip_resolved is False.
+        """
         try:
             all_values = self.sheet.get_all_values()
             
@@ -88,23 +300,57 @@ class GoogleSheetsRationCardAutomation:
                 return []
             
             ration_numbers = []
+            skipped_terminal = skipped_fresh = 0
             for i in range(start_row - 1, len(all_values)):
                 row_data = all_values[i]
                 if row_data and len(row_data) > 0 and row_data[0]:
                     ration_number = str(row_data[0]).strip()
                     if ration_number and ration_number.lower() not in ['', 'nan', 'none']:
+                        status = row_data[5].strip() if len(row_data) > 5 else ''
+                        if skip_resolved:
+                            if is_terminal_status(status) or is_terminal_status(self.status_cache.last_status(ration_number)):
+                                skipped_terminal += 1
+                                continue
+                            if status and not self.status_cache.is_due(ration_number):
+                                skipped_fresh += 1
+                                continue
                         ration_numbers.append({
                             'row': i + 1,
-                            'number': ration_number
+                            'number': ration_number,
+                            'status': status
                         })
             
-            logger.info(f"📋 Found {len(ration_numbers)} ration card numbers to process")
+            logger.info(f"📋 Found {len(ration_numbers)} ration card numbers to process "
+                        f"({skipped_terminal} already printed, {skipped_fresh} checked recently)")
             return ration_numbers
             
         except Exception as e:
             logger.error(f"❌ Failed to get ration card numbers: {str(e)}")
             return []
     
+    def parse_records(self, records, ration_card_number=''):
+        """Column lookup on the structured result rows; None if no row has the expected columns"""
+        best = None
+        for record in records:
+            columns = map_result_columns(record.keys())
+            # Form/token/user/status - at least two of them make it the result table
+            if len(columns) < 2:
+                continue
+            if ration_card_number and ration_card_number in record.values():
+                best = (record, columns)
+                break
+            if best is None or len(columns) > len(best[1]):
+                best = (record, columns)
+        
+        if best is None:
+            return None
+        record, columns = best
+        parsed = {field: '' for field in ('office_name', 'form_number', 'token_number', 'user_id', 'status')}
+        for field, header in columns.items():
+            parsed[field] = record[header].replace('*', '').strip()
+        logger.debug(f"Parsed from table columns: {parsed}")
+        return parsed
+    
     def parse_search_result(self, result):
         """Parse scraper result with CORRECTED User ID extraction"""
         parsed = {
@@ -118,6 +364,12 @@ class GoogleSheetsRationCardAutomation:
         if 'error' in result:
             return parsed  # Return empty values for errors
         
+        # Structured rows first; the text parsing below handles unexpected layouts
+        if result.get('records'):
+            from_table = self.parse_records(result['records'], result.get('ration_card_number', ''))
+            if from_table and any(from_table.values()):
+                return from_table
+        
         try:
             # Look for the main data in all table content
             data_found = False
@@ -141,7 +393,7 @@ class GoogleSheetsRationCardAutomation:
                         clean_line = line.replace('*', '').strip()
                         parts = clean_line.split()
                         
-                        logger.info(f"🔍 Parsing line: {clean_line}")
+                        logger.debug(f"🔍 Parsing line: {clean_line}")
                         
                         # IMPROVED EXTRACTION LOGIC
                         office_parts = []
@@ -156,13 +408,13 @@ class GoogleSheetsRationCardAutomation:
                             # Extract numbers (Form Number and Token Number)
                             if part.isdigit() and len(part) >= 8:
                                 numbers.append(part)
-                                logger.info(f"📊 Found number: {part}")
+                                logger.debug(f"📊 Found number: {part}")
                             
                             # Extract User ID (format: Letter + numbers, e.g., K119269051)
                             elif (len(part) > 5 and part[0].isalpha() and 
                                   part[1:].isdigit() and not 'Printed' in part):
                                 user_id = part
-                                logger.info(f"👤 Found User ID: {part}")
+                                logger.debug(f"👤 Found User ID: {part}")
                             
                             # Extract Status (Ration Card Printed(...))
                             elif part == 'Ration' and i + 2 < len(parts):
@@ -188,31 +440,31 @@ class GoogleSheetsRationCardAutomation:
                         # Assign parsed values
                         if office_parts:
                             parsed['office_name'] = ' '.join(office_parts)
-                            logger.info(f"🏢 Office: {parsed['office_name']}")
+                            logger.debug(f"🏢 Office: {parsed['office_name']}")
                         
                         if len(numbers) >= 2:
                             parsed['form_number'] = numbers[0]
                             parsed['token_number'] = numbers[1]
-                            logger.info(f"📋 Form: {parsed['form_number']}")
-                            logger.info(f"🎫 Token: {parsed['token_number']}")
+                            logger.debug(f"📋 Form: {parsed['form_number']}")
+                            logger.debug(f"🎫 Token: {parsed['token_number']}")
                         elif len(numbers) == 1:
                             parsed['form_number'] = numbers[0]
-                            logger.info(f"📋 Form: {parsed['form_number']}")
+                            logger.debug(f"📋 Form: {parsed['form_number']}")
                         
                         if user_id:
                             parsed['user_id'] = user_id
-                            logger.info(f"👤 User ID: {parsed['user_id']}")
+                            logger.debug(f"👤 User ID: {parsed['user_id']}")
                         
                         if status_parts:
                             parsed['status'] = ' '.join(status_parts)
-                            logger.info(f"📊 Status: {parsed['status']}")
+                            logger.debug(f"📊 Status: {parsed['status']}")
                         else:
                             # Fallback: look for "Printed" pattern in the original line
                             if 'Printed' in line:
                                 status_match = re.search(r'Ration Card Printed\([^)]+\)', line)
                                 if status_match:
                                     parsed['status'] = status_match.group()
-                                    logger.info(f"📊 Status (regex): {parsed['status']}")
+                                    logger.debug(f"📊 Status (regex): {parsed['status']}")
                         
                         break
                 
@@ -224,106 +476,182 @@ class GoogleSheetsRationCardAutomation:
         
         return parsed
     
-    def update_row_data(self, row_number, parsed_data):
-        """Update a single row with parsed data - CORRECTED to 5 columns only"""
-        try:
-            # Prepare data for columns B to F (5 columns total)
-            row_data = [
-                parsed_data['office_name'],
-                parsed_data['form_number'], 
-                parsed_data['token_number'],
-                parsed_data['user_id'],
-                parsed_data['status']
-            ]
+    @staticmethod
+    def row_values(parsed_data):
+        """Values for columns B to F (5 columns total)"""
+        return [
+            parsed_data['office_name'],
+            parsed_data['form_number'], 
+            parsed_data['token_number'],
+            parsed_data['user_id'],
+            parsed_data['status']
+        ]
+    
+    def _start_scrapers(self):
+        """Start every pool driver in parallel, keeping the ones that came up"""
+        if self.driver_pool:
+            self.driver_pool.start()
+        def start(scraper):
+            try:
+                scraper.start_driver()
+                return scraper
+            except Exception as e:
+                logger.error(f"❌ Pool driver failed to start: {str(e)}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
+            return [scraper for scraper in executor.map(start, self.scrapers) if scraper]
+    
+    def _search_worker(self, scraper, work_queue, result_queue, max_retries, delay_seconds):
+        """Pool worker: owns one browser, takes cards off the queue, puts failed attempts back
+        
+        work_queue is a priority queue of (ready_at, index, task), so the first entry is
+        always the one due soonest; a None task stops the worker.
+        """
+        while True:
+            ready_at, index, task = work_queue.get()
+            if task is None:
+                break
             
-            # Update columns B to F only
-            range_name = f'B{row_number}:F{row_number}'
-            self.sheet.update(values=[row_data], range_name=range_name)
-            time.sleep(1)
+            # Nothing else is due before this retry: leave it for whoever is free when it is
+            wait = ready_at - time.time()
+            if wait > 0:
+                work_queue.put((ready_at, index, task))
+                time.sleep(wait)
+                continue
             
-            logger.info(f"✅ Updated row {row_number} with search results")
-            return True
+            ration_number = task['number']
+            try:
+                try:
+                    search_result = scraper.search_ration_card(ration_number)
+                except Exception as e:
+                    search_result = {"error": f"Search failed: {str(e)}"}
+                if not search_result:
+                    search_result = {"error": "No response from portal"}
+                
+                if ('error' in search_result and is_transient_error(search_result['error'])
+                        and task['attempt'] < max_retries):
+                    task['attempt'] += 1
+                    print(f"⚠️  {ration_number}: attempt {task['attempt'] - 1} failed, queued for retry")
+                    work_queue.put((time.time() + RETRY_DELAY, task['index'], task))
+                else:
+                    result_queue.put((task, self.parse_search_result(search_result)))
+            except Exception as e:
+                # Every card taken off the queue must come back as a result, or the main loop waits for it
+                logger.error(f"❌ {ration_number}: could not be processed: {str(e)}")
+                result_queue.put((task, self.parse_search_result({"error": str(e)})))
             
-        except Exception as e:
-            logger.error(f"❌ Failed to update row {row_number}: {str(e)}")
-            return False
+            if not work_queue.empty():
+                time.sleep(delay_seconds)
+    
+    def _print_parsed(self, parsed_data):
+        """Show what was found for one card"""
+        if any([parsed_data['office_name'], parsed_data['form_number'], 
+               parsed_data['token_number'], parsed_data['user_id'], parsed_data['status']]):
+            print(f"✅ Success! Found:")
+            if parsed_data['office_name']:
+                print(f"   🏢 Office: {parsed_data['office_name']}")
+            if parsed_data['form_number']:
+                print(f"   📋 Form Number: {parsed_data['form_number']}")
+            if parsed_data['token_number']:
+                print(f"   🎫 Token Number: {parsed_data['token_number']}")
+            if parsed_data['user_id']:
+                print(f"   👤 User ID: {parsed_data['user_id']}")
+            if parsed_data['status']:
+                print(f"   📊 Status: {parsed_data['status']}")
+        else:
+            print(f"⚠️  No data found for this ration card")
+    
+    def _on_rows_written(self, rows):
+        """Remember the statuses that made it to the sheet"""
+        for row_number, row_data in rows:
+            ration_number = self._row_numbers.pop(row_number, None)
+            # Empty status means nothing was found - leave it due for the next run
+            if ration_number and row_data[4]:
+                self.status_cache.record(ration_number, row_data[4])
     
-    def process_all_ration_cards(self, start_row=2, delay_seconds=5):
-        """Process all ration card numbers"""
+    def process_all_ration_cards(self, start_row=2, delay_seconds=5, max_retries=1, resume=True,
+                                 skip_resolved=True):
+        """Process all ration card numbers with a pool of browsers
+        
+        Each worker waits delay_seconds between its own searches. Results are
+        buffered in sheet row order and written in batches; with resume, a run
+        that crashed continues below the last row it wrote.
+        """
+        workers = []
+        work_queue = queue.PriorityQueue()
+        self.writer = RationCardSheetWriter(self.sheet, self.flush_rows, self.flush_seconds, self.checkpoint_file,
+                                            on_flush=self._on_rows_written)
+        success_count = 0
         try:
-            self.scraper.start_driver()
-            ration_numbers = self.get_ration_card_numbers(start_row)
+            last_row = self.writer.last_checkpoint() if resume else None
+            if last_row and last_row >= start_row:
+                print(f"⏩ Resuming after row {last_row} (checkpoint from an unfinished run)")
+                start_row = last_row + 1
+            
+            ration_numbers = self.get_ration_card_numbers(start_row, skip_resolved)
+            self._row_numbers = {item['row']: item['number'] for item in ration_numbers}
             
             if not ration_numbers:
                 logger.info("No ration card numbers found to process")
                 return True
             
+            scrapers = self._start_scrapers()
+            if not scrapers:
+                logger.error("❌ No WebDriver could be started")
+                return False
+            
             processed_count = 0
-            success_count = 0
             
-            print(f"\n🚀 Starting to process {len(ration_numbers)} ration card numbers...")
+            print(f"\n🚀 Starting to process {len(ration_numbers)} ration card numbers with {len(scrapers)} browser(s)...")
             print("=" * 60)
             
-            for item in ration_numbers:
-                row_num = item['row']
-                ration_number = item['number']
-                
-                print(f"\n📋 Processing {processed_count + 1}/{len(ration_numbers)}")
-                print(f"🔢 Ration Card: {ration_number} (Row {row_num})")
-                
-                # Search with retry logic
-                max_retries = 2
-                search_result = None
-                
-                for attempt in range(max_retries):
-                    try:
-                        search_result = self.scraper.search_ration_card(ration_number)
-                        if 'error' not in search_result:
-                            break
-                        elif attempt < max_retries - 1:
-                            print(f"⚠️  Attempt {attempt + 1} failed, retrying...")
-                            time.sleep(3)
-                    except Exception as e:
-                        if attempt < max_retries - 1:
-                            print(f"⚠️  Attempt {attempt + 1} failed: {str(e)}, retrying...")
-                            time.sleep(3)
-                        else:
-                            search_result = {"error": f"All attempts failed: {str(e)}"}
-                
-                if not search_result:
-                    search_result = {"error": "No response from portal"}
-                
-                # Parse results
-                parsed_data = self.parse_search_result(search_result)
+            for index, item in enumerate(ration_numbers):
+                work_queue.put((0, index, {'index': index, 'row': item['row'], 'number': item['number'],
+                                           'attempt': 0}))
+            
+            result_queue = queue.Queue()
+            for i, scraper in enumerate(scrapers):
+                worker = threading.Thread(target=self._search_worker, name=f"scraper-{i + 1}",
+                                          args=(scraper, work_queue, result_queue, max_retries, delay_seconds),
+                                          daemon=True)
+                worker.start()
+                workers.append(worker)
+            
+            # Workers finish out of order; hold results until the next row in line arrives
+            finished = {}
+            while processed_count < len(ration_numbers):
+                try:
+                    task, parsed_data = result_queue.get(timeout=1)
+                except queue.Empty:
+                    if self.writer.due():
+                        success_count += self.writer.flush()
+                    if not any(worker.is_alive() for worker in workers):
+                        logger.error(f"❌ All search workers exited with "
+                                     f"{len(ration_numbers) - processed_count} cards unfinished")
+                        break
+                    continue
+                finished[task['index']] = (task, parsed_data)
                 
-                # Update sheet
-                if self.update_row_data(row_num, parsed_data):
-                    success_count += 1
+                while processed_count in finished:
+                    task, parsed_data = finished.pop(processed_count)
+                    row_num = task['row']
                     
-                    # Show results
-                    if any([parsed_data['office_name'], parsed_data['form_number'], 
-                           parsed_data['token_number'], parsed_data['user_id'], parsed_data['status']]):
-                        print(f"✅ Success! Found:")
-                        if parsed_data['office_name']:
-                            print(f"   🏢 Office: {parsed_data['office_name']}")
-                        if parsed_data['form_number']:
-                            print(f"   📋 Form Number: {parsed_data['form_number']}")
-                        if parsed_data['token_number']:
-                            print(f"   🎫 Token Number: {parsed_data['token_number']}")
-                        if parsed_data['user_id']:
-                            print(f"   👤 User ID: {parsed_data['user_id']}")
-                        if parsed_data['status']:
-                            print(f"   📊 Status: {parsed_data['status']}")
-                    else:
-                        print(f"⚠️  No data found for this ration card")
-                else:
-                    print(f"❌ Failed to update sheet for row {row_num}")
-                
-                processed_count += 1
+                    print(f"\n📋 Processed {processed_count + 1}/{len(ration_numbers)}")
+                    print(f"🔢 Ration Card: {task['number']} (Row {row_num})")
+                    
+                    # Buffer for the next batch write
+                    self.writer.add(row_num, self.row_values(parsed_data))
+                    self._print_parsed(parsed_data)
+                    processed_count += 1
                 
-                if processed_count < len(ration_numbers):
-                    print(f"⏳ Waiting {delay_seconds} seconds...")
-                    time.sleep(delay_seconds)
+                if self.writer.due():
+                    success_count += self.writer.flush()
+            
+            success_count += self.writer.flush()
+            # Cards left behind by dead workers must be picked up by the next run's resume
+            if processed_count == len(ration_numbers) and not self.writer.pending:
+                self.writer.clear_checkpoint()
             
             print(f"\n🎉 Processing completed!")
             print(f"📊 Summary:")
@@ -337,7 +665,29 @@ class GoogleSheetsRationCardAutomation:
             logger.error(f"❌ Error during processing: {str(e)}")
             return False
         finally:
-            self.scraper.close()
+            # Keep whatever finished before a crash
+            if self.writer.pending:
+                self.writer.flush()
+            try:
+                self.status_cache.save()
+            except Exception as e:
+                logger.error(f"❌ Failed to save status cache: {str(e)}")
+            # Drop unstarted work so the stop markers are reached right away
+            while True:
+                try:
+                    work_queue.get_nowait()
+                except queue.Empty:
+                    break
+            # Distinct negative indexes sort the stop markers first without comparing the None tasks
+            for n, _ in enumerate(workers):
+                work_queue.put((0, -1 - n, None))
+            for worker in workers:
+                worker.join()
+            for scraper in self.scrapers:
+                scraper.close()
+            if self.driver_pool:
+                self.driver_pool.close()
+                logger.info(self.driver_pool.summary())
     
     def run_automation(self, sheet_url, worksheet_name=None, start_row=2):
         """Complete automation workflow"""
@@ -363,13 +713,17 @@ class GoogleSheetsRationCardAutomation:
         print("\n✅ Automation completed successfully! 🎉")
         return True
 
-def run_sheets_automation(sheet_url, worksheet_name=None):
+def run_sheets_automation(sheet_url, worksheet_name=None, pool_size=1, use_http=False, refresh_hours=24):
     """Main function to run the corrected automation"""
-    automation = GoogleSheetsRationCardAutomation()
+    automation = GoogleSheetsRationCardAutomation(pool_size=pool_size, use_http=use_http,
+                                                  refresh_hours=refresh_hours)
     return automation.run_automation(sheet_url, worksheet_name)
 
 if __name__ == "__main__":
     # Run with your sheet details
     sheet_url = "16l3w3hcGAVq2MoB_bP1hvfDHKYxaV1N1SnS6K4ywx0M"
     worksheet_name = "Ration Card"
-    run_sheets_automation(sheet_url, worksheet_name)
\ No newline at end of file
+    pool_size = 1  # browsers searching in parallel
+    use_http = False  # plain HTTP postbacks, Chrome only as a fallback
+    refresh_hours = 24  # re-check unresolved cards after this many hours (0 = every run)
+    run_sheets_automation(sheet_url, worksheet_name, pool_size, use_http, refresh_hours)
\ No newline at end of file
@@ -0,0 +1,168 @@
+import re
+import time
+import logging
+
+import requests
+from lxml import html
+
+from portal_scraper import RajasthanFoodPortalScraper, read_result_tables
+
+logger = logging.getLogger(__name__)
+
+PORTAL_URL = "https://food.rajasthan.gov.in/Form_Status.aspx"
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9,hi;q=0.8',
+}
+ALERT_PATTERN = re.compile(r"alert\(\s*['\"](.+?)['\"]\s*\)")
+# Server answers that mean the cached __VIEWSTATE/__EVENTVALIDATION was rejected
+STALE_STATE_MARKERS = ('Invalid postback', 'Validation of viewstate MAC failed', 'The state information is invalid')
+
+
+class PortalFormError(Exception):
+    """Form_Status.aspx did not look like the expected WebForms page"""
+
+
+class RajasthanFoodPortalHttpScraper:
+    """Form_Status.aspx lookups over plain HTTP postbacks
+
+    Same interface as RajasthanFoodPortalScraper. One GET fetches the
+    hidden WebForms fields, one POST submits the ration card number. The
+    form state from each response is reused for the next lookup, and a
+    fresh GET happens only when the server rejects it. When fallback is
+    on, a lookup that fails over HTTP is retried in Chrome.
+    """
+
+    def __init__(self, headless=True, fallback=True, timeout=30):
+        self.portal_url = PORTAL_URL
+        self.headless = headless
+        self.fallback = fallback
+        self.timeout = timeout
+        self.session = None
+        self.form_state = None
+        self.browser = None
+        self.stats = {'http': 0, 'state_refresh': 0, 'fallback': 0}
+
+    def start_driver(self):
+        """Open the HTTP session (Chrome is only started if a fallback is needed)"""
+        self.session = requests.Session()
+        self.session.headers.update(REQUEST_HEADERS)
+        logger.info("HTTP session started")
+
+    def _read_form(self, page):
+        """Hidden fields plus the names of the ration card textbox and search button"""
+        fields = {}
+        for hidden in page.xpath("//form//input[@type='hidden'][@name]"):
+            fields[hidden.get('name')] = hidden.get('value', '')
+        if '__VIEWSTATE' not in fields:
+            raise PortalFormError("__VIEWSTATE not found on the form page")
+
+        textboxes = page.xpath("//input[@type='text'][contains(@id, 'txt') or contains(@name, 'txt')]") \
+            or page.xpath("//input[@type='text']")
+        buttons = page.xpath("//input[@type='submit'][contains(@value, 'Search') or contains(@id, 'btn')]") \
+            or page.xpath("//input[@type='submit']")
+        if not textboxes or not buttons:
+            raise PortalFormError("Ration card textbox or search button not found")
+
+        return {
+            'fields': fields,
+            'textbox': textboxes[0].get('name'),
+            'button': (buttons[0].get('name'), buttons[0].get('value', '')),
+        }
+
+    def refresh_form_state(self):
+        """GET the form page and cache its WebForms state"""
+        response = self.session.get(self.portal_url, timeout=self.timeout)
+        response.raise_for_status()
+        self.form_state = self._read_form(html.fromstring(response.content))
+        self.stats['state_refresh'] += 1
+        return self.form_state
+
+    def _post_search(self, ration_card_number):
+        state = self.form_state or self.refresh_form_state()
+        data = dict(state['fields'])
+        data['__EVENTTARGET'] = ''
+        data['__EVENTARGUMENT'] = ''
+        data[state['textbox']] = ration_card_number
+        button_name, button_value = state['button']
+        if button_name:
+            data[button_name] = button_value
+        return self.session.post(self.portal_url, data=data, timeout=self.timeout,
+                                 headers={'Referer': self.portal_url, 'Origin': 'https://food.rajasthan.gov.in'})
+
+    def _is_stale(self, response):
+        return response.status_code >= 500 or any(marker in response.text for marker in STALE_STATE_MARKERS)
+
+    def search_ration_card(self, ration_card_number):
+        """Search for ration card details"""
+        if self.session is None:
+            self.start_driver()
+        try:
+            logger.info(f"Searching for ration card: {ration_card_number} (HTTP)")
+            response = self._post_search(ration_card_number)
+            if self._is_stale(response):
+                logger.info("Cached form state rejected, fetching a fresh one")
+                self.refresh_form_state()
+                response = self._post_search(ration_card_number)
+            response.raise_for_status()
+
+            page = html.fromstring(response.content)
+            # The result page is the same form, so its state serves the next lookup
+            try:
+                self.form_state = self._read_form(page)
+            except PortalFormError:
+                self.form_state = None
+
+            self.stats['http'] += 1
+            return self.extract_results(page, response.text, ration_card_number)
+
+        except Exception as e:
+            self.form_state = None
+            logger.error(f"HTTP search failed: {str(e)}")
+            if not self.fallback:
+                return {"error": f"Search failed: {str(e)}"}
+            return self._browser_search(ration_card_number)
+
+    def _browser_search(self, ration_card_number):
+        """Chrome fallback, started on first use"""
+        self.stats['fallback'] += 1
+        if self.browser is None:
+            self.browser = RajasthanFoodPortalScraper(headless=self.headless)
+            self.browser.start_driver()
+        return self.browser.search_ration_card(ration_card_number)
+
+    def extract_results(self, page, page_html, ration_card_number):
+        """Build the same result dict as the Chrome scraper from the response HTML"""
+        alert = ALERT_PATTERN.search(page_html)
+        if alert and "Please Enter" in alert.group(1):
+            return {"error": f"Form validation failed: {alert.group(1)}"}
+
+        data = {
+            "ration_card_number": ration_card_number,
+            "search_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "status": "searched"
+        }
+
+        main_data_found = read_result_tables(page, data)
+
+        if not (main_data_found or any('प्राधिकृत' in str(value) for value in data.values())):
+            page_text = data.get('full_page_text', '').lower()
+            if any(phrase in page_text for phrase in ['no record', 'not found', 'no data']):
+                data["error"] = "No records found for this ration card number"
+            elif len(page_text) < 200:
+                data["error"] = "Minimal response from portal - possible error"
+
+        return data
+
+    def close(self):
+        """Close the HTTP session and any fallback browser"""
+        if self.session:
+            self.session.close()
+            self.session = None
+        if self.browser:
+            self.browser.close()
+            self.browser = None
+        logger.info(f"HTTP scraper closed ({self.stats['http']} HTTP lookups, "
+                    f"{self.stats['state_refresh']} form refreshes, {self.stats['fallback']} Chrome fallbacks)")
@@ -1,20 +1,142 @@
+import copy
 import time
 import json
-from selenium import webdriver
+import os
+import sys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, UnexpectedAlertPresentException
+from selenium.common.exceptions import (TimeoutException, NoSuchElementException, NoAlertPresentException,
+                                        UnexpectedAlertPresentException)
+from lxml import etree, html as lxml_html
 import logging
 
+# Shared Chrome setup lives in the repository-level common package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import driver_factory
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Elements that visible_text() puts on their own lines, and cells it separates with a space
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li',
+    'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tbody', 'tfoot', 'thead', 'tr', 'ul',
+}
+CELL_TAGS = {'td', 'th'}
+
+# Upper bounds for the condition waits that replaced the fixed sleeps
+FORM_TIMEOUT = 15
+RESULT_TIMEOUT = 20
+
+# Errors that are the portal's own answer; searching again returns the same thing
+PORTAL_ANSWER_ERRORS = ("No records found", "Form validation failed", "Alert during extraction")
+
+
+def is_transient_error(error):
+    """Search errors worth another attempt: timeouts, page and driver failures, empty answers"""
+    return bool(error) and not error.startswith(PORTAL_ANSWER_ERRORS)
+
+
+def cell_text(cell):
+    """Whitespace-normalised text of a td/th"""
+    return ' '.join(cell.text_content().split())
+
+
+def table_text(table):
+    """Rows on separate lines, cells separated by spaces - like Selenium's table.text"""
+    lines = []
+    for row in table.xpath(".//tr"):
+        line = ' '.join(text for text in (cell_text(cell) for cell in row.xpath("./th|./td")) if text)
+        if line:
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def table_records(table):
+    """Header -> value dicts for the data rows of one table
+    
+    The first row with <th> cells (or the first row, if there are none) is the
+    header. Rows with a different cell count (titles, colspans) are skipped.
+    """
+    rows = table.xpath("./tr|./thead/tr|./tbody/tr")
+    if not rows:
+        return []
+    header_index = next((i for i, row in enumerate(rows) if row.xpath("./th")), 0)
+    headers = [cell_text(cell) for cell in rows[header_index].xpath("./th|./td")]
+    records = []
+    for row in rows[header_index + 1:]:
+        values = [cell_text(cell) for cell in row.xpath("./th|./td")]
+        if len(values) == len(headers) and any(values):
+            records.append(dict(zip(headers, values)))
+    return records
+
+
+def visible_text(page):
+    """Non-empty lines of the <body> text, without script/style contents
+    
+    Like Selenium's body.text: block elements and table rows start new lines,
+    table cells are separated by a space.
+    """
+    bodies = page.xpath("//body")
+    root = copy.deepcopy(bodies[0] if bodies else page)
+    etree.strip_elements(root, 'script', 'style', with_tail=False)
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue  # comments and processing instructions
+        if element.tag in BLOCK_TAGS:
+            element.text = '\n' + (element.text or '')
+            element.tail = '\n' + (element.tail or '')
+        elif element.tag in CELL_TAGS:
+            element.tail = ' ' + (element.tail or '')
+    lines = (' '.join(line.split()) for line in root.text_content().splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def read_result_tables(page, data):
+    """Add table_N_content, records and full_page_text for a parsed result page to data
+    
+    Returns True when one of the tables looks like the ration card result.
+    """
+    ration_card_number = data.get("ration_card_number", "")
+    records = []
+    for i, table in enumerate(page.xpath("//table")):
+        content = table_text(table)
+        if content:
+            data[f"table_{i}_content"] = content
+            logger.debug(f"Table {i} content: {content[:100]}...")
+        records.extend(table_records(table))
+    data["records"] = records
+    
+    # Try to find the main data table with ration card information
+    main_data_found = False
+    for key, content in list(data.items()):
+        if key.startswith('table_') and content:
+            # Look for ration card data patterns
+            if ('प्राधिकृत अधिकारी' in content or 'Officer' in content) and ration_card_number in content:
+                main_data_found = True
+            # Also check for pattern with form numbers and token numbers
+            elif any(len(word) >= 8 and word.isdigit() for word in content.split()):
+                main_data_found = True
+            if main_data_found:
+                data['main_table'] = content
+                logger.info(f"Found main data in {key}")
+                break
+    
+    # Get full page text as backup
+    body_text = visible_text(page)
+    if body_text:
+        data["full_page_text"] = body_text
+    
+    return main_data_found
+
+
 class RajasthanFoodPortalScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, block_resources=True, driver_pool=None):
         """Initialize the scraper with Chrome WebDriver"""
         self.chrome_options = Options()
         if headless:
@@ -29,13 +151,22 @@ class RajasthanFoodPortalScraper:
         
         self.driver = None
         self.portal_url = "https://food.rajasthan.gov.in/Form_Status.aspx"
+        self.block_resources = block_resources
+        self.page_metrics = driver_factory.PageLoadMetrics()
+        # Optional common.driver_pool.DriverPool shared with other scrapers
+        self.driver_pool = driver_pool
+    
+    def launch_driver(self):
+        """Start a configured Chrome WebDriver"""
+        driver = driver_factory.create_driver(self.chrome_options, block_resources=self.block_resources)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.implicitly_wait(10)
+        return driver
     
     def start_driver(self):
-        """Start the Chrome WebDriver"""
+        """Start the Chrome WebDriver (or take a pre-launched one from the pool)"""
         try:
-            self.driver = webdriver.Chrome(options=self.chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.implicitly_wait(10)
+            self.driver = self.driver_pool.acquire() if self.driver_pool else self.launch_driver()
             logger.info("WebDriver started successfully")
         except Exception as e:
             logger.error(f"Failed to start WebDriver: {str(e)}")
@@ -52,14 +183,40 @@ class RajasthanFoodPortalScraper:
         except:
             return None
     
+    def _wait_for_form(self):
+        """Wait until the ration card textbox is on the page"""
+        try:
+            WebDriverWait(self.driver, FORM_TIMEOUT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text']")))
+        except TimeoutException:
+            logger.warning("Form did not appear in time")
+    
+    def _wait_for_postback(self, submit_button):
+        """Wait until the submitted form has been replaced by the answer page, or an alert is up"""
+        def answered(driver):
+            try:
+                driver.switch_to.alert
+                return True
+            except NoAlertPresentException:
+                pass
+            return (EC.staleness_of(submit_button)(driver) and
+                    driver.execute_script("return document.readyState") != "loading")
+        
+        try:
+            WebDriverWait(self.driver, RESULT_TIMEOUT, poll_frequency=0.25).until(answered)
+        except TimeoutException:
+            logger.warning("No answer to the search within the timeout, reading the page as it is")
+    
     def search_ration_card(self, ration_card_number):
         """Search for ration card details"""
         try:
             logger.info(f"Searching for ration card: {ration_card_number}")
+            if self.driver is None:
+                self.start_driver()
             
             # Navigate to the portal
             self.driver.get(self.portal_url)
-            time.sleep(3)
+            self._wait_for_form()
             
             # Handle any initial alerts
             self.handle_alert()
@@ -91,14 +248,10 @@ class RajasthanFoodPortalScraper:
             # Clear and enter ration card number
             try:
                 input_element.clear()
-                time.sleep(0.5)
                 input_element.click()
-                time.sleep(0.5)
                 input_element.send_keys(Keys.CONTROL + "a")
                 input_element.send_keys(Keys.DELETE)
-                time.sleep(0.5)
                 input_element.send_keys(ration_card_number)
-                time.sleep(1)
                 
                 entered_value = input_element.get_attribute('value')
                 logger.info(f"Entered value: '{entered_value}'")
@@ -107,7 +260,6 @@ class RajasthanFoodPortalScraper:
                     self.driver.execute_script(f"arguments[0].value = '{ration_card_number}';", input_element)
                     self.driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }));", input_element)
                     self.driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }));", input_element)
-                    time.sleep(1)
                 
             except Exception as e:
                 logger.error(f"Error entering ration card number: {str(e)}")
@@ -141,7 +293,6 @@ class RajasthanFoodPortalScraper:
             # Click submit
             try:
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", submit_button)
-                time.sleep(1)
                 submit_button.click()
                 logger.info("Clicked submit button")
             except Exception as e:
@@ -151,8 +302,8 @@ class RajasthanFoodPortalScraper:
                 except:
                     return {"error": f"Failed to click submit button: {str(e)}"}
             
-            # Wait for results
-            time.sleep(4)
+            # Wait for the postback to replace the form (or for a validation alert)
+            self._wait_for_postback(submit_button)
             
             # Handle any alerts
             alert_text = self.handle_alert()
@@ -160,17 +311,25 @@ class RajasthanFoodPortalScraper:
                 return {"error": f"Form validation failed: {alert_text}"}
             
             # Extract results
-            return self.extract_results(ration_card_number)
+            result = self.extract_results(ration_card_number)
+            self.page_metrics.record(self.driver)
+            self._check_driver()
+            return result
                 
         except Exception as e:
             logger.error(f"Error during search: {str(e)}")
+            self._check_driver()
             return {"error": f"Search failed: {str(e)}"}
     
+    def _check_driver(self):
+        """With a pool: swap a dead, worn-out or oversized session before the next search"""
+        if self.driver_pool and self.driver is not None and not self.driver_pool.note_use(self.driver):
+            self.driver_pool.retire(self.driver)
+            self.driver = None
+    
     def extract_results(self, ration_card_number):
         """Extract ration card details with improved parsing"""
         try:
-            time.sleep(2)
-            
             # Handle any alerts during extraction
             alert_text = self.handle_alert()
             if alert_text:
@@ -183,41 +342,9 @@ class RajasthanFoodPortalScraper:
                 "status": "searched"
             }
             
-            # Extract all tables
-            tables = self.driver.find_elements(By.TAG_NAME, "table")
-            if tables:
-                logger.info(f"Found {len(tables)} tables on results page")
-                for i, table in enumerate(tables):
-                    table_text = table.text.strip()
-                    if table_text:
-                        data[f"table_{i}_content"] = table_text
-                        logger.info(f"Table {i} content: {table_text[:100]}...")
-            
-            # Try to find the main data table with ration card information
-            main_data_found = False
-            for key, content in data.items():
-                if key.startswith('table_') and content:
-                    # Look for ration card data patterns
-                    if ('प्राधिकृत अधिकारी' in content or 'Officer' in content) and ration_card_number in content:
-                        main_data_found = True
-                        data['main_table'] = content
-                        logger.info(f"Found main data in {key}")
-                        break
-                    # Also check for pattern with form numbers and token numbers
-                    elif any(len(word) >= 8 and word.isdigit() for word in content.split()):
-                        main_data_found = True
-                        data['main_table'] = content
-                        logger.info(f"Found numeric data in {key}")
-                        break
-            
-            # Get full page text as backup
-            try:
-                body = self.driver.find_element(By.TAG_NAME, "body")
-                body_text = body.text.strip()
-                if body_text:
-                    data["full_page_text"] = body_text
-            except:
-                pass
+            # One page_source round trip instead of a WebDriver call per table
+            page = lxml_html.fromstring(self.driver.page_source)
+            main_data_found = read_result_tables(page, data)
             
             # Check if we have meaningful results
             if main_data_found or any('प्राधिकृत' in str(value) for value in data.values()):
@@ -243,5 +370,10 @@ class RajasthanFoodPortalScraper:
     def close(self):
         """Close the WebDriver"""
         if self.driver:
-            self.driver.quit()
-            logger.info("WebDriver closed")
\ No newline at end of file
+            if self.driver_pool:
+                self.driver_pool.release(self.driver)
+            else:
+                driver_factory.quit_driver(self.driver)
+            self.driver = None
+            logger.info("WebDriver closed")
+            logger.info(self.page_metrics.summary())
\ No newline at end of file
@@ -0,0 +1,121 @@
+import copy
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+# Requests Chrome never needs to make for a lookup: images, fonts, media and
+# analytics/ads/font hosts. Stylesheets stay - visibility checks depend on them.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.wav", "*.ogg",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*clarity.ms*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*youtube.com*", "*twitter.com*",
+]
+
+# tmpfs keeps per-driver profile writes off the disk
+PROFILE_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# One call per lookup: navigation timing (only when a new document was loaded
+# since the last call) plus every resource fetched since then
+PAGE_METRICS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const isNewPage = window.__lastMeasuredOrigin !== performance.timeOrigin;
+window.__lastMeasuredOrigin = performance.timeOrigin;
+let bytes = 0, count = 0;
+for (const entry of performance.getEntriesByType('resource')) {
+    bytes += entry.transferSize || 0;
+    count += 1;
+}
+performance.clearResourceTimings();
+return {
+    newPage: isNewPage,
+    loadMs: isNewPage && nav ? Math.round(nav.domContentLoadedEventEnd || nav.duration) : null,
+    documentBytes: isNewPage && nav ? (nav.transferSize || 0) : 0,
+    resourceBytes: bytes,
+    resources: count
+};
+"""
+
+
+def create_driver(base_options, block_resources=True, blocked_patterns=None, page_load_strategy="eager",
+                  profile_root=PROFILE_ROOT):
+    """Start Chrome from a copy of base_options with a private profile dir and resource blocking
+
+    The profile directory is removed again by quit_driver().
+    """
+    options = copy.deepcopy(base_options)
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+    profile_dir = tempfile.mkdtemp(prefix="chrome-profile-", dir=profile_root)
+    options.add_argument(f"--user-data-dir={profile_dir}")
+
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        raise
+    driver.profile_dir = profile_dir
+
+    if block_resources:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_patterns or BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            logger.warning(f"Resource blocking unavailable: {str(e)}")
+    return driver
+
+
+def quit_driver(driver):
+    """Quit a driver from create_driver() and delete its profile dir"""
+    try:
+        driver.quit()
+    finally:
+        profile_dir = getattr(driver, "profile_dir", None)
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+class PageLoadMetrics:
+    """Page-load time and bytes transferred per lookup, across all drivers of a run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.page_loads = 0
+        self.load_ms = 0
+        self.bytes = 0
+        self.resources = 0
+
+    def record(self, driver):
+        """Read the browser's timing buffers after a lookup; returns the sample or None"""
+        try:
+            sample = driver.execute_script(PAGE_METRICS_JS)
+        except Exception as e:
+            logger.debug(f"Page metrics unavailable: {str(e)}")
+            return None
+        with self._lock:
+            self.lookups += 1
+            if sample.get("loadMs") is not None:
+                self.page_loads += 1
+                self.load_ms += sample["loadMs"]
+            self.bytes += sample.get("documentBytes", 0) + sample.get("resourceBytes", 0)
+            self.resources += sample.get("resources", 0)
+        return sample
+
+    def summary(self):
+        with self._lock:
+            if not self.lookups:
+                return "Page metrics: no lookups measured"
+            avg_load = self.load_ms / self.page_loads if self.page_loads else 0
+            return (f"Page metrics: {self.lookups} lookups, {self.page_loads} page loads "
+                    f"(avg {avg_load:.0f} ms to DOMContentLoaded), "
+                    f"{self.bytes / self.lookups / 1024:.1f} KB and {self.resources / self.lookups:.1f} requests per lookup, "
+                    f"{self.bytes / 1024 / 1024:.2f} MB total")
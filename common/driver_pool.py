@@ -0,0 +1,199 @@
+import logging
+import queue
+import threading
+import time
+
+from common import driver_factory
+
+try:
+    import psutil
+except ImportError:  # RSS-based recycling is skipped without psutil
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_USES = 200
+DEFAULT_MAX_RSS_MB = 1500
+
+_psutil_warned = False
+
+
+def driver_rss_mb(driver):
+    """Resident memory of chromedriver plus every Chrome process under it, or None if unknown"""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _warn_no_psutil():
+    global _psutil_warned
+    if not _psutil_warned:
+        _psutil_warned = True
+        logger.warning("psutil is not installed - drivers will not be recycled by memory use (pip install psutil)")
+
+
+def is_alive(driver):
+    """Cheap round trip through the session"""
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+class DriverPool:
+    """Keeps `size` Chrome sessions launched ahead of time
+
+    Drivers are started in background threads, health-checked before they are
+    handed out, and replaced in the background when they die, have served
+    max_uses lookups, or grow past max_rss_mb (needs psutil).
+
+    A caller borrows a driver with acquire() and calls note_use() after each
+    lookup on it; when that returns False the driver must be handed back with
+    retire(), otherwise with release() once the caller is done.
+    """
+
+    def __init__(self, launch, size=1, max_uses=DEFAULT_MAX_USES, max_rss_mb=DEFAULT_MAX_RSS_MB, quit=None):
+        self.launch = launch
+        self.quit = quit or driver_factory.quit_driver
+        self.size = max(1, int(size))
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self._idle = queue.Queue()
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._alive = 0      # launched or launching, idle or in use
+        self._closed = False
+        self.stats = {'launched': 0, 'launch_failures': 0, 'recycled': 0, 'dead': 0}
+        if max_rss_mb and psutil is None:
+            _warn_no_psutil()
+
+    def start(self):
+        """Launch drivers in the background until the pool is full"""
+        if self._closed:
+            return
+        with self._lock:
+            missing = self.size - self._alive
+            self._alive += max(0, missing)
+        for _ in range(missing):
+            threading.Thread(target=self._launch_one, name="driver-launcher", daemon=True).start()
+
+    def _launch_one(self):
+        started = time.time()
+        try:
+            driver = self.launch()
+        except Exception as e:
+            with self._lock:
+                self._alive -= 1
+                self.stats['launch_failures'] += 1
+            logger.error(f"Driver launch failed: {str(e)}")
+            # Wake a waiting acquire() so it can retry or give up
+            self._idle.put(None)
+            return
+        with self._lock:
+            self._uses[driver] = 0
+            self.stats['launched'] += 1
+            closed = self._closed
+        if closed:
+            self._quit(driver)
+            return
+        logger.info(f"Driver ready in {time.time() - started:.1f}s")
+        self._idle.put(driver)
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(driver, None)
+            self._alive -= 1
+        try:
+            self.quit(driver)
+        except Exception as e:
+            logger.warning(f"Error quitting driver: {str(e)}")
+
+    def acquire(self, timeout=120):
+        """A live driver; waits for a background launch when none is idle"""
+        deadline = time.time() + timeout
+        while True:
+            self.start()
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError("No healthy driver became available")
+            try:
+                driver = self._idle.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError("No healthy driver became available")
+            if driver is None:
+                # A launch failed - back off a little before starting another
+                time.sleep(min(2.0, max(0.0, deadline - time.time())))
+                continue
+            if is_alive(driver):
+                return driver
+            logger.warning("Dropping dead driver session")
+            with self._lock:
+                self.stats['dead'] += 1
+            self._quit(driver)
+
+    def release(self, driver):
+        """Give a driver back for reuse; uses were already counted by note_use()"""
+        if not self._closed:
+            self._idle.put(driver)
+        else:
+            self.retire(driver)
+
+    def note_use(self, driver):
+        """Count one lookup; False when the driver is dead, worn out or too large"""
+        with self._lock:
+            uses = self._uses.get(driver, 0) + 1
+            self._uses[driver] = uses
+        if not is_alive(driver):
+            logger.warning("Driver session died")
+            with self._lock:
+                self.stats['dead'] += 1
+            return False
+        if self.max_uses and uses >= self.max_uses:
+            logger.info(f"Recycling driver after {uses} lookups")
+            return False
+        if self.max_rss_mb:
+            rss = driver_rss_mb(driver)
+            if rss is not None and rss > self.max_rss_mb:
+                logger.info(f"Recycling driver at {rss:.0f} MB RSS")
+                return False
+        return True
+
+    def retire(self, driver):
+        """Quit a driver and launch its replacement in the background (after close(): just quit it)"""
+        with self._lock:
+            replace = not self._closed
+            if replace:
+                self.stats['recycled'] += 1
+                self._alive += 1
+        if not replace:
+            self._quit(driver)
+            return
+        threading.Thread(target=self._quit, args=(driver,), name="driver-reaper", daemon=True).start()
+        threading.Thread(target=self._launch_one, name="driver-launcher", daemon=True).start()
+
+    def close(self):
+        """Quit idle drivers; drivers still launching quit themselves when they finish,
+        drivers still held are quit by their retire()"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                self._quit(driver)
+
+    def summary(self):
+        return (f"Driver pool: {self.stats['launched']} launched, {self.stats['recycled']} recycled, "
+                f"{self.stats['dead']} dead sessions replaced, {self.stats['launch_failures']} launch failures")
@@ -0,0 +1,632 @@
+"""Run the e-Mitra, Jan Soochna (LDMS) and ration card workloads side by side
+
+Each tool is wrapped in a PortalClient adapter. Every portal gets its own
+worker threads (its concurrency limit), all results go through one Sheets
+write pipeline, and one RunMetrics object reports on the whole run. Total
+wall time is that of the slowest portal instead of the sum of all three.
+
+    python job_runner.py --portals emitra ldms ration --ration-workers 2
+"""
+import argparse
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+EMITRA_DIR = os.path.join(ROOT, "Emitra_Portal")
+LDMS_DIR = os.path.join(ROOT, "LDMS")
+RATION_DIR = os.path.join(ROOT, "Ration_Card")
+for tool_dir in (ROOT, EMITRA_DIR, LDMS_DIR, RATION_DIR):
+    if tool_dir not in sys.path:
+        sys.path.insert(0, tool_dir)
+
+# Configured before the tool modules are imported, so their own basicConfig calls are no-ops
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(ROOT, 'job_runner.log'), encoding='utf-8'),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("job_runner")
+
+DEFAULT_FLUSH_ROWS = 25
+DEFAULT_FLUSH_SECONDS = 30
+DEFAULT_MAX_RETRIES = 2
+PROGRESS_INTERVAL = 30
+
+
+@dataclass
+class Job:
+    key: str                    # receipt / Aadhaar / ration card number
+    row: Optional[int] = None   # input sheet row, when the result is written back next to it
+    attempts: int = 0
+
+
+@dataclass
+class JobResult:
+    job: Job
+    ok: bool
+    value: Any = None
+    error: str = ""
+    latency: float = 0.0
+
+
+class PortalClient(ABC):
+    """One portal workload: where jobs come from, how one is fetched, how results are written
+
+    fetch() and pace() are called from `concurrency` worker threads at once and
+    must be thread safe. write_batch() and written() are only called from the
+    write pipeline thread.
+    """
+
+    name = "portal"
+
+    def __init__(self, concurrency: int = 1):
+        self.concurrency = max(1, int(concurrency))
+
+    def open(self):
+        """Connect to the sheet, start sessions/drivers"""
+
+    @abstractmethod
+    def load_jobs(self) -> List[Job]:
+        """Everything that still needs a lookup"""
+
+    @abstractmethod
+    def fetch(self, job: Job) -> JobResult:
+        """One blocking lookup"""
+
+    def pace(self):
+        """Wait until the calling worker may start its next lookup; not part of the lookup's latency"""
+
+    def should_retry(self, result: JobResult) -> bool:
+        """Failures worth another attempt later in the run"""
+        return False
+
+    @abstractmethod
+    def write_batch(self, results: List[JobResult]) -> bool:
+        """Write a batch to the sheet; False keeps it for the next flush"""
+
+    def written(self, results: List[JobResult]):
+        """Called once a batch is in the sheet"""
+
+    def worker_done(self):
+        """Called by each worker thread before it exits"""
+
+    def close(self):
+        """Release sessions, drivers and local stores"""
+
+
+class RunMetrics:
+    """Per-portal counters and latencies for the whole run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.portals: Dict[str, dict] = {}
+        self.started = time.time()
+
+    def _portal(self, name):
+        return self.portals.setdefault(name, {
+            'jobs': 0, 'ok': 0, 'failed': 0, 'retries': 0, 'written': 0, 'write_failures': 0,
+            'latencies': [], 'started': time.time(), 'finished': None,
+        })
+
+    def add_jobs(self, name, count):
+        with self._lock:
+            self._portal(name)['jobs'] += count
+
+    def record(self, name, result: JobResult, retried=False):
+        with self._lock:
+            portal = self._portal(name)
+            portal['latencies'].append(result.latency)
+            if retried:
+                portal['retries'] += 1
+            elif result.ok:
+                portal['ok'] += 1
+            else:
+                portal['failed'] += 1
+
+    def record_write(self, name, rows, ok):
+        with self._lock:
+            self._portal(name)['written' if ok else 'write_failures'] += rows
+
+    def finish(self, name):
+        with self._lock:
+            self._portal(name)['finished'] = time.time()
+
+    def summary(self) -> str:
+        with self._lock:
+            lines = [f"Run time: {(time.time() - self.started) / 60:.1f} min"]
+            for name, portal in self.portals.items():
+                latencies = sorted(portal['latencies'])
+                p50 = latencies[len(latencies) // 2] if latencies else 0
+                p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+                elapsed = (portal['finished'] or time.time()) - portal['started']
+                done = portal['ok'] + portal['failed']
+                lines.append(
+                    f"{name}: {done}/{portal['jobs']} done ({portal['ok']} ok, {portal['failed']} failed, "
+                    f"{portal['retries']} retries), {portal['written']} rows written, "
+                    f"{portal['write_failures']} unwritten, latency p50 {p50:.1f}s p95 {p95:.1f}s, "
+                    f"{done / elapsed * 60 if elapsed else 0:.1f}/min"
+                )
+            return "\n".join(lines)
+
+
+class SheetWritePipeline:
+    """Single writer thread shared by every portal
+
+    Results are batched per portal and handed to the portal's write_batch()
+    every flush_rows results or flush_seconds, so Sheets calls stay serialised
+    and under quota no matter how many lookups run in parallel.
+    """
+
+    def __init__(self, metrics: RunMetrics, flush_rows=DEFAULT_FLUSH_ROWS, flush_seconds=DEFAULT_FLUSH_SECONDS):
+        self.metrics = metrics
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue()
+        self._pending: Dict[str, list] = {}
+        self._clients: Dict[str, PortalClient] = {}
+        self._oldest: Dict[str, float] = {}
+        self._thread = threading.Thread(target=self._loop, name="sheet-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, client: PortalClient, result: JobResult):
+        self._queue.put((client, result))
+
+    def stop(self):
+        """Flush everything still buffered and end the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _flush(self, name):
+        results = self._pending.get(name)
+        if not results:
+            return
+        client = self._clients[name]
+        try:
+            ok = client.write_batch(results)
+        except Exception as e:
+            logger.error(f"{name}: sheet write failed: {str(e)}")
+            ok = False
+        if not ok:
+            # Keep the batch; the next flush tries again
+            self._oldest[name] = time.time()
+            return
+        self._pending[name] = []
+        self._oldest.pop(name, None)
+        self.metrics.record_write(name, len(results), True)
+        try:
+            client.written(results)
+        except Exception as e:
+            logger.error(f"{name}: post-write hook failed: {str(e)}")
+
+    def _flush_due(self):
+        now = time.time()
+        for name, results in self._pending.items():
+            if results and (len(results) >= self.flush_rows or now - self._oldest[name] >= self.flush_seconds):
+                self._flush(name)
+
+    def _loop(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                self._flush_due()
+                continue
+            if item is None:
+                break
+            client, result = item
+            self._clients[client.name] = client
+            self._pending.setdefault(client.name, []).append(result)
+            self._oldest.setdefault(client.name, time.time())
+            self._flush_due()
+
+        for name in list(self._pending):
+            self._flush(name)
+            if self._pending[name]:
+                logger.error(f"{name}: {len(self._pending[name])} results could not be written")
+                self.metrics.record_write(name, len(self._pending[name]), False)
+
+
+class JobRunner:
+    """Runs every portal's jobs concurrently, each limited to its own worker count"""
+
+    def __init__(self, clients: List[PortalClient], max_retries=DEFAULT_MAX_RETRIES,
+                 flush_rows=DEFAULT_FLUSH_ROWS, flush_seconds=DEFAULT_FLUSH_SECONDS):
+        self.clients = clients
+        self.max_retries = max_retries
+        self.metrics = RunMetrics()
+        self.pipeline = SheetWritePipeline(self.metrics, flush_rows, flush_seconds)
+
+    def _worker(self, client: PortalClient, jobs: queue.Queue, state: dict):
+        try:
+            while True:
+                with state['lock']:
+                    if state['outstanding'] == 0:
+                        break
+                try:
+                    job = jobs.get(timeout=0.5)
+                except queue.Empty:
+                    continue  # a retry may still be put back by another worker
+
+                requeued = False
+                try:
+                    client.pace()
+                    started = time.time()
+                    try:
+                        result = client.fetch(job)
+                    except Exception as e:
+                        result = JobResult(job, False, error=f"Error: {str(e)}")
+                    result.latency = time.time() - started
+
+                    if not result.ok and job.attempts < self.max_retries and client.should_retry(result):
+                        job.attempts += 1
+                        self.metrics.record(client.name, result, retried=True)
+                        logger.info(f"{client.name}: retry {job.attempts}/{self.max_retries} queued for {job.key}")
+                        jobs.put(job)
+                        requeued = True
+                        continue
+
+                    self.metrics.record(client.name, result)
+                    self.pipeline.submit(client, result)
+                except Exception as e:
+                    # Pacing or result handling failed; count the job as failed rather than lose the worker
+                    logger.error(f"{client.name}: {job.key} failed outside the lookup: {str(e)}")
+                    self.metrics.record(client.name, JobResult(job, False, error=f"Error: {str(e)}"))
+                finally:
+                    # Every job taken off the queue is finished or back on it, or the other workers wait forever
+                    if not requeued:
+                        with state['lock']:
+                            state['outstanding'] -= 1
+        finally:
+            try:
+                client.worker_done()
+            except Exception as e:
+                logger.warning(f"{client.name}: worker cleanup failed: {str(e)}")
+
+    def _run_portal(self, client: PortalClient):
+        """Open, load and drain one portal; runs in its own thread"""
+        try:
+            client.open()
+            jobs_list = client.load_jobs()
+            self.metrics.add_jobs(client.name, len(jobs_list))
+            logger.info(f"{client.name}: {len(jobs_list)} jobs, {client.concurrency} workers")
+            if not jobs_list:
+                return
+
+            jobs = queue.Queue()
+            for job in jobs_list:
+                jobs.put(job)
+            state = {'lock': threading.Lock(), 'outstanding': len(jobs_list)}
+            workers = [
+                threading.Thread(target=self._worker, args=(client, jobs, state), name=f"{client.name}-{n + 1}")
+                for n in range(min(client.concurrency, len(jobs_list)))
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        except Exception as e:
+            logger.error(f"{client.name}: run failed: {str(e)}")
+        finally:
+            self.metrics.finish(client.name)
+
+    def run(self) -> RunMetrics:
+        self.pipeline.start()
+        portals = [threading.Thread(target=self._run_portal, args=(client,), name=client.name)
+                   for client in self.clients]
+        for portal in portals:
+            portal.start()
+
+        try:
+            while any(portal.is_alive() for portal in portals):
+                for portal in portals:
+                    portal.join(timeout=PROGRESS_INTERVAL / len(portals))
+                if any(portal.is_alive() for portal in portals):
+                    logger.info("Progress\n" + self.metrics.summary())
+        finally:
+            # Results of every portal are flushed before any client closes its sheet or store
+            self.pipeline.stop()
+            for client in self.clients:
+                try:
+                    client.close()
+                except Exception as e:
+                    logger.warning(f"{client.name}: close failed: {str(e)}")
+
+        logger.info("=" * 50)
+        logger.info("ALL PORTALS COMPLETE\n" + self.metrics.summary())
+        logger.info("=" * 50)
+        return self.metrics
+
+
+class EmitraPortal(PortalClient):
+    """Receipt lookups through EmitraCleanAutomation (Chrome pool or --http backend)"""
+
+    name = "emitra"
+
+    def __init__(self, concurrency=1, credentials_file=os.path.join(EMITRA_DIR, 'credentials.json'),
+                 http_endpoints=None, max_per_minute=None):
+        super().__init__(concurrency)
+        self.credentials_file = credentials_file
+        self.http_endpoints = http_endpoints
+        self.max_per_minute = max_per_minute
+        self.automation = None
+
+    def open(self):
+        from emitra_fetch import EmitraCleanAutomation, DEFAULT_MAX_RECEIPTS_PER_MINUTE
+        self.automation = EmitraCleanAutomation(
+            pool_size=self.concurrency,
+            max_receipts_per_minute=self.max_per_minute or DEFAULT_MAX_RECEIPTS_PER_MINUTE,
+            http_endpoints=self.http_endpoints,
+            store_file=os.path.join(EMITRA_DIR, 'emitra_results.db'),
+            selector_stats_file=os.path.join(EMITRA_DIR, 'selector_stats.json'),
+            credentials_file=self.credentials_file,
+        )
+
+    def load_jobs(self):
+        receipts = self.automation.sheet.col_values(1)[1:]  # Skip header
+        fresh = self.automation.store.fresh_final_receipts(self.automation.fresh_hours)
+        jobs = [Job(r.strip(), idx + 2) for idx, r in enumerate(receipts) if r.strip() and r.strip() not in fresh]
+        if jobs and not self.automation.http_backend:
+            self.automation.driver_pool.start()
+        return jobs
+
+    def pace(self):
+        self.automation.rate_limiter.acquire()
+
+    def fetch(self, job):
+        service_name, lifecycle_data = self.automation.process_single_receipt(job.key, job.row)
+        ok = self.automation.is_successful(service_name, lifecycle_data)
+        return JobResult(job, ok, (service_name, lifecycle_data), "" if ok else service_name)
+
+    def write_batch(self, results):
+        for r in results:
+            if r.value is None:
+                r.value = ("PROCESSING ERROR", ["PROCESSING ERROR"] * 6)
+        # Service name goes to column B, lifecycle data to columns C-H
+        try:
+            self.automation.sheet.batch_update([
+                {'range': f'B{r.job.row}:H{r.job.row}', 'values': [[r.value[0]] + r.value[1]]}
+                for r in results
+            ])
+        except Exception as e:
+            logger.error(f"{self.name}: batch update of {len(results)} rows failed: {str(e)}")
+            return False
+        return True
+
+    def written(self, results):
+        self.automation.store.record_many([
+            (r.job.key, r.value[0], r.value[1], 'final' if r.ok else 'partial') for r in results
+        ])
+
+    def worker_done(self):
+        self.automation.quit_driver()
+
+    def close(self):
+        if self.automation:
+            logger.info(self.automation.page_metrics.summary())
+            self.automation.close()
+            self.automation.store.close()
+            self.automation.selectors.save()
+
+
+class LdmsPortal(PortalClient):
+    """Jan Soochna Labour lookups; each worker has its own portal session"""
+
+    name = "ldms"
+
+    def __init__(self, concurrency=1, credentials_file=os.path.join(LDMS_DIR, 'google_sheets_credentials.json'),
+                 spreadsheet_id=None, input_sheet="Sheet1", input_column="A", output_sheet="Results",
+                 benefits_sheet="Benefits", delay_seconds=6):
+        super().__init__(concurrency)
+        self.credentials_file = credentials_file
+        self.spreadsheet_id = spreadsheet_id
+        self.input_sheet = input_sheet
+        self.input_column = input_column
+        self.output_sheet = output_sheet
+        self.benefits_sheet = benefits_sheet
+        self.delay_seconds = delay_seconds
+        self.automation = None
+        self._local = threading.local()
+
+    def open(self):
+        import jan_soochna_automation as ldms
+        self.ldms = ldms
+        self.automation = ldms.JanSoochnaAutomation(
+            self.credentials_file, self.spreadsheet_id or ldms.SPREADSHEET_ID,
+            delay_seconds=self.delay_seconds, index_file=os.path.join(LDMS_DIR, ldms.DEFAULT_INDEX_FILE),
+        )
+        self.automation._output_sheet = self.output_sheet
+        self.automation.sheets_manager.prepare_sheet(self.output_sheet)
+
+    def load_jobs(self):
+        numbers = self.automation.sheets_manager.read_aadhaar_numbers(self.input_sheet, self.input_column)
+        existing = self.automation.existing_results(self.output_sheet)
+        return [Job(aadhaar) for aadhaar in numbers if aadhaar not in existing]
+
+    def pace(self):
+        # Each worker keeps the adaptive gap between its own requests
+        if getattr(self._local, 'client', None) is not None:
+            time.sleep(self.automation.pacer.next_delay())
+
+    def fetch(self, job):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.ldms.JanSoochnaPortalClient()
+        started = time.monotonic()
+        beneficiary = client.fetch_beneficiary_data(job.key)
+        self.automation.pacer.observe(time.monotonic() - started, self.ldms.is_transient_failure(beneficiary))
+        ok = beneficiary.fetch_status == "Success"
+        return JobResult(job, ok, beneficiary, "" if ok else beneficiary.error_message)
+
+    def should_retry(self, result):
+        return isinstance(result.value, self.ldms.BeneficiaryData) and self.ldms.is_transient_failure(result.value)
+
+    def write_batch(self, results):
+        manager = self.automation.sheets_manager
+        failed = [r for r in results if r.value is None]
+        for r in failed:
+            r.value = self.ldms.mark_failed(self.ldms.BeneficiaryData(aadhaar_number=r.job.key), r.error)
+
+        # Failed lookups only get their Results row
+        benefits = [manager.benefit_row(b) for r in results if r.value.fetch_status != "Failed"
+                    for b in r.value.benefits]
+        if benefits:
+            manager.prepare_sheet(self.benefits_sheet, self.ldms.BENEFITS_HEADER)
+            if not manager.append_rows(self.benefits_sheet, benefits):
+                return False
+            # Benefits are in; a retried batch must not append them again
+            for r in results:
+                r.value.benefits = []
+
+        rows = []
+        for r in results:
+            rows.append(manager.result_row(r.value))
+            rows.extend(manager.result_row(extra) for extra in r.value.extra_registrations)
+        # The automation's on_flush hook records written rows in the local index
+        return manager.append_rows(self.output_sheet, rows)
+
+    def close(self):
+        if self.automation:
+            logger.info(self.automation.pacer.summary())
+            self.automation.index.close()
+
+
+class RationCardPortal(PortalClient):
+    """Form_Status.aspx lookups; each worker owns one scraper from GoogleSheetsRationCardAutomation"""
+
+    name = "ration"
+
+    def __init__(self, concurrency=1, credentials_file=os.path.join(RATION_DIR, 'credentials.json'),
+                 sheet="16l3w3hcGAVq2MoB_bP1hvfDHKYxaV1N1SnS6K4ywx0M", worksheet="Ration Card",
+                 use_http=False, delay_seconds=5, start_row=2):
+        super().__init__(concurrency)
+        self.credentials_file = credentials_file
+        self.sheet = sheet
+        self.worksheet = worksheet
+        self.use_http = use_http
+        self.delay_seconds = delay_seconds
+        self.start_row = start_row
+        self.automation = None
+        self._scrapers = queue.Queue()
+        self._local = threading.local()
+
+    def open(self):
+        from google_sheets_automation_corrected import GoogleSheetsRationCardAutomation
+        self.automation = GoogleSheetsRationCardAutomation(
+            self.credentials_file, pool_size=self.concurrency, use_http=self.use_http,
+            status_cache_file=os.path.join(RATION_DIR, 'ration_card_status.json'),
+        )
+        if not (self.automation.authenticate() and self.automation.open_sheet(self.sheet, self.worksheet)
+                and self.automation.setup_headers()):
+            raise RuntimeError("Could not open the ration card sheet")
+        for scraper in self.automation.scrapers:
+            self._scrapers.put(scraper)
+        if self.automation.driver_pool:
+            self.automation.driver_pool.start()
+
+    def load_jobs(self):
+        return [Job(item['number'], item['row']) for item in self.automation.get_ration_card_numbers(self.start_row)]
+
+    def pace(self):
+        # Gap between one worker's searches; its first search goes out straight away
+        if getattr(self._local, 'scraper', None) is not None:
+            time.sleep(self.delay_seconds)
+
+    def fetch(self, job):
+        scraper = getattr(self._local, 'scraper', None)
+        if scraper is None:
+            scraper = self._local.scraper = self._scrapers.get_nowait()
+        search_result = scraper.search_ration_card(job.key) or {"error": "No response from portal"}
+        parsed = self.automation.parse_search_result(search_result)
+        ok = 'error' not in search_result
+        return JobResult(job, ok, parsed, search_result.get('error', ''))
+
+    def should_retry(self, result):
+        from portal_scraper import is_transient_error
+        return is_transient_error(result.error)
+
+    def write_batch(self, results):
+        empty = {'office_name': '', 'form_number': '', 'token_number': '', 'user_id': '', 'status': ''}
+        try:
+            self.automation.sheet.batch_update([
+                {'range': f'B{r.job.row}:F{r.job.row}', 'values': [self.automation.row_values(r.value or empty)]}
+                for r in results
+            ])
+        except Exception as e:
+            logger.error(f"{self.name}: batch update of {len(results)} rows failed: {str(e)}")
+            return False
+        return True
+
+    def written(self, results):
+        for r in results:
+            if r.value and r.value['status']:
+                self.automation.status_cache.record(r.job.key, r.value['status'])
+
+    def close(self):
+        if not self.automation:
+            return
+        for scraper in self.automation.scrapers:
+            scraper.close()
+        if self.automation.driver_pool:
+            self.automation.driver_pool.close()
+            logger.info(self.automation.driver_pool.summary())
+        self.automation.status_cache.save()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the e-Mitra, LDMS and ration card automations concurrently")
+    parser.add_argument("--portals", nargs="+", choices=["emitra", "ldms", "ration"],
+                        default=["emitra", "ldms", "ration"])
+    parser.add_argument("--emitra-workers", type=int, default=1, help="Chrome workers for e-Mitra")
+    parser.add_argument("--emitra-http", metavar="ENDPOINT_MAP", default=None,
+                        help="Use the e-Mitra JSON endpoints listed in this endpoint map file, Chrome as fallback")
+    parser.add_argument("--ldms-workers", type=int, default=1, help="Parallel Jan Soochna sessions")
+    parser.add_argument("--ldms-delay", type=float, default=6, help="Starting gap between one worker's LDMS requests")
+    parser.add_argument("--ration-workers", type=int, default=1, help="Parallel ration card scrapers")
+    parser.add_argument("--ration-http", action="store_true", help="Use plain HTTP postbacks for ration cards")
+    parser.add_argument("--ration-delay", type=float, default=5, help="Gap between one worker's ration card searches")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument("--flush-rows", type=int, default=DEFAULT_FLUSH_ROWS,
+                        help="Write a portal's buffered results after this many")
+    parser.add_argument("--flush-seconds", type=float, default=DEFAULT_FLUSH_SECONDS,
+                        help="Write buffered results once the oldest has waited this long")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    clients = []
+    if "emitra" in args.portals:
+        http_endpoints = None
+        if args.emitra_http:
+            from emitra_fetch import load_endpoint_map
+            try:
+                http_endpoints = load_endpoint_map(args.emitra_http)
+            except (OSError, ValueError) as e:
+                parser.error(str(e))
+        clients.append(EmitraPortal(args.emitra_workers, http_endpoints=http_endpoints))
+    if "ldms" in args.portals:
+        clients.append(LdmsPortal(args.ldms_workers, delay_seconds=args.ldms_delay))
+    if "ration" in args.portals:
+        clients.append(RationCardPortal(args.ration_workers, use_http=args.ration_http,
+                                        delay_seconds=args.ration_delay))
+
+    metrics = JobRunner(clients, args.max_retries, args.flush_rows, args.flush_seconds).run()
+    failed = sum(portal['failed'] + portal['write_failures'] for portal in metrics.portals.values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The tools are plain scripts that import their neighbours by bare module name
+for tool_dir in (ROOT, os.path.join(ROOT, "Emitra_Portal"), os.path.join(ROOT, "LDMS"),
+                 os.path.join(ROOT, "Ration_Card")):
+    if tool_dir not in sys.path:
+        sys.path.insert(0, tool_dir)
+
+import jan_soochna_automation as jsa
+
+
+# Shared fakes; test modules import them with "from conftest import ..."
+
+
+class FakeWorksheet:
+    title = "Sheet1"
+
+    class spreadsheet:
+        id = "sheet-id"
+
+    def __init__(self, values=()):
+        self.values = [list(row) for row in values]
+        self.updates = []
+
+    def get_all_values(self):
+        return self.values
+
+    def batch_update(self, data):
+        self.updates.extend(data)
+
+
+class FakeScraper:
+    def search_ration_card(self, number):
+        return {"ration_card_number": number, "records": []}
+
+    def close(self):
+        pass
+
+
+def ration_automation(tmp_path, numbers):
+    """Ration card automation over a FakeWorksheet with two FakeScrapers and the given card numbers"""
+    import google_sheets_automation_corrected as gsa
+
+    auto = gsa.GoogleSheetsRationCardAutomation(use_http=True, checkpoint_file=str(tmp_path / "checkpoint.json"),
+                                                status_cache_file=str(tmp_path / "status.json"))
+    auto.sheet = FakeWorksheet()
+    auto.scrapers = [FakeScraper(), FakeScraper()]
+    auto._start_scrapers = lambda: auto.scrapers
+    auto.get_ration_card_numbers = lambda start_row, skip_resolved: [
+        {'row': row, 'number': number} for row, number in enumerate(numbers, start=2)]
+    return auto
+
+
+def run_with_timeout(target, timeout=20):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('value', target()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "processing loop did not finish"
+    return result.get('value')
+
+
+class FakeAsyncClient:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class EchoClient(jsa.AsyncJanSoochnaPortalClient):
+    async def fetch_beneficiary_data(self, client, bucket, tokens, aadhaar_number):
+        await asyncio.sleep(0)
+        return aadhaar_number
+
+
+async def collect(client, numbers):
+    return [result async for result in client.fetch_many(numbers)]
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text=""):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """requests.Session stand-in that answers from queued responses and records every call"""
+
+    def __init__(self, gets=(), posts=()):
+        self.gets = list(gets)
+        self.posts = list(posts)
+        self.calls = []
+        self.headers = {}
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url, kwargs))
+        return self.gets.pop(0)
+
+    def post(self, url, data=None, **kwargs):
+        self.calls.append(("POST", url, data))
+        return self.posts.pop(0)
+
+    def close(self):
+        pass
@@ -0,0 +1,55 @@
+from common import driver_pool
+from common.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.scripts = 0
+
+    def execute_script(self, script):
+        self.scripts += 1
+        return 1
+
+
+def test_release_does_not_count_a_use():
+    driver = FakeDriver()
+    pool = DriverPool(lambda: driver, max_uses=2, max_rss_mb=None, quit=lambda d: None)
+    pool.start()
+    assert pool.acquire(timeout=5) is driver
+
+    assert pool.note_use(driver)
+    checks = driver.scripts
+    pool.release(driver)
+
+    assert pool._uses[driver] == 1
+    assert driver.scripts == checks
+    # The second lookup reaches max_uses, not a third phantom one
+    assert pool.acquire(timeout=5) is driver
+    assert not pool.note_use(driver)
+    pool.close()
+
+
+def test_release_after_close_quits_the_driver():
+    driver = FakeDriver()
+    quit = []
+    pool = DriverPool(lambda: driver, max_rss_mb=None, quit=quit.append)
+    pool.start()
+    pool.acquire(timeout=5)
+    pool.close()
+
+    pool.release(driver)
+
+    assert quit == [driver]
+    assert pool._idle.empty()
+
+
+def test_missing_psutil_is_reported_once(monkeypatch, caplog):
+    monkeypatch.setattr(driver_pool, "psutil", None)
+    monkeypatch.setattr(driver_pool, "_psutil_warned", False)
+
+    DriverPool(FakeDriver, max_rss_mb=1500)
+    DriverPool(FakeDriver, max_rss_mb=1500)
+    DriverPool(FakeDriver, max_rss_mb=None)
+
+    assert [r.message for r in caplog.records if "psutil" in r.message] == [
+        "psutil is not installed - drivers will not be recycled by memory use (pip install psutil)"]
@@ -0,0 +1,84 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from emitra_fetch import EmitraHttpClient, load_endpoint_map
+from emitra_replay_server import ReplayHandler
+
+ENDPOINTS = {
+    "search_path": "/api/search",
+    "lifecycle_path": "/api/lifecycle",
+    "receipt_field": "receiptNo",
+    "service_keys": ["serviceName"],
+    "lifecycle_keys": ["status", "actionDate", "officer", "office", "remarks", "stage"],
+}
+
+
+@pytest.fixture
+def replay_client(tmp_path):
+    """EmitraHttpClient pointed at a replay server serving tmp_path"""
+    handler = type("Handler", (ReplayHandler,), {"fixtures_dir": str(tmp_path), "endpoints": ENDPOINTS})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield EmitraHttpClient(ENDPOINTS, base_url=f"http://127.0.0.1:{server.server_port}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def write_capture(directory, name, payload):
+    (directory / name).write_text(json.dumps(payload), encoding="utf-8")
+
+
+def test_lookup_maps_service_and_lifecycle_by_key(tmp_path, replay_client):
+    write_capture(tmp_path, "123.search.json",
+                  {"data": [{"receiptNo": "123", "serviceName": "Service Name : Income Certificate - View More"}]})
+    # Keys deliberately out of sheet order; the older row must be ignored
+    write_capture(tmp_path, "123.lifecycle.json", {"data": [
+        {"stage": "1", "status": "Submitted", "actionDate": "01-01-2024"},
+        {"remarks": "Signed", "office": "Tehsil", "officer": "SDM", "actionDate": "05-01-2024",
+         "status": "Approved", "stage": "2", "extra": "ignored"},
+    ]})
+
+    service_name, lifecycle = replay_client.lookup("123")
+
+    assert service_name == "Income Certificate"
+    assert lifecycle == ["Approved", "05-01-2024", "SDM", "Tehsil", "Signed", "2"]
+
+
+def test_lookup_leaves_missing_lifecycle_keys_blank(tmp_path, replay_client):
+    write_capture(tmp_path, "124.search.json", {"data": [{"serviceName": "Caste Certificate"}]})
+    write_capture(tmp_path, "124.lifecycle.json", {"data": [{"Status": "Pending", "office": None}]})
+
+    service_name, lifecycle = replay_client.lookup("124")
+
+    assert service_name == "Caste Certificate"
+    assert lifecycle == ["Pending", "", "", "", "", ""]
+
+
+def test_lookup_without_capture_is_not_found(replay_client):
+    assert replay_client.lookup("999") == ("RECEIPT NOT FOUND", ["RECEIPT NOT FOUND"] * 6)
+
+
+def test_lookup_without_lifecycle_rows(tmp_path, replay_client):
+    write_capture(tmp_path, "125.search.json", {"data": [{"serviceName": "Caste Certificate"}]})
+
+    assert replay_client.lookup("125") == ("Caste Certificate", ["NO DATA AVAILABLE"] * 6)
+
+
+def test_load_endpoint_map_requires_six_lifecycle_keys(tmp_path):
+    path = tmp_path / "endpoints.json"
+    path.write_text(json.dumps(dict(ENDPOINTS, lifecycle_keys=["status"])), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_endpoint_map(str(path))
+
+    path.write_text(json.dumps({"search_path": "/api/search"}), encoding="utf-8")
+    with pytest.raises(ValueError, match="lifecycle_path"):
+        load_endpoint_map(str(path))
+
+    path.write_text(json.dumps(ENDPOINTS), encoding="utf-8")
+    assert load_endpoint_map(str(path)) == ENDPOINTS
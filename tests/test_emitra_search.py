@@ -0,0 +1,41 @@
+import threading
+
+from emitra_fetch import EmitraCleanAutomation
+
+
+def automation(results_loaded):
+    auto = EmitraCleanAutomation.__new__(EmitraCleanAutomation)
+    auto._local = threading.local()
+    auto.waits = []
+
+    def wait_for_results(timeout, previous_text=None):
+        auto.waits.append(previous_text)
+        return results_loaded
+
+    auto.wait_for_results = wait_for_results
+    return auto
+
+
+def test_fresh_results_are_accepted():
+    auto = automation(results_loaded=True)
+    assert auto._search_results_loaded("old card")
+    assert auto.waits == ["old card"]
+
+
+def test_previous_receipts_card_fails_the_search():
+    auto = automation(results_loaded=None)
+    assert not auto._search_results_loaded("old card")
+
+
+def test_slow_search_on_a_cleared_page_is_left_to_extraction():
+    auto = automation(results_loaded=None)
+    assert auto._search_results_loaded(None)
+
+
+def test_extraction_does_not_read_the_previous_card():
+    auto = automation(results_loaded=None)
+    auto._local.previous_results = "old card"
+
+    assert auto.extract_service_name() == "STALE RESULTS ERROR"
+    assert auto.waits == ["old card"]
+    assert not auto.is_successful("STALE RESULTS ERROR", ["x"] * 6)
@@ -0,0 +1,50 @@
+from emitra_fetch import SheetBatchWriter
+
+
+class FakeSheet:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    def batch_update(self, data):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("429 quota exceeded")
+        self.batches.append(data)
+
+
+def test_flush_sends_one_batch_in_order():
+    sheet = FakeSheet()
+    writer = SheetBatchWriter(sheet, max_rows=2, max_seconds=60)
+    writer.add('B2:H2', [['a']], 'r1')
+    assert not writer.due()
+    writer.add('B3:H3', [['b']], 'r2')
+    assert writer.due()
+
+    assert writer.flush() == (True, ['r1', 'r2'])
+    assert sheet.batches == [[{'range': 'B2:H2', 'values': [['a']]}, {'range': 'B3:H3', 'values': [['b']]}]]
+    assert writer.pending == 0
+
+
+def test_failed_flush_keeps_rows_for_the_next_one():
+    sheet = FakeSheet(failures=1)
+    writer = SheetBatchWriter(sheet, max_rows=10, max_seconds=60)
+    writer.add('B2:H2', [['a']], 'r1')
+    writer.add('B3:H3', [['b']], 'r2')
+
+    assert writer.flush() == (False, [])
+    assert writer.pending == 2
+
+    writer.add('B4:H4', [['c']], 'r3')
+    assert writer.flush() == (True, ['r1', 'r2', 'r3'])
+    assert [update['range'] for update in sheet.batches[0]] == ['B2:H2', 'B3:H3', 'B4:H4']
+
+
+def test_empty_flush_and_discard():
+    writer = SheetBatchWriter(FakeSheet())
+    assert writer.flush() == (True, [])
+
+    writer.add('B2:H2', [['a']], 'r1')
+    assert writer.discard() == ['r1']
+    assert writer.pending == 0
+    assert not writer.due()
@@ -0,0 +1,73 @@
+import time
+
+from emitra_fetch import EmitraCleanAutomation, ReceiptStore, SheetBatchWriter
+
+
+def lifecycle(status):
+    return [status, "2025-08-01", "Office", "Remark", "User", "Level"]
+
+
+def test_only_recent_final_receipts_are_fresh(tmp_path):
+    store = ReceiptStore(str(tmp_path / "results.db"))
+    store.record_many([
+        ("R1", "Birth Certificate", lifecycle("Approved"), 'final'),
+        ("R2", "PROCESSING ERROR", ["PROCESSING ERROR"] * 6, 'partial'),
+        ("R3", "Income Certificate", lifecycle("Approved"), 'final'),
+    ])
+    # R3 was finalized two days ago
+    store.conn.execute("UPDATE receipts SET updated_at = ? WHERE receipt_number = 'R3'", (time.time() - 48 * 3600,))
+
+    assert store.fresh_final_receipts(24) == {"R1"}
+    assert store.fresh_final_receipts(0) == set()
+    store.close()
+
+
+def test_partial_result_becomes_final_on_a_later_run(tmp_path):
+    path = str(tmp_path / "results.db")
+    store = ReceiptStore(path)
+    store.record_many([("R1", "SEARCH FAILED", ["SEARCH FAILED"] * 6, 'partial')])
+    store.close()
+
+    store = ReceiptStore(path)
+    assert store.fresh_final_receipts(24) == set()
+    store.record_many([("R1", "Birth Certificate", lifecycle("Approved")[:2], 'final')])
+    assert store.fresh_final_receipts(24) == {"R1"}
+    # Short lifecycle lists are padded to the six stored columns
+    assert store.conn.execute("SELECT lifecycle_3 FROM receipts").fetchone() == ('',)
+    store.close()
+
+
+class ReceiptColumn:
+    def col_values(self, column):
+        return ["Receipt", "R1", " ", "R2", "R3"]
+
+
+class Noop:
+    def summary(self):
+        return ""
+
+    def save(self):
+        pass
+
+
+def test_run_skips_receipts_finalized_in_the_window(tmp_path):
+    store = ReceiptStore(str(tmp_path / "results.db"))
+    store.record_many([("R1", "Birth Certificate", lifecycle("Approved"), 'final'),
+                       ("R2", "SEARCH FAILED", ["SEARCH FAILED"] * 6, 'partial')])
+
+    auto = EmitraCleanAutomation.__new__(EmitraCleanAutomation)
+    auto.sheet = ReceiptColumn()
+    auto.store = store
+    auto.fresh_hours = 24
+    auto.pool_size = 1
+    auto.http_backend = True
+    auto.writer = SheetBatchWriter(None)
+    auto.page_metrics = auto.driver_pool = auto.selectors = Noop()
+    auto.close = lambda: None
+    queued = []
+    auto._run_sequential = lambda receipts, stats, start_time: queued.extend(receipts)
+
+    auto.run_automation()
+
+    # R1 is skipped; R2 was only partial, so it is looked up again
+    assert queued == [("R2", 4), ("R3", 5)]
@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import jan_soochna_automation as jsa
+from job_runner import Job, JobResult, JobRunner, LdmsPortal, PortalClient, RationCardPortal
+
+
+class PacedClient(PortalClient):
+    name = "paced"
+
+    def __init__(self, errors=()):
+        super().__init__(concurrency=1)
+        self.errors = list(errors)
+        self.fetched = []
+        self.written_rows = []
+
+    def load_jobs(self):
+        return [Job("a", 2), Job("b", 3)]
+
+    def pace(self):
+        time.sleep(0.2)
+
+    def fetch(self, job):
+        self.fetched.append(job.key)
+        error = self.errors.pop(0) if self.errors else ""
+        return JobResult(job, not error, job.key, error)
+
+    def write_batch(self, results):
+        self.written_rows.extend(r.value for r in results)
+        return True
+
+
+def test_pacing_is_not_counted_as_latency():
+    client = PacedClient()
+    metrics = JobRunner([client], flush_rows=1).run()
+
+    assert client.written_rows == ["a", "b"]
+    assert max(metrics.portals["paced"]['latencies']) < 0.1
+
+
+@pytest.mark.parametrize("error, transient", [
+    ("Search failed: timeout", True),
+    ("No response from portal", True),
+    ("Minimal response from portal - possible error", True),
+    ("No records found for this ration card number", False),
+    ("Form validation failed: Please Enter Ration Card No", False),
+])
+def test_ration_retries_only_transient_errors(error, transient):
+    result = JobResult(Job("123"), False, error=error)
+    assert RationCardPortal().should_retry(result) is transient
+
+
+class FailingSheet:
+    def batch_update(self, updates):
+        raise RuntimeError("quota exceeded")
+
+
+class FakeAutomation:
+    sheet = FailingSheet()
+
+    @staticmethod
+    def row_values(parsed):
+        return list(parsed.values())
+
+
+def test_ration_write_batch_reports_failure():
+    portal = RationCardPortal()
+    portal.automation = FakeAutomation()
+    assert portal.write_batch([JobResult(Job("123", 2), True, None)]) is False
+
+
+def test_failed_write_is_kept_for_next_flush():
+    client = PacedClient()
+    client.write_batch = lambda results: False
+    metrics = JobRunner([client], flush_rows=1).run()
+
+    assert metrics.portals["paced"]['written'] == 0
+    assert metrics.portals["paced"]['write_failures'] == 2
+
+
+def test_worker_survives_a_failure_outside_fetch():
+    client = PacedClient()
+    paced = []
+
+    def pace():
+        paced.append(1)
+        if len(paced) == 1:
+            raise RuntimeError("rate limiter broken")
+
+    client.pace = pace
+    client.concurrency = 2
+    finished = threading.Event()
+    runner = JobRunner([client], flush_rows=1)
+    threading.Thread(target=lambda: (runner.run(), finished.set()), daemon=True).start()
+
+    assert finished.wait(20), "run did not finish"
+    portal = runner.metrics.portals["paced"]
+    assert portal['ok'] + portal['failed'] == 2
+    assert portal['failed'] == 1
+
+
+def test_ldms_close_closes_the_local_index(tmp_path):
+    portal = LdmsPortal()
+    automation = jsa.JanSoochnaAutomation.__new__(jsa.JanSoochnaAutomation)
+    automation.pacer = jsa.AdaptivePacer(1)
+    automation.index = jsa.AadhaarIndex(str(tmp_path / "index.db"))
+    portal.automation = automation
+
+    portal.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        automation.index.count()
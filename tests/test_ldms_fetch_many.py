@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+import jan_soochna_automation as jsa
+from conftest import EchoClient, FakeAsyncClient, collect
+
+
+def test_fetch_many_yields_every_result(monkeypatch):
+    monkeypatch.setattr(jsa.httpx, "AsyncClient", FakeAsyncClient)
+    numbers = [str(n) for n in range(7)]
+
+    results = asyncio.run(collect(EchoClient(concurrency=3, requests_per_second=1000), numbers))
+
+    assert sorted(results) == numbers
+
+
+def test_fetch_many_raises_when_a_worker_dies(monkeypatch):
+    def broken_client(*args, **kwargs):
+        raise RuntimeError("client setup failed")
+
+    monkeypatch.setattr(jsa.httpx, "AsyncClient", broken_client)
+
+    with pytest.raises(RuntimeError, match="client setup failed"):
+        asyncio.run(asyncio.wait_for(collect(EchoClient(concurrency=2), ["1", "2", "3"]), timeout=5))
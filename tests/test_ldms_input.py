@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+import jan_soochna_automation as jsa
+
+VALID = ["234123412346", "499181201543", "867530912348"]
+
+
+@pytest.mark.parametrize("aadhaar", VALID)
+def test_valid_checksums(aadhaar):
+    assert jsa.is_valid_aadhaar(aadhaar)
+
+
+@pytest.mark.parametrize("aadhaar", [
+    "234123412345",   # wrong check digit
+    "324123412346",   # transposed digits
+    "23412341234",    # too short
+    "2341234123460",  # too long
+    "23412341234a",
+    "",
+])
+def test_invalid_aadhaar(aadhaar):
+    assert not jsa.is_valid_aadhaar(aadhaar)
+
+
+class FakeValues:
+    def __init__(self, values):
+        self.values = values
+        self.ranges = []
+
+    def get(self, spreadsheetId, range):
+        self.ranges.append(range)
+        return self
+
+    def execute(self):
+        return {'values': self.values}
+
+
+class FakeService:
+    def __init__(self, values):
+        self._values = FakeValues(values)
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self._values
+
+
+def sheets_manager(values):
+    manager = object.__new__(jsa.GoogleSheetsManager)
+    manager.service = FakeService(values)
+    manager.spreadsheet_id = "sheet-id"
+    return manager
+
+
+def test_read_aadhaar_rows_dedupes_and_checks_digits():
+    rows = [["Aadhaar"], [VALID[0]], [" " + VALID[1] + " "], [], [VALID[0]], ["234123412345"], ["12"], [VALID[2]]]
+    manager = sheets_manager(rows)
+
+    numbers, next_row = manager.read_aadhaar_rows("Sheet1", "A", start_row=1)
+
+    assert numbers == VALID
+    assert next_row == 1 + len(rows)
+    assert manager.service.values().ranges == ["Sheet1!A1:A"]
+
+
+def test_existing_results_seeds_the_index_once(tmp_path):
+    class Sheets:
+        reads = 0
+
+        def read_existing_results(self, sheet_name):
+            self.reads += 1
+            return {VALID[0], VALID[1]}
+
+    automation = object.__new__(jsa.JanSoochnaAutomation)
+    automation.index = jsa.AadhaarIndex(str(tmp_path / "index.db"))
+    automation.sheets_manager = Sheets()
+
+    assert automation.existing_results("Results") == {VALID[0], VALID[1]}
+    assert automation.index.count() == 2
+
+    # Later runs read the local index, not the sheet
+    automation.index.record_many([(VALID[2], "Success")])
+    assert automation.existing_results("Results") == set(VALID)
+    assert automation.sheets_manager.reads == 1
+    automation.index.conn.close()
+
+
+LABOUR_KEYS = dict((name, key) for name, key in jsa.LABOUR_FIELDS)
+
+
+def search_response(payload):
+    # The portal answers with a JSON string that itself holds JSON
+    return json.dumps(json.dumps(payload, ensure_ascii=False))
+
+
+def test_parse_search_response_reads_labour_and_benefits():
+    payload = {
+        "Labour": [
+            {LABOUR_KEYS['name']: " Ram Lal ", LABOUR_KEYS['gender']: "Male"},
+            {LABOUR_KEYS['name']: "Ram Lal", LABOUR_KEYS['application_number']: "LB-2"},
+        ],
+        "Pension": [
+            {"योजना / Scheme Name": "Old Age Pension", "राशि / Benefit Amount": 1000,
+             "बैंक / Bank Name": "SBI", "Payment Date": "01-02-2024"},
+        ],
+    }
+    beneficiary = jsa.BeneficiaryData(aadhaar_number=VALID[0])
+
+    result = jsa.parse_search_response(beneficiary, 200, search_response(payload))
+
+    assert result.fetch_status == "Success"
+    assert result.name == "Ram Lal"
+    assert result.gender == "Male"
+    assert [extra.application_number for extra in result.extra_registrations] == ["LB-2"]
+    assert len(result.benefits) == 1
+    benefit = result.benefits[0]
+    assert (benefit.source, benefit.benefit_name, benefit.amount, benefit.bank_name, benefit.debit_date) == \
+        ("Pension", "Old Age Pension", "1000", "SBI", "01-02-2024")
+    assert (result.benefit_name, result.amount) == ("Old Age Pension", "1000")
+
+
+@pytest.mark.parametrize("status_code, text, error", [
+    (502, "", "HTTP Error: 502"),
+    (200, search_response({"Labour": []}), "No beneficiary data found"),
+    (200, "<html>", "JSON parsing failed"),
+])
+def test_parse_search_response_failures(status_code, text, error):
+    result = jsa.parse_search_response(jsa.BeneficiaryData(aadhaar_number=VALID[0]), status_code, text)
+    assert result.fetch_status == "Failed"
+    assert result.error_message.startswith(error)
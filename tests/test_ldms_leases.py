@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+
+import jan_soochna_automation as jsa
+from conftest import EchoClient, FakeAsyncClient, collect
+
+
+def automation_with(coordinator=None):
+    automation = object.__new__(jsa.JanSoochnaAutomation)
+    automation.coordinator = coordinator
+    automation._lease_lost = threading.Event()
+    return automation
+
+
+def test_heartbeat_flags_a_lost_lease(tmp_path):
+    path = str(tmp_path / "work.db")
+    mine = jsa.LeaseCoordinator(path, worker_id="a", lease_seconds=0.3, batch_size=5)
+    other = jsa.LeaseCoordinator(path, worker_id="b", lease_seconds=60, batch_size=5)
+    mine.enqueue(["234123412346", "499181201543"])
+    batch_id, _ = mine.claim()
+
+    # Our lease runs out and the other worker takes the batch over
+    time.sleep(0.35)
+    assert other.claim()[0] == batch_id
+
+    automation = automation_with(mine)
+    stop = threading.Event()
+    automation._keep_lease(batch_id, stop)
+
+    assert automation._batch_cancelled()
+
+
+def test_sequential_run_stops_after_a_lost_lease():
+    class Portal:
+        calls = 0
+
+        def fetch_beneficiary_data(self, aadhaar):
+            self.calls += 1
+
+        def token_summary(self):
+            return ""
+
+    automation = automation_with()
+    automation.portal_client = Portal()
+    automation.pacer = jsa.AdaptivePacer(1)
+    automation._lease_lost.set()
+
+    assert automation._run_sequential(["234123412346"], "Results", {'success': 0, 'failed': 0}) == []
+    assert automation.portal_client.calls == 0
+
+
+def test_fetch_many_stops_cleanly_when_asked(monkeypatch):
+    monkeypatch.setattr(jsa.httpx, "AsyncClient", FakeAsyncClient)
+    client = EchoClient(concurrency=2, should_stop=lambda: True)
+
+    assert asyncio.run(collect(client, ["1", "2", "3"])) == []
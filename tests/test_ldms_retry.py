@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+import jan_soochna_automation as jsa
+
+
+def failed(message):
+    return jsa.mark_failed(jsa.BeneficiaryData(aadhaar_number="123412341234"), message)
+
+
+@pytest.mark.parametrize("message", [
+    "HTTP Error: 502",
+    "Form page error: 503",
+    f"{jsa.NETWORK_ERROR_PREFIX}: Read timed out",
+])
+def test_transient_failures(message):
+    assert jsa.is_transient_failure(failed(message))
+
+
+@pytest.mark.parametrize("message", [
+    "HTTP Error: 404",
+    "No beneficiary data found",
+    "JSON parsing failed: Expecting value",
+    "Error: 'NoneType' object has no attribute 'get'",
+])
+def test_permanent_failures(message):
+    assert not jsa.is_transient_failure(failed(message))
+
+
+def test_success_is_not_retried():
+    assert not jsa.is_transient_failure(jsa.BeneficiaryData(aadhaar_number="123412341234", fetch_status="Success"))
+
+
+def test_shared_pacer_survives_concurrent_workers():
+    pacer = jsa.AdaptivePacer(1, min_delay=0.5)
+    errors = []
+
+    def work():
+        try:
+            for n in range(2000):
+                pacer.observe(0.1, n % 7 == 0)
+                pacer.next_delay()
+                pacer.percentiles()
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=work) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    assert pacer.min_delay <= pacer.delay <= pacer.max_delay
+    assert len(pacer.latencies) == pacer.latencies.maxlen
@@ -0,0 +1,76 @@
+import jan_soochna_automation as jsa
+from conftest import FakeResponse, FakeSession
+
+
+def form_page(token):
+    return FakeResponse(200, f'<input name="__RequestVerificationToken" type="hidden" value="{token}" />')
+
+
+def session_manager(session, ttl=600):
+    manager = jsa.PortalSessionManager(token_ttl=ttl)
+    manager.session = session
+    return manager
+
+
+def test_token_is_reused_until_it_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(jsa.time, "monotonic", lambda: now[0])
+    cache = jsa.TokenCache(ttl=60)
+
+    assert cache.get() is None
+    cache.store("abc")
+    now[0] += 59
+    assert cache.get() == "abc"
+    now[0] += 2
+    assert cache.get() is None
+    assert cache.stats == {'hits': 1, 'fetches': 1, 'refreshes': 0}
+
+
+def test_invalidated_token_is_not_served():
+    cache = jsa.TokenCache()
+    cache.store("abc")
+    cache.invalidate()
+
+    assert cache.get() is None
+    assert cache.stats['refreshes'] == 1
+
+
+def test_session_fetches_the_form_once_for_many_searches():
+    session = FakeSession(gets=[form_page("t1")], posts=[FakeResponse(200, "{}"), FakeResponse(200, "{}")])
+    manager = session_manager(session)
+
+    manager.post_search("234123412346")
+    manager.post_search("499181201543")
+
+    assert [call[0] for call in session.calls] == ["GET", "POST", "POST"]
+    assert [call[2]['__RequestVerificationToken'] for call in session.calls[1:]] == ["t1", "t1"]
+    assert manager.tokens.stats == {'hits': 1, 'fetches': 1, 'refreshes': 0}
+
+
+def test_rejected_token_is_refreshed_once():
+    session = FakeSession(gets=[form_page("old"), form_page("new")],
+                          posts=[FakeResponse(403, "Forbidden"), FakeResponse(200, "{}")])
+    manager = session_manager(session)
+
+    response = manager.post_search("234123412346")
+
+    assert response.status_code == 200
+    assert [call[0] for call in session.calls] == ["GET", "POST", "GET", "POST"]
+    assert session.calls[3][2]['__RequestVerificationToken'] == "new"
+    assert manager.tokens.stats['refreshes'] == 1
+
+
+def test_form_page_answer_counts_as_a_stale_token():
+    assert jsa.needs_token_refresh(200, form_page("x").text)
+    assert not jsa.needs_token_refresh(200, '"{}"')
+    assert jsa.needs_token_refresh(403, "")
+
+
+def test_missing_token_fails_the_lookup():
+    client = jsa.JanSoochnaPortalClient()
+    client.session_manager.session = FakeSession(gets=[FakeResponse(200, "<html></html>")])
+
+    result = client.fetch_beneficiary_data("234123412346")
+
+    assert result.fetch_status == "Failed"
+    assert result.error_message == "No CSRF token found"
@@ -0,0 +1,16 @@
+import signal
+
+import jan_soochna_automation as jsa
+
+
+def test_second_ctrl_c_interrupts_again():
+    automation = object.__new__(jsa.JanSoochnaAutomation)
+    automation._stop_requested = False
+    previous = signal.signal(signal.SIGINT, automation.request_stop)
+    try:
+        automation.request_stop(signal.SIGINT, None)
+
+        assert automation._stop_requested
+        assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+    finally:
+        signal.signal(signal.SIGINT, previous)
@@ -0,0 +1,70 @@
+import jan_soochna_automation as jsa
+
+
+class QueueOnlyManager(jsa.GoogleSheetsManager):
+    """GoogleSheetsManager without the Sheets API: records queued rows per sheet"""
+
+    def __init__(self):
+        self.queued = {}
+
+    def prepare_sheet(self, sheet_name, header=None):
+        pass
+
+    def queue_sheets(self, rows_by_sheet):
+        for sheet_name, rows in rows_by_sheet.items():
+            self.queued.setdefault(sheet_name, []).extend(rows)
+        return True
+
+
+def beneficiary_with_benefit(status):
+    beneficiary = jsa.BeneficiaryData(aadhaar_number="123412341234", fetch_status=status)
+    beneficiary.benefits.append(jsa.BenefitRecord(aadhaar_number="123412341234", source="Pension"))
+    return beneficiary
+
+
+def test_benefits_are_queued_for_successful_lookups():
+    manager = QueueOnlyManager()
+    assert manager.write_result(beneficiary_with_benefit("Success"))
+    assert len(manager.queued["Results"]) == 1
+    assert len(manager.queued["Benefits"]) == 1
+
+
+def test_failed_lookup_only_gets_a_results_row():
+    manager = QueueOnlyManager()
+    assert manager.write_result(jsa.mark_failed(beneficiary_with_benefit("Pending"), "No beneficiary data found"))
+    assert len(manager.queued["Results"]) == 1
+    assert "Benefits" not in manager.queued
+
+
+class FlakyAppendManager(jsa.GoogleSheetsManager):
+    """Real buffering; the first append fails, later ones succeed"""
+
+    def __init__(self):
+        super().__init__("credentials.json", "sheet-id", flush_rows=2)
+        self.appended = {}
+        self.failures = 1
+
+    def _initialize_service(self):
+        pass
+
+    def prepare_sheet(self, sheet_name, header=None):
+        pass
+
+    def append_rows(self, sheet_name, rows):
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.appended.setdefault(sheet_name, []).extend(rows)
+        return True
+
+
+def test_failed_flush_keeps_results_and_benefits_together():
+    manager = FlakyAppendManager()
+    beneficiary = beneficiary_with_benefit("Success")
+    beneficiary.benefits.append(jsa.BenefitRecord(aadhaar_number="123412341234", source="Scheme"))
+    # The Benefits rows alone reach flush_rows; the flush they trigger fails
+    assert manager.write_result(beneficiary)
+    assert manager.flush_results()
+
+    assert len(manager.appended["Results"]) == 1
+    assert len(manager.appended["Benefits"]) == 2
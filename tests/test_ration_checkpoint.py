@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import google_sheets_automation_corrected as gsa
+from conftest import FakeScraper, FakeWorksheet, ration_automation, run_with_timeout
+
+
+def test_checkpoint_round_trip_keeps_other_sheets(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    path.write_text(json.dumps({"other/Sheet2": {"last_row": 7}}), encoding="utf-8")
+    writer = gsa.RationCardSheetWriter(FakeWorksheet(), checkpoint_file=str(path))
+
+    writer.add(2, ["a"] * 5)
+    writer.add(3, ["b"] * 5)
+    assert writer.flush() == 2
+    assert writer.last_checkpoint() == 3
+
+    writer.clear_checkpoint()
+    assert writer.last_checkpoint() is None
+    assert json.loads(path.read_text(encoding="utf-8")) == {"other/Sheet2": {"last_row": 7}}
+    assert not (tmp_path / "checkpoint.json.tmp").exists()
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_checkpoint_survives_a_run_that_left_cards_unprocessed(tmp_path):
+    auto = ration_automation(tmp_path, ["111", "222"])
+    auto.scrapers = [FakeScraper()]
+    search_worker = auto._search_worker
+
+    def worker_that_dies_after_one_card(scraper, work_queue, result_queue, max_retries, delay_seconds):
+        class OneCard:
+            taken = 0
+
+            def get(self):
+                self.taken += 1
+                if self.taken > 1:
+                    raise RuntimeError("browser crashed")
+                return work_queue.get()
+
+            def __getattr__(self, name):
+                return getattr(work_queue, name)
+
+        search_worker(scraper, OneCard(), result_queue, max_retries, delay_seconds)
+
+    auto._search_worker = worker_that_dies_after_one_card
+
+    assert run_with_timeout(lambda: auto.process_all_ration_cards(delay_seconds=0, resume=False))
+    assert [update['range'] for update in auto.sheet.updates] == ['B2:F2']
+    assert auto.writer.last_checkpoint() == 2
+
+
+def test_checkpoint_is_cleared_once_every_card_is_written(tmp_path):
+    auto = ration_automation(tmp_path, ["111", "222"])
+
+    assert run_with_timeout(lambda: auto.process_all_ration_cards(delay_seconds=0, resume=False))
+    assert auto.writer.last_checkpoint() is None
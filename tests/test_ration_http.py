@@ -0,0 +1,66 @@
+from conftest import FakeResponse, FakeSession
+from portal_http_scraper import RajasthanFoodPortalHttpScraper
+
+
+def form_page(viewstate, body=""):
+    return FakeResponse(200, f"""<html><body><form>
+        <input type="hidden" name="__VIEWSTATE" value="{viewstate}" />
+        <input type="hidden" name="__EVENTVALIDATION" value="ev-{viewstate}" />
+        <input type="text" name="ctl00$txtRationCard" id="txtRationCard" />
+        <input type="submit" name="ctl00$btnSearch" value="Search" />
+        {body}
+    </form></body></html>""")
+
+
+def scraper(session):
+    http_scraper = RajasthanFoodPortalHttpScraper(fallback=False)
+    http_scraper.session = session
+    return http_scraper
+
+
+def test_result_page_state_is_reused_for_the_next_search():
+    session = FakeSession(gets=[form_page("vs1")], posts=[form_page("vs2"), form_page("vs3")])
+    http_scraper = scraper(session)
+
+    http_scraper.search_ration_card("111")
+    http_scraper.search_ration_card("222")
+
+    assert [call[0] for call in session.calls] == ["GET", "POST", "POST"]
+    first, second = session.calls[1][2], session.calls[2][2]
+    assert first["__VIEWSTATE"] == "vs1" and first["ctl00$txtRationCard"] == "111"
+    assert second["__VIEWSTATE"] == "vs2" and second["ctl00$txtRationCard"] == "222"
+    assert second["ctl00$btnSearch"] == "Search"
+    assert http_scraper.stats == {'http': 2, 'state_refresh': 1, 'fallback': 0}
+
+
+def test_rejected_state_is_refreshed_and_the_search_repeated():
+    session = FakeSession(gets=[form_page("vs1"), form_page("fresh")],
+                          posts=[FakeResponse(200, "Invalid postback or callback argument"), form_page("vs2")])
+    http_scraper = scraper(session)
+
+    http_scraper.search_ration_card("111")
+
+    assert [call[0] for call in session.calls] == ["GET", "POST", "GET", "POST"]
+    assert session.calls[3][2]["__VIEWSTATE"] == "fresh"
+    assert http_scraper.stats['state_refresh'] == 2
+
+
+def test_failed_search_drops_the_cached_state():
+    session = FakeSession(gets=[form_page("vs1"), form_page("vs9")],
+                          posts=[FakeResponse(404, "Not Found"), form_page("vs2")])
+    http_scraper = scraper(session)
+
+    assert "error" in http_scraper.search_ration_card("111")
+    assert http_scraper.form_state is None
+
+    http_scraper.search_ration_card("222")
+    assert session.calls[3][2]["__VIEWSTATE"] == "vs9"
+
+
+def test_not_found_page_is_reported():
+    body = "<p>No record found for the given number</p>"
+    session = FakeSession(gets=[form_page("vs1")], posts=[form_page("vs2", body)])
+
+    result = scraper(session).search_ration_card("111")
+
+    assert result["error"] == "No records found for this ration card number"
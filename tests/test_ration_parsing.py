@@ -0,0 +1,75 @@
+import pytest
+from lxml import html
+
+import google_sheets_automation_corrected as gsa
+from portal_scraper import read_result_tables, visible_text
+
+RESULT_PAGE = """
+<html><head><style>td { color: red }</style><script>var x = 1;</script></head>
+<body>
+  <div>Food, Civil Supplies &amp; Consumer Affairs Department</div>
+  <table>
+    <tr><th>प्राधिकृत अधिकारी / Officer</th><th>Form Number</th><th>Token Number</th>
+        <th>User ID</th><th>Status</th></tr>
+    <tr><td>*Jaipur City*</td><td>123456789</td><td>987654321</td><td>K119269051</td>
+        <td>Ration Card Printed(12/01/2024)</td></tr>
+  </table>
+</body></html>
+"""
+
+
+@pytest.fixture
+def automation(tmp_path):
+    return gsa.GoogleSheetsRationCardAutomation(use_http=True, status_cache_file=str(tmp_path / "status.json"))
+
+
+def test_visible_text_separates_cells_and_blocks():
+    page = html.fromstring("<html><body><div>Title</div><table><tr><td>A</td><td>B</td></tr>"
+                           "<tr><td>C</td><td>D<br>E</td></tr></table><script>hidden()</script></body></html>")
+    assert visible_text(page) == "Title\nA B\nC D\nE"
+
+
+@pytest.mark.parametrize("headers, expected", [
+    (["Form Number", "Token No", "User ID", "Status"],
+     {'form_number': "Form Number", 'token_number': "Token No", 'user_id': "User ID", 'status': "Status"}),
+    (["Contact Information", "Platform"], {}),
+    (["आवेदन क्रमांक", "टोकन", "यूजर आईडी", "स्थिति", "कार्यालय"],
+     {'form_number': "आवेदन क्रमांक", 'token_number': "टोकन", 'user_id': "यूजर आईडी", 'status': "स्थिति",
+      'office_name': "कार्यालय"}),
+])
+def test_map_result_columns(headers, expected):
+    assert gsa.map_result_columns(headers) == expected
+
+
+def test_parse_search_result_from_table_records(automation):
+    data = {"ration_card_number": "202400000001"}
+    assert read_result_tables(html.fromstring(RESULT_PAGE), data)
+
+    parsed = automation.parse_search_result(data)
+
+    assert parsed == {
+        'office_name': "Jaipur City",
+        'form_number': "123456789",
+        'token_number': "987654321",
+        'user_id': "K119269051",
+        'status': "Ration Card Printed(12/01/2024)",
+    }
+
+
+def test_parse_search_result_falls_back_to_text(automation):
+    result = {
+        "ration_card_number": "202400000001",
+        "table_0_content": "प्राधिकृत अधिकारी Jaipur City 123456789 987654321 K119269051 "
+                           "Ration Card Printed(12/01/2024)",
+    }
+
+    parsed = automation.parse_search_result(result)
+
+    assert parsed['form_number'] == "123456789"
+    assert parsed['token_number'] == "987654321"
+    assert parsed['user_id'] == "K119269051"
+    assert parsed['status'] == "Ration Card Printed(12/01/2024)"
+
+
+def test_parse_search_result_error_is_empty(automation):
+    assert not any(automation.parse_search_result({"error": "No records found"}).values())
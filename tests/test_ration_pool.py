@@ -0,0 +1,97 @@
+import pytest
+
+import google_sheets_automation_corrected as gsa
+from conftest import FakeScraper, ration_automation, run_with_timeout
+from portal_scraper import is_transient_error
+
+
+def test_card_that_fails_to_parse_is_still_written(tmp_path):
+    auto = ration_automation(tmp_path, ["111", "222", "333"])
+    parse = auto.parse_search_result
+
+    def flaky_parse(result):
+        if result.get("ration_card_number") == "222":
+            raise ValueError("unexpected layout")
+        return parse(result)
+
+    auto.parse_search_result = flaky_parse
+
+    assert run_with_timeout(lambda: auto.process_all_ration_cards(delay_seconds=0, resume=False))
+    assert [update['range'] for update in auto.sheet.updates] == ['B2:F2', 'B3:F3', 'B4:F4']
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_loop_ends_when_every_worker_has_died(tmp_path):
+    auto = ration_automation(tmp_path, ["111", "222"])
+
+    def crashing_worker(*args):
+        raise RuntimeError("worker crashed")
+
+    auto._search_worker = crashing_worker
+
+    assert run_with_timeout(lambda: auto.process_all_ration_cards(delay_seconds=0, resume=False))
+    assert auto.sheet.updates == []
+
+
+class NotFoundScraper(FakeScraper):
+    def __init__(self, searches):
+        self.searches = searches
+
+    def search_ration_card(self, number):
+        self.searches.append(number)
+        return {"error": "No records found for this ration card number"}
+
+
+@pytest.mark.parametrize("error, transient", [
+    ("Search failed: timeout", True),
+    ("No response from portal", True),
+    ("Minimal response from portal - possible error", True),
+    ("No records found for this ration card number", False),
+    ("Form validation failed: Please Enter Ration Card No", False),
+    ("Alert during extraction: Invalid Ration Card", False),
+    ("", False),
+])
+def test_transient_errors(error, transient):
+    assert is_transient_error(error) is transient
+
+
+def test_not_found_answer_is_not_retried(tmp_path):
+    searches = []
+    auto = ration_automation(tmp_path, ["111"])
+    auto.scrapers = [NotFoundScraper(searches)]
+
+    assert run_with_timeout(lambda: auto.process_all_ration_cards(delay_seconds=0, resume=False))
+    assert searches == ["111"]
+    assert [update['range'] for update in auto.sheet.updates] == ['B2:F2']
+
+
+class FlakyScraper(FakeScraper):
+    def __init__(self, searches):
+        self.searches = searches
+
+    def search_ration_card(self, number):
+        self.searches.append(number)
+        if self.searches.count(number) == 1:
+            return {"error": "Search failed: timeout"}
+        return super().search_ration_card(number)
+
+
+def test_workers_wait_for_a_retry_instead_of_spinning(tmp_path, monkeypatch):
+    gets = []
+
+    class CountingQueue(gsa.queue.PriorityQueue):
+        def get(self, *args, **kwargs):
+            gets.append(1)
+            return super().get(*args, **kwargs)
+
+    monkeypatch.setattr(gsa.queue, "PriorityQueue", CountingQueue)
+    monkeypatch.setattr(gsa, "RETRY_DELAY", 0.5)
+    searches = []
+    auto = ration_automation(tmp_path, ["111"])
+    auto.scrapers = [FlakyScraper(searches), FlakyScraper(searches)]
+
+    assert run_with_timeout(lambda: auto.process_all_ration_cards(delay_seconds=0, resume=False))
+    assert searches == ["111", "111"]
+    assert [update['range'] for update in auto.sheet.updates] == ['B2:F2']
+    # First search, the retry (plus a look at it per worker while it waits), and the stop markers
+    assert len(gets) < 10
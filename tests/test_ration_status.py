@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import google_sheets_automation_corrected as gsa
+from conftest import FakeWorksheet
+
+
+def checked(cache, ration_number, status, hours_ago):
+    cache.record(ration_number, status)
+    at = (datetime.now() - timedelta(hours=hours_ago)).isoformat(timespec='seconds')
+    cache.cards[ration_number]['checked_at'] = at
+
+
+def test_unseen_card_is_due(tmp_path):
+    cache = gsa.StatusCache(str(tmp_path / "status.json"))
+    assert cache.is_due("111")
+
+
+def test_pending_card_is_due_again_after_refresh_hours(tmp_path):
+    cache = gsa.StatusCache(str(tmp_path / "status.json"), refresh_hours=24)
+    checked(cache, "111", "Pending at DSO", hours_ago=2)
+    checked(cache, "222", "Pending at DSO", hours_ago=25)
+
+    assert not cache.is_due("111")
+    assert cache.is_due("222")
+
+
+def test_printed_card_is_never_due(tmp_path):
+    cache = gsa.StatusCache(str(tmp_path / "status.json"), refresh_hours=0)
+    checked(cache, "111", "Ration Card Printed", hours_ago=1000)
+    assert not cache.is_due("111")
+
+
+def test_history_grows_only_on_status_change_and_survives_a_reload(tmp_path):
+    path = str(tmp_path / "status.json")
+    cache = gsa.StatusCache(path)
+    cache.record("111", "Pending")
+    cache.record("111", "Pending")
+    cache.record("111", "Approved")
+    cache.save()
+
+    reloaded = gsa.StatusCache(path)
+    assert [entry['status'] for entry in reloaded.cards["111"]['history']] == ["Pending", "Approved"]
+    assert reloaded.last_status("111") == "Approved"
+
+
+def automation_over(tmp_path, values):
+    auto = gsa.GoogleSheetsRationCardAutomation(use_http=True, checkpoint_file=str(tmp_path / "checkpoint.json"),
+                                                status_cache_file=str(tmp_path / "status.json"))
+    auto.sheet = FakeWorksheet(values)
+    return auto
+
+
+def test_skips_printed_and_recently_checked_cards(tmp_path):
+    values = [
+        ["Ration Card", "Office", "Form", "Token", "User", "Status"],
+        ["111", "", "", "", "", ""],                       # never searched
+        ["222", "", "", "", "", "Ration Card Printed"],    # terminal in the sheet
+        ["333", "", "", "", "", "Pending"],                # terminal in the cache
+        ["444", "", "", "", "", "Pending"],                # checked an hour ago
+        ["555", "", "", "", "", "Pending"],                # checked two days ago
+        ["", "", "", "", "", ""],
+        ["nan"],
+    ]
+    auto = automation_over(tmp_path, values)
+    checked(auto.status_cache, "333", "Ration Card Printed", hours_ago=1)
+    checked(auto.status_cache, "444", "Pending", hours_ago=1)
+    checked(auto.status_cache, "555", "Pending", hours_ago=48)
+
+    assert [(item['row'], item['number']) for item in auto.get_ration_card_numbers()] == [(2, "111"), (6, "555")]
+
+
+def test_skip_resolved_off_returns_every_card(tmp_path):
+    values = [["Ration Card"], ["111", "", "", "", "", "Ration Card Printed"], ["222"]]
+    auto = automation_over(tmp_path, values)
+
+    assert [item['number'] for item in auto.get_ration_card_numbers(skip_resolved=False)] == ["111", "222"]